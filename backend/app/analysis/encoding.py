@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any, Literal
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+FrameFormat = Literal["records", "columnar"]
+
+
+def frame_columns(df: pd.DataFrame, float32: bool = False) -> dict[str, Any]:
+    # One array per column instead of one dict per row. float32 only narrows float columns:
+    # millisecond timestamps do not fit a float32 mantissa.
+    data: dict[str, Any] = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind == "f":
+            values = values.astype(np.float32 if float32 else np.float64, copy=False)
+        elif values.dtype.kind not in "iub":
+            values = values.tolist()
+        data[str(column)] = np.ascontiguousarray(values) if isinstance(values, np.ndarray) else values
+    return {"columns": list(data), "rows": len(df), "data": data}
+
+
+def frame_payload(df: pd.DataFrame, fmt: FrameFormat = "records", float32: bool = False) -> list[dict[str, Any]] | dict[str, Any]:
+    if fmt == "columnar":
+        return frame_columns(df, float32)
+    return df.to_dict(orient="records")
+
+
+class FastJSONResponse(JSONResponse):
+    # Serializes numpy arrays natively (and NaN as null) without FastAPI's per-value encoder.
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
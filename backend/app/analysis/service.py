@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app.cache.store import get_cache
+from app.config.settings import EnvSettings
+from app.features.indicators import compute_indicators, compute_indicators_many
+from app.providers.factory import market_provider, reddit_provider, twitter_provider
+from app.providers.market.base import INTERVAL_MINUTES
+from app.providers.market.store import StoredMarketDataProvider
+from app.providers.social.base import SocialProvider
+from app.sentiment.service import aggregate_sentiment_columnar, align_to_candles, generate_keywords, scoring_executor
+from app.social.service import ingest_posts, post_store, stored_posts
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    def __init__(self, source: str, reason: str) -> None:
+        super().__init__(f"{source}: {reason}")
+        self.source = source
+        self.reason = reason
+
+
+def candle_limit(limit: int, cfg: dict[str, Any]) -> int:
+    store_cfg = cfg["market"].get("candle_store", {})
+    if store_cfg.get("enabled"):
+        return min(limit, store_cfg["max_rows"])
+    return min(limit, cfg["app"]["max_candle_limit"])
+
+
+async def fetch_candles(symbol: str, interval: str, limit: int, cfg: dict[str, Any]) -> pd.DataFrame:
+    provider = market_provider(cfg)
+    if isinstance(provider, StoredMarketDataProvider):
+        return await provider.get_ohlcv_frame(symbol, interval, candle_limit(limit, cfg))
+    return pd.DataFrame(await provider.get_ohlcv(symbol, interval, candle_limit(limit, cfg)))
+
+
+async def _stage(name: str, work: Awaitable[Any], timeout: float, timings: dict[str, float]) -> Any:
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(work, timeout)
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def social_providers(cfg: dict[str, Any], settings: EnvSettings) -> dict[str, SocialProvider]:
+    social = cfg["social"]
+    if not social.get("enabled", True):
+        return {}
+    providers: dict[str, SocialProvider] = {}
+    if "twitter" in social["providers"]:
+        providers["twitter"] = twitter_provider(settings.twitter_bearer_token)
+    if "reddit" in social["providers"]:
+        providers["reddit"] = reddit_provider(settings.reddit_client_id, settings.reddit_client_secret, settings.reddit_user_agent)
+    return providers
+
+
+def social_fetches(keywords: list[str], limit: int, cfg: dict[str, Any], settings: EnvSettings) -> dict[str, Awaitable[list[dict]]]:
+    return {name: provider.fetch_posts(keywords, limit) for name, provider in social_providers(cfg, settings).items()}
+
+
+def social_ingests(keywords: list[str], limit: int, cfg: dict[str, Any], settings: EnvSettings) -> dict[str, Awaitable[int]]:
+    model, model_path = cfg["social"]["sentiment_model"], cfg["social"].get("sentiment_model_path")
+    return {
+        name: ingest_posts(post_store, name, provider, keywords, limit, model, model_path)
+        for name, provider in social_providers(cfg, settings).items()
+    }
+
+
+def _failure(result: BaseException) -> str:
+    return "timeout" if isinstance(result, asyncio.TimeoutError) else "error"
+
+
+def summarize(
+    symbol: str, interval: str, frame: pd.DataFrame, df: pd.DataFrame, scored: list[dict[str, Any]], cfg: dict[str, Any]
+) -> dict[str, Any]:
+    sentiment_buckets = aggregate_sentiment_columnar(scored, INTERVAL_MINUTES[interval])
+    sentiment_signal = sum(x["sentiment"] for x in sentiment_buckets) / max(len(sentiment_buckets), 1)
+
+    price_signal = float(df["returns"].tail(5).mean())
+    tech_signal = float((df["macd"].iloc[-1] - df["macd_signal"].iloc[-1]) / max(abs(df["close"].iloc[-1]), 1e-9))
+    composite = (
+        cfg["weights"]["price"] * price_signal
+        + cfg["weights"]["technical"] * tech_signal
+        + cfg["weights"]["sentiment"] * sentiment_signal
+    )
+    if "open_time" in df.columns:
+        aligned = align_to_candles(sentiment_buckets, df["open_time"].to_numpy(dtype=np.int64))
+        df["sentiment"] = aligned["sentiment"].to_numpy()
+        df["sentiment_count"] = aligned["sentiment_count"].to_numpy()
+    df["sentiment_signal"] = sentiment_signal
+    df["composite_score"] = composite
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "candles": frame,
+        "frame": df,
+        "posts": len(scored),
+        "sentiment_timeline": sentiment_buckets,
+        "signals": {
+            "price": price_signal,
+            "technical": tech_signal,
+            "sentiment": sentiment_signal,
+            "composite": composite,
+        },
+    }
+
+
+async def compose_analysis(symbol: str, interval: str, limit: int, cfg: dict[str, Any], settings: EnvSettings) -> dict[str, Any]:
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    keywords = generate_keywords(symbol, cfg["social"]["keyword_rules"])
+    # With the post store, each source only ingests posts newer than its cursor and the
+    # sentiment window is then read back already scored.
+    store_cfg = cfg["social"].get("store", {})
+    gather = social_ingests if store_cfg.get("enabled") else social_fetches
+    fetches = gather(keywords, cfg["social"]["lookback_posts"], cfg, settings)
+    social_timeout = cfg["social"].get("fetch_timeout_seconds", 5)
+    # Candles and every social source are fetched concurrently; a slow or failing
+    # social source only degrades sentiment, while candles are required.
+    results = await asyncio.gather(
+        _stage("fetch_candles", fetch_candles(symbol, interval, limit, cfg), cfg["market"].get("fetch_timeout_seconds", 30), timings),
+        *(_stage(f"fetch_{name}", work, social_timeout, timings) for name, work in fetches.items()),
+        return_exceptions=True,
+    )
+
+    frame, social_results = results[0], results[1:]
+    if isinstance(frame, BaseException):
+        # The exception detail stays in the server log; clients only see timeout/error.
+        logger.warning("market fetch failed for %s %s: %r", symbol, interval, frame)
+        raise UpstreamError("market", _failure(frame)) from frame
+
+    sources: dict[str, str] = {"market": "ok"}
+    posts: list[dict] = []
+    for name, result in zip(fetches, social_results):
+        if isinstance(result, BaseException):
+            sources[name] = _failure(result)
+            logger.warning("social source %s failed for %s: %r", name, symbol, result)
+        else:
+            sources[name] = "ok"
+            if not store_cfg.get("enabled"):
+                posts += result
+
+    start = time.perf_counter()
+    df = compute_indicators(frame, cfg["indicators"])
+    timings["indicators"] = round((time.perf_counter() - start) * 1000, 2)
+
+    start = time.perf_counter()
+    model, model_path = cfg["social"]["sentiment_model"], cfg["social"].get("sentiment_model_path")
+    if store_cfg.get("enabled"):
+        try:
+            scored = await stored_posts(
+                post_store, keywords, store_cfg["window_hours"], store_cfg["max_posts"], model, model_path
+            )
+            sources["store"] = "ok"
+        except Exception as exc:
+            logger.warning("post store read failed for %s: %r", symbol, exc)
+            sources["store"], scored = "error", []
+    else:
+        scored = await scoring_executor.score(posts, model, model_path)
+    result = summarize(symbol, interval, frame, df, scored, cfg)
+    timings["sentiment"] = round((time.perf_counter() - start) * 1000, 2)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("analysis %s %s timings=%s sources=%s", symbol, interval, timings, sources)
+    return {**result, "sources": sources, "timings": timings}
+
+
+def candle_close_time(interval: str, now_ms: int | None = None) -> int:
+    # close_time of the candle currently forming; Binance aligns candles to epoch multiples.
+    step = INTERVAL_MINUTES[interval] * 60_000
+    now = now_ms if now_ms is not None else int(time.time() * 1000)
+    return now - now % step + step - 1
+
+
+def analysis_cache_slot(interval: str, cfg: dict[str, Any]) -> tuple[int, float]:
+    # Close time of the forming candle and how long its entries may live: until the candle
+    # closes, or at most app.analysis_cache_max_ttl_seconds so long intervals still pick up
+    # fresh prices and posts.
+    close = candle_close_time(interval)
+    max_ttl = cfg["app"].get("analysis_cache_max_ttl_seconds", 300)
+    return close, max(1.0, min(max_ttl, (close + 1) / 1000 - time.time()))
+
+
+def degraded_ttl(result: dict[str, Any], ttl: float, cfg: dict[str, Any]) -> float:
+    # An analysis built while a source timed out or failed only lives for a short while.
+    if all(status == "ok" for status in result.get("sources", {}).values()):
+        return ttl
+    return min(ttl, cfg["app"].get("analysis_cache_degraded_ttl_seconds", 15))
+
+
+def analysis_key(symbol: str, interval: str, limit: int, close: int) -> str:
+    return f"analysis:{symbol.upper()}:{interval}:{limit}:{close}"
+
+
+async def cached_analysis(
+    symbol: str, interval: str, limit: int, cfg: dict[str, Any], settings: EnvSettings, refresh: bool = False
+) -> dict[str, Any]:
+    # /analyze, /predict and /backtest share one composed analysis per candle. refresh
+    # recomputes and overwrites the entry (the precompute scheduler keeps watched pairs warm).
+    # The cached "candles" and "frame" DataFrames are shared by every caller in the slot and
+    # must be treated as read-only; copy before adding columns or editing values.
+    # Symbols are normalised before composing: the entry is shared by every spelling.
+    symbol = symbol.upper()
+    if not cfg["app"].get("analysis_cache_max_ttl_seconds", 300):
+        return {**await compose_analysis(symbol, interval, limit, cfg, settings), "cache": "off"}
+    close, ttl = analysis_cache_slot(interval, cfg)
+    key = analysis_key(symbol, interval, limit, close)
+    cache = get_cache()
+    if refresh:
+        result = await compose_analysis(symbol, interval, limit, cfg, settings)
+        await cache.set(key, result, degraded_ttl(result, ttl, cfg))
+        return {**result, "cache": "refresh"}
+    missed = False
+
+    async def load() -> dict[str, Any]:
+        nonlocal missed
+        missed = True
+        return await compose_analysis(symbol, interval, limit, cfg, settings)
+
+    result = await cache.get_or_set(key, ttl, load)
+    short = degraded_ttl(result, ttl, cfg)
+    if missed and short < ttl:
+        # Shorten the entry so a recovered source is picked up well before the candle closes.
+        await cache.set(key, result, short)
+    return {**result, "cache": "miss" if missed else "hit"}
+
+
+def keyword_chunks(keywords: dict[str, list[str]], max_query_length: int, max_symbols: int | None = None) -> list[list[str]]:
+    # Packs several symbols into one " OR " query as long as it fits the provider limit and,
+    # with `max_symbols`, the number of symbols whose posts one request can return.
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    length = 0
+    for symbol, words in keywords.items():
+        cost = len(" OR ".join(words)) + (4 if current else 0)
+        if current and (length + cost > max_query_length or len(current) == max_symbols):
+            chunks.append(current)
+            current, length, cost = [], 0, cost - 4
+        current.append(symbol)
+        length += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def attribute_posts(posts: list[dict[str, Any]], keywords: dict[str, list[str]]) -> dict[str, list[dict[str, Any]]]:
+    patterns = {
+        symbol: re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b", re.IGNORECASE)
+        for symbol, words in keywords.items()
+    }
+    out: dict[str, list[dict[str, Any]]] = {symbol: [] for symbol in keywords}
+    for post in posts:
+        text = post.get("text", "")
+        for symbol, pattern in patterns.items():
+            if pattern.search(text):
+                out[symbol].append(post)
+    return out
+
+
+async def compose_batch_analysis(
+    items: list[tuple[str, str, int]], cfg: dict[str, Any], settings: EnvSettings
+) -> list[dict[str, Any]]:
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    unique = list(dict.fromkeys((symbol.upper(), interval, limit) for symbol, interval, limit in items))
+    symbols = list(dict.fromkeys(symbol for symbol, _, _ in unique))
+    social = cfg["social"]
+    keywords = {symbol: generate_keywords(symbol, social["keyword_rules"]) for symbol in symbols}
+    semaphore = asyncio.Semaphore(cfg["app"].get("batch_concurrency", 16))
+    market_timeout = cfg["market"].get("fetch_timeout_seconds", 30)
+    social_timeout = social.get("fetch_timeout_seconds", 5)
+
+    async def candles(item: tuple[str, str, int]) -> pd.DataFrame:
+        async with semaphore:
+            return await asyncio.wait_for(fetch_candles(*item, cfg), market_timeout)
+
+    async def social_chunk(chunk: list[str]) -> list[dict]:
+        words = [w for symbol in chunk for w in keywords[symbol]]
+        fetches = social_fetches(words, social["lookback_posts"] * len(chunk), cfg, settings)
+        async with semaphore:
+            results = await asyncio.gather(*(asyncio.wait_for(w, social_timeout) for w in fetches.values()), return_exceptions=True)
+        posts: list[dict] = []
+        for name, result in zip(fetches, results):
+            if isinstance(result, BaseException):
+                logger.warning("social source %s failed for %s: %r", name, chunk, result)
+            else:
+                posts += result
+        return posts
+
+    # A shared query asks for lookback_posts per symbol, but providers return at most
+    # max_results_per_query posts per request (100 on Twitter and Reddit).
+    per_query = max(1, social.get("max_results_per_query", 100) // max(social["lookback_posts"], 1))
+    chunks = keyword_chunks(keywords, social.get("max_query_length", 512), per_query)
+    fetched = await asyncio.gather(
+        asyncio.gather(*(candles(item) for item in unique), return_exceptions=True),
+        asyncio.gather(*(social_chunk(chunk) for chunk in chunks)),
+    )
+    frames = dict(zip(unique, fetched[0]))
+    timings["fetch"] = round((time.perf_counter() - started) * 1000, 2)
+
+    start = time.perf_counter()
+    ok = {item: frame for item, frame in frames.items() if not isinstance(frame, BaseException) and not frame.empty}
+    indicators = compute_indicators_many(ok, cfg["indicators"])
+    timings["indicators"] = round((time.perf_counter() - start) * 1000, 2)
+
+    start = time.perf_counter()
+    posts = list({(p.get("text"), p.get("created_at")): p for chunk in fetched[1] for p in chunk}.values())
+    scored = await scoring_executor.score(posts, social["sentiment_model"], social.get("sentiment_model_path"))
+    by_symbol = attribute_posts(scored, keywords)
+    results: list[dict[str, Any]] = []
+    for item, frame in frames.items():
+        symbol, interval, limit = item
+        if item not in ok:
+            reason = _failure(frame) if isinstance(frame, BaseException) else "empty"
+            results.append({"symbol": symbol, "interval": interval, "error": f"market data unavailable: {reason}"})
+            continue
+        results.append(summarize(symbol, interval, frame, indicators[item], by_symbol[symbol], cfg))
+    timings["sentiment"] = round((time.perf_counter() - start) * 1000, 2)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("batch analysis of %d items timings=%s", len(unique), timings)
+    for result in results:
+        result["timings"] = timings
+    return results
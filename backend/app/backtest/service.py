@@ -1,9 +1,31 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+BACKTEST_ENGINES = ("vectorized", "loop")
+
+
+def run_backtest(
+    df: pd.DataFrame,
+    long_threshold: float,
+    short_threshold: float,
+    initial_cash: float,
+    fee_bps: float,
+    engine: str = "vectorized",
+) -> dict:
+    if engine == "loop":
+        return run_backtest_loop(df, long_threshold, short_threshold, initial_cash, fee_bps)
+    if engine != "vectorized":
+        raise ValueError(f"Unknown backtest engine: {engine}")
+    scores = np.ascontiguousarray(df["composite_score"].to_numpy(dtype=np.float64))
+    prices = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+    return run_backtest_arrays(scores, prices, long_threshold, short_threshold, initial_cash, fee_bps)
+
 
-def run_backtest(df: pd.DataFrame, long_threshold: float, short_threshold: float, initial_cash: float, fee_bps: float) -> dict:
+def run_backtest_loop(df: pd.DataFrame, long_threshold: float, short_threshold: float, initial_cash: float, fee_bps: float) -> dict:
     cash = initial_cash
     equity = []
     position = 0
@@ -42,3 +64,162 @@ def run_backtest(df: pd.DataFrame, long_threshold: float, short_threshold: float
         "trade_count": trades,
         "equity_curve": equity,
     }
+
+
+def position_transitions(scores: np.ndarray, long_threshold: float, short_threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    enter = scores > long_threshold
+    leave = scores < short_threshold
+    if not np.any(enter & leave):
+        # Entry and exit signals never coincide, so the position is simply the
+        # most recent signal carried forward (flat before the first one).
+        events = np.where(enter, 1, np.where(leave, 0, -1))
+        last = np.maximum.accumulate(np.where(events >= 0, np.arange(events.size), -1))
+        held = np.where(last >= 0, events[np.maximum(last, 0)], 0).astype(bool)
+    else:
+        held = _position_state_machine(enter, leave)
+    prev = np.concatenate(([False], held[:-1]))
+    return np.flatnonzero(held & ~prev), np.flatnonzero(~held & prev)
+
+
+def _position_state_machine(enter: np.ndarray, leave: np.ndarray) -> np.ndarray:
+    held = np.zeros(enter.size, dtype=bool)
+    position = False
+    for i, (e, x) in enumerate(zip(enter.tolist(), leave.tolist())):
+        if not position and e:
+            position = True
+        elif position and x:
+            position = False
+        held[i] = position
+    return held
+
+
+def run_backtest_arrays(
+    scores: np.ndarray,
+    prices: np.ndarray,
+    long_threshold: float,
+    short_threshold: float,
+    initial_cash: float,
+    fee_bps: float,
+    include_equity: bool = True,
+) -> dict:
+    entries, exits = position_transitions(scores, long_threshold, short_threshold)
+    equity, trade_rets = equity_paths(prices, entries, exits, initial_cash, np.array([fee_bps], dtype=np.float64))
+    result = {
+        "win_rate": int(np.count_nonzero(trade_rets > 0)) / max(entries.size, 1),
+        **equity_metrics(equity[0]),
+        "trade_count": int(entries.size),
+    }
+    if include_equity:
+        result["equity_curve"] = equity[0].tolist()
+    return result
+
+
+def equity_paths(
+    prices: np.ndarray,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    initial_cash: float,
+    fee_bps: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    # One row of equity per fee level; trade returns do not depend on fees.
+    n = prices.size
+    entry_prices = prices[entries]
+    trade_rets = (prices[exits] - entry_prices[: exits.size]) / entry_prices[: exits.size]
+    keep = 1 - fee_bps[:, None] / 10000
+
+    multipliers = np.ones((fee_bps.size, n + 1), dtype=np.float64)
+    multipliers[:, 0] = initial_cash
+    multipliers[:, entries + 1] = keep
+    multipliers[:, exits + 1] = (1 + trade_rets) * keep
+    cash = np.cumprod(multipliers, axis=1)[:, 1:]
+
+    held = np.zeros(n, dtype=np.int64)
+    held[entries] += 1
+    held[exits] -= 1
+    held = np.cumsum(held).astype(bool)
+    entry_idx = np.zeros(n, dtype=np.int64)
+    entry_idx[entries] = entries
+    entry_idx = np.maximum.accumulate(entry_idx) if n else entry_idx
+    marked = cash * (prices / np.maximum(prices[entry_idx], 1e-9))
+    return np.where(held, marked, cash), trade_rets
+
+
+def grid_size(start: float, stop: float, step: float) -> int:
+    if step <= 0:
+        raise ValueError("step must be positive")
+    return max(int(np.floor((stop - start) / step + 1e-9)) + 1, 0)
+
+
+def parameter_grid(start: float, stop: float, step: float) -> list[float]:
+    return [round(float(v), 10) for v in start + step * np.arange(grid_size(start, stop, step))]
+
+
+def _rank_key(row: dict) -> tuple[bool, float, float]:
+    # NaN metrics (flat or single-trade runs) rank last instead of landing anywhere.
+    sharpe, avg = row["sharpe_like"], row["avg_return"]
+    return (not np.isnan(sharpe), 0.0 if np.isnan(sharpe) else sharpe, -np.inf if np.isnan(avg) else avg)
+
+
+def run_backtest_sweep(
+    df: pd.DataFrame,
+    long_thresholds: list[float],
+    short_thresholds: list[float],
+    fee_bps: list[float],
+    initial_cash: float,
+    workers: int = 1,
+) -> list[dict]:
+    scores = np.ascontiguousarray(df["composite_score"].to_numpy(dtype=np.float64))
+    prices = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+    pairs = [(lt, st) for lt in long_thresholds for st in short_thresholds]
+    fees = np.asarray(fee_bps, dtype=np.float64)
+
+    if workers > 1 and len(pairs) > 1:
+        shards = [pairs[i::workers] for i in range(workers) if pairs[i::workers]]
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            futures = [pool.submit(_sweep_pairs, scores, prices, shard, fees, initial_cash) for shard in shards]
+            rows = [row for f in futures for row in f.result()]
+    else:
+        rows = _sweep_pairs(scores, prices, pairs, fees, initial_cash)
+
+    rows.sort(key=_rank_key, reverse=True)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def _sweep_pairs(
+    scores: np.ndarray,
+    prices: np.ndarray,
+    pairs: list[tuple[float, float]],
+    fees: np.ndarray,
+    initial_cash: float,
+) -> list[dict]:
+    rows = []
+    for long_threshold, short_threshold in pairs:
+        entries, exits = position_transitions(scores, long_threshold, short_threshold)
+        equity, trade_rets = equity_paths(prices, entries, exits, initial_cash, fees)
+        win_rate = int(np.count_nonzero(trade_rets > 0)) / max(entries.size, 1)
+        for fee, curve in zip(fees.tolist(), equity):
+            rows.append({
+                "long_threshold": long_threshold,
+                "short_threshold": short_threshold,
+                "fee_bps": fee,
+                "win_rate": win_rate,
+                **equity_metrics(curve),
+                "trade_count": int(entries.size),
+                "final_equity": float(curve[-1]) if curve.size else initial_cash,
+            })
+    return rows
+
+
+def equity_metrics(equity: np.ndarray) -> dict:
+    if equity.size == 0:
+        return {"max_drawdown": 0.0, "sharpe_like": 0.0, "avg_return": 0.0}
+    peak = np.maximum.accumulate(equity)
+    max_dd = float(((peak - equity) / np.where(peak == 0, 1e-9, peak)).max())
+    rets = equity[1:] / equity[:-1] - 1
+    if rets.size == 0:
+        return {"max_drawdown": max_dd, "sharpe_like": 0.0, "avg_return": 0.0}
+    mean = float(rets.mean())
+    std = float(rets.std(ddof=1)) if rets.size > 1 else float("nan")
+    return {"max_drawdown": max_dd, "sharpe_like": float((mean / (std + 1e-9)) * (252**0.5)), "avg_return": mean}
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import math
+import struct
+import zlib
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+
+# Data-only encoding for values shared through Redis: an orjson header describing the
+# value, followed by the raw buffers of its numeric arrays (DataFrame columns are written
+# as dtype + bytes, not per-element JSON). Decoding never constructs anything but plain
+# containers, scalars, numpy arrays and DataFrames, so a writable Redis cannot run code
+# in the workers. Large payloads are zlib-compressed; one leading byte tags the encoding.
+COMPRESS_MIN_BYTES = 4096
+_RAW = b"j"
+_ZLIB = b"z"
+_HEADER = struct.Struct(">I")
+
+
+def _encode(value: Any, buffers: list[bytes]) -> Any:
+    if isinstance(value, np.generic):
+        return _encode(value.item(), buffers)
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else {"__float__": repr(value)}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {"__dict__": {key: _encode(item, buffers) for key, item in value.items()}}
+        return {"__items__": [[_encode(key, buffers), _encode(item, buffers)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [_encode(item, buffers) for item in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(item, buffers) for item in value]}
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return {"__objects__": [_encode(item, buffers) for item in value.tolist()]}
+        if value.dtype.kind not in "biufcmM":
+            raise TypeError(f"Cannot cache arrays of dtype {value.dtype}")
+        buffers.append(np.ascontiguousarray(value).tobytes())
+        return {"__array__": [value.dtype.str, list(value.shape), len(buffers) - 1]}
+    if isinstance(value, pd.DataFrame):
+        return {
+            "__frame__": {
+                "columns": _encode_index(value.columns, buffers),
+                "data": [_encode(value.iloc[:, i].to_numpy(), buffers) for i in range(value.shape[1])],
+                "index": _encode_index(value.index, buffers),
+            }
+        }
+    raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+
+def _encode_index(index: pd.Index, buffers: list[bytes]) -> Any:
+    if isinstance(index, pd.MultiIndex):
+        raise TypeError("Cannot cache DataFrames with a MultiIndex")
+    if isinstance(index, pd.RangeIndex):
+        values: Any = {"__range__": [index.start, index.stop, index.step]}
+    else:
+        values = _encode(index.to_numpy(), buffers)
+    return {"__index__": [_encode(index.name, buffers), values]}
+
+
+def _decode(node: Any, buffers: list[memoryview]) -> Any:
+    if isinstance(node, list):
+        return [_decode(item, buffers) for item in node]
+    if not isinstance(node, dict):
+        return node
+    (tag, body), = node.items()
+    if tag == "__dict__":
+        return {key: _decode(item, buffers) for key, item in body.items()}
+    if tag == "__items__":
+        return {_decode(key, buffers): _decode(item, buffers) for key, item in body}
+    if tag == "__tuple__":
+        return tuple(_decode(item, buffers) for item in body)
+    if tag == "__float__":
+        return float(body)
+    if tag == "__objects__":
+        out = np.empty(len(body), dtype=object)
+        out[:] = [_decode(item, buffers) for item in body]
+        return out
+    if tag == "__array__":
+        dtype, shape, i = body
+        return np.frombuffer(buffers[i], dtype=np.dtype(dtype)).reshape(shape)
+    if tag == "__range__":
+        return pd.RangeIndex(*body)
+    if tag == "__index__":
+        name, values = (_decode(item, buffers) for item in body)
+        return values.rename(name) if isinstance(values, pd.RangeIndex) else pd.Index(values, name=name)
+    if tag == "__frame__":
+        data = [_decode(column, buffers) for column in body["data"]]
+        frame = pd.DataFrame(dict(enumerate(data)), index=_decode(body["index"], buffers))
+        frame.columns = _decode(body["columns"], buffers)
+        return frame
+    raise ValueError(f"Unknown cache node {tag!r}")
+
+
+def dumps(value: Any) -> bytes:
+    buffers: list[bytes] = []
+    header = orjson.dumps({"value": _encode(value, buffers), "buffers": [len(b) for b in buffers]})
+    data = b"".join([_HEADER.pack(len(header)), header, *buffers])
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(data, 1)
+    return _RAW + data
+
+
+def loads(data: bytes) -> Any:
+    tag, body = data[:1], data[1:]
+    if tag == _ZLIB:
+        body = zlib.decompress(body)
+    elif tag != _RAW:
+        raise ValueError(f"Unknown cache encoding {tag!r}")
+    view = memoryview(body)
+    (length,) = _HEADER.unpack_from(view)
+    header = orjson.loads(view[_HEADER.size : _HEADER.size + length])
+    buffers, offset = [], _HEADER.size + length
+    for size in header["buffers"]:
+        buffers.append(view[offset : offset + size])
+        offset += size
+    return _decode(header["value"], buffers)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import secrets
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.cache import codec
+from app.cache.store import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+
+# Deletes the lock only while it still holds our token, atomically: a GET then DELETE could
+# remove a lock another worker took after ours expired.
+RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisCache(CacheBackend):
+    name = "redis"
+
+    def __init__(
+        self, client: Any, prefix: str = "scl:", lock_timeout_seconds: float = 10.0, poll_interval_seconds: float = 0.05
+    ) -> None:
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+
+    @classmethod
+    def from_url(cls, url: str, **options: Any) -> RedisCache:
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis_url is set but the 'redis' package is not installed (pip install '.[redis]')")
+        import redis.asyncio as aioredis
+
+        return cls(aioredis.from_url(url), **options)
+
+    def _decode(self, raw: bytes | None) -> Any | None:
+        # Entries this version cannot decode (e.g. written in an older format) are misses.
+        if raw is None:
+            return None
+        try:
+            return codec.loads(raw)
+        except (ValueError, TypeError) as exc:
+            logger.warning("ignoring undecodable cache entry: %r", exc)
+            return None
+
+    async def get(self, key: str) -> Any | None:
+        return self._count(self._decode(await self.client.get(self.prefix + key)))
+
+    async def get_many(self, keys: list[str]) -> list[Any | None]:
+        if not keys:
+            return []
+        raws = await self.client.mget([self.prefix + key for key in keys])
+        return [self._count(self._decode(raw)) for raw in raws]
+
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        await self.client.set(self.prefix + key, codec.dumps(value), px=int(ttl_seconds * 1000))
+
+    async def set_many(self, items: dict[str, Any], ttl_seconds: int) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self.prefix + key, codec.dumps(value), px=int(ttl_seconds * 1000))
+        await pipe.execute()
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _fill(self, key: str, ttl_seconds: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        # Across workers: whoever takes the lock loads, the others poll for its result and
+        # only load themselves if the holder gives up or its lock expires.
+        lock = f"{self.prefix}lock:{key}"
+        token = secrets.token_hex(8)
+        lock_ms = int(self.lock_timeout_seconds * 1000)
+        if await self.client.set(lock, token, nx=True, px=lock_ms):
+            try:
+                return await super()._fill(key, ttl_seconds, loader)
+            finally:
+                await self.client.eval(RELEASE_LOCK, 1, lock, token)
+
+        deadline = time.monotonic() + self.lock_timeout_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval_seconds)
+            value = await self.get(key)
+            if value is not None:
+                return value
+            if not await self.client.exists(lock):
+                break
+        return await super()._fill(key, ttl_seconds, loader)
@@ -1,25 +1,191 @@
 from __future__ import annotations
 
+import asyncio
+import sys
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from typing import Any
 
+import numpy as np
+import pandas as pd
+
+
+def approx_size(value: Any, depth: int = 3) -> int:
+    # Cheap estimate of a cached value's footprint: buffers by their byte size, containers
+    # by their items down to a few levels. Good enough to bound memory, not exact.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if depth and isinstance(value, dict):
+        size += sum(approx_size(k, depth - 1) + approx_size(v, depth - 1) for k, v in value.items())
+    elif depth and isinstance(value, (list, tuple, set)):
+        size += sum(approx_size(item, depth - 1) for item in value)
+    return size
+
+
+class CacheBackend(ABC):
+    name = ""
 
-class InMemoryCache:
     def __init__(self) -> None:
-        self._store: dict[str, tuple[float, Any]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, value: Any) -> Any:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def get_many(self, keys: list[str]) -> list[Any | None]:
+        return [await self.get(key) for key in keys]
+
+    async def aclose(self) -> None:
+        return None
+
+    async def get_or_set(self, key: str, ttl_seconds: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        # Single flight: concurrent misses on one key in this process share one load.
+        value = await self.get(key)
+        if value is not None:
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fill(key, ttl_seconds, loader)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark it retrieved so a load nobody else waited on does not log a warning.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            self._inflight.pop(key, None)
+        return value
+
+    async def _fill(self, key: str, ttl_seconds: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if value is not None:
+            await self.set(key, value, ttl_seconds)
+        return value
 
-    def get(self, key: str) -> Any | None:
+
+class InMemoryCache(CacheBackend):
+    # LRU bounded by entry count and approximate bytes. Expired entries are dropped when
+    # read and by a sweep that runs on writes at most every `sweep_interval_seconds`, so
+    # one-off keys (e.g. symbols:{query}) do not pile up in long-lived workers.
+    name = "memory"
+
+    def __init__(
+        self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024, sweep_interval_seconds: float = 60.0
+    ) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._store: OrderedDict[str, tuple[float, Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Any | None:
         value = self._store.get(key)
-        if not value:
-            return None
-        expires_at, payload = value
+        if value is None:
+            return self._count(None)
+        expires_at, payload, _ = value
         if expires_at < time.time():
-            self._store.pop(key, None)
-            return None
-        return payload
+            self._remove(key)
+            self.expirations += 1
+            return self._count(None)
+        self._store.move_to_end(key)
+        return self._count(payload)
+
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self._remove(key)
+        size = approx_size(value)
+        self._store[key] = (time.time() + ttl_seconds, value, size)
+        self._bytes += size
+        if time.monotonic() - self._last_sweep >= self.sweep_interval_seconds:
+            self.sweep()
+        while self._store and (len(self._store) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._store))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def sweep(self) -> int:
+        now = time.time()
+        expired = [key for key, (expires_at, _, _) in self._store.items() if expires_at < now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._last_sweep = time.monotonic()
+        return len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "entries": len(self._store),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_cache: CacheBackend = InMemoryCache()
+
+
+def get_cache() -> CacheBackend:
+    return _cache
 
-    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
-        self._store[key] = (time.time() + ttl_seconds, value)
 
+def configure_cache(redis_url: str | None, **options: Any) -> CacheBackend:
+    # Redis when a URL is configured, so all workers share one cache; per-process otherwise.
+    global _cache
+    if redis_url:
+        from app.cache.redis_store import RedisCache
 
-cache = InMemoryCache()
+        _cache = RedisCache.from_url(redis_url, **options.get("redis", {}))
+    else:
+        _cache = InMemoryCache(**options.get("memory", {}))
+    return _cache
@@ -5,13 +5,14 @@ from pathlib import Path
 from typing import Any
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class RuntimeConfig(BaseModel):
     app: dict[str, Any] = Field(default_factory=dict)
     market: dict[str, Any] = Field(default_factory=dict)
+    http: dict[str, Any] = Field(default_factory=dict)
     social: dict[str, Any] = Field(default_factory=dict)
     weights: dict[str, float] = Field(default_factory=dict)
     indicators: dict[str, Any] = Field(default_factory=dict)
@@ -19,11 +20,35 @@ class RuntimeConfig(BaseModel):
     backtest: dict[str, Any] = Field(default_factory=dict)
     auth: dict[str, Any] = Field(default_factory=dict)
 
+    @field_validator("model")
+    @classmethod
+    def _positive_horizon(cls, model: dict[str, Any]) -> dict[str, Any]:
+        # Labels compare each close with the one `target_horizon` candles later.
+        horizon = model.get("target_horizon", 1)
+        if not isinstance(horizon, int) or isinstance(horizon, bool) or horizon < 1:
+            raise ValueError("model.target_horizon must be an integer >= 1")
+        return model
+
+    @field_validator("social")
+    @classmethod
+    def _loadable_sentiment_model(cls, social: dict[str, Any]) -> dict[str, Any]:
+        # The sklearn backend loads its artifact on first use; reject a missing one here
+        # instead of failing every request that scores posts.
+        path = social.get("sentiment_model_path")
+        if social.get("sentiment_model") == "sklearn" and not (path and Path(path).exists()):
+            raise ValueError("social.sentiment_model sklearn requires social.sentiment_model_path to an existing artifact")
+        return social
+
 
 class EnvSettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="SCL_", env_file=".env", extra="ignore")
 
     database_url: str = "sqlite:///./data/sentiment_crypto_lab.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
     redis_url: str | None = None
     jwt_secret: str = "change-me"
     master_key: str = ""
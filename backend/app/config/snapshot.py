@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, NoReturn
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.settings import RuntimeConfig, deep_merge, env_overrides
+from app.db.models import ConfigOverride, ConfigVersion
+
+CONFIG_VERSION_ID = 1
+
+
+class FrozenDict(dict):
+    # A dict that refuses mutation, so a shared snapshot cannot be changed by one request
+    # under another. Still a dict for json/FastAPI, and picklable for process pools.
+    def _readonly(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("runtime config snapshots are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+BUMP_VERSION = update(ConfigVersion).where(ConfigVersion.id == CONFIG_VERSION_ID).values(version=ConfigVersion.version + 1)
+
+
+def bump_config_version(db: Session) -> None:
+    # Atomic increment in the caller's transaction; other workers compare it on their next check.
+    if db.execute(BUMP_VERSION).rowcount == 0:
+        db.add(ConfigVersion(id=CONFIG_VERSION_ID, version=1))
+
+
+async def bump_config_version_async(db: AsyncSession) -> None:
+    if (await db.execute(BUMP_VERSION)).rowcount == 0:
+        db.add(ConfigVersion(id=CONFIG_VERSION_ID, version=1))
+
+
+class ConfigSnapshots:
+    # One validated, pre-merged, read-only config per process. A snapshot is reused until
+    # the config_version row changes; that row is read at most every
+    # `check_interval_seconds`, and writes in this process invalidate immediately.
+    def __init__(self, defaults: dict[str, Any], check_interval_seconds: float = 1.0) -> None:
+        self.defaults = defaults
+        self.check_interval_seconds = check_interval_seconds
+        self._config: FrozenDict | None = None
+        self._version: int | None = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _merge(self, rows: list[ConfigOverride], extra: dict[str, Any] | None = None) -> dict[str, Any]:
+        cfg = deep_merge(self.defaults, env_overrides())
+        db_overrides = {row.key: json.loads(row.value) for row in rows}
+        merged = deep_merge(deep_merge(cfg, db_overrides), extra or {})
+        return RuntimeConfig.model_validate(merged).model_dump()
+
+    def build(self, db: Session, extra: dict[str, Any] | None = None) -> dict[str, Any]:
+        return self._merge(db.query(ConfigOverride).all(), extra)
+
+    async def build_async(self, db: AsyncSession, extra: dict[str, Any] | None = None) -> dict[str, Any]:
+        return self._merge(list((await db.execute(select(ConfigOverride))).scalars()), extra)
+
+    def _cached(self) -> FrozenDict | None:
+        if self._config is not None and time.monotonic() - self._checked < self.check_interval_seconds:
+            return self._config
+        return None
+
+    def _store(self, version: int, build: Callable[[], dict[str, Any]]) -> FrozenDict:
+        with self._lock:
+            if self._config is None or version != self._version:
+                self._config = freeze(build())
+                self._version = version
+                self.builds += 1
+            self._checked = time.monotonic()
+            return self._config
+
+    def get(self, db: Session) -> FrozenDict:
+        config = self._cached()
+        if config is not None:
+            return config
+        row = db.get(ConfigVersion, CONFIG_VERSION_ID)
+        return self._store(row.version if row is not None else 0, lambda: self.build(db))
+
+    async def get_async(self, db: AsyncSession) -> FrozenDict:
+        config = self._cached()
+        if config is not None:
+            return config
+        row = await db.get(ConfigVersion, CONFIG_VERSION_ID)
+        version = row.version if row is not None else 0
+        if self._config is not None and version == self._version:
+            return self._store(version, dict)
+        rows = list((await db.execute(select(ConfigOverride))).scalars())
+        return self._store(version, lambda: self._merge(rows))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._config = None
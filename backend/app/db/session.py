@@ -1,15 +1,73 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+from collections.abc import AsyncIterator
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config.settings import EnvSettings
 from app.db.base import Base
 
+ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+}
+
 settings = EnvSettings()
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, connect_args=connect_args)
+
+
+def async_database_url(url: str) -> str:
+    for prefix, replacement in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return replacement + url[len(prefix) :]
+    return url
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+
+def engine_options(url: str, env: EnvSettings) -> dict[str, Any]:
+    options: dict[str, Any] = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        if is_memory_sqlite(url):
+            return options
+    return {
+        **options,
+        "pool_size": env.db_pool_size,
+        "max_overflow": env.db_max_overflow,
+        "pool_timeout": env.db_pool_timeout_seconds,
+        "pool_pre_ping": True,
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, env: EnvSettings) -> None:
+    # WAL lets readers proceed while the audit writer commits; synchronous=NORMAL only
+    # fsyncs at checkpoints in WAL mode; busy_timeout waits on locks instead of failing.
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={env.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(env.sqlite_busy_timeout_ms)}")
+        cursor.close()
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, settings))
+async_engine = create_async_engine(
+    async_database_url(settings.database_url), **engine_options(settings.database_url, settings)
+)
+if settings.database_url.startswith("sqlite"):
+    apply_sqlite_pragmas(engine, settings)
+    apply_sqlite_pragmas(async_engine.sync_engine, settings)
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 
 def init_db() -> None:
@@ -22,3 +80,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
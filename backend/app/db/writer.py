@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    # Audit rows (e.g. Run) are queued by request handlers and inserted in batches by one
+    # task, so responses never wait on a commit/fsync. The rows of one submit() are queued
+    # together and always land in the same transaction. Rows still queued are flushed on
+    # shutdown; if the queue is full, new rows are dropped (counted in stats and logged)
+    # rather than blocking.
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = 200,
+        flush_interval_seconds: float = 0.5,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def configure(self, batch_size: int = 200, flush_interval_seconds: float = 0.5, max_queue: int = 10_000) -> None:
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_queue = max_queue
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop or self._task is None or self._task.done():
+            if self._loop is not loop:
+                # Rows queued on a loop that is gone can no longer be written.
+                if self._pending:
+                    self.dropped += self._pending
+                    logger.warning("audit writer dropped %d rows queued on a closed event loop", self._pending)
+                self._queue, self._pending = asyncio.Queue(self.max_queue), 0
+            self._loop = loop
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    def submit(self, *rows: Any) -> None:
+        if not rows:
+            return
+        queue = self._ensure_started()
+        if self._pending + len(rows) > self.max_queue:
+            # All or nothing, and one warning per call rather than per row.
+            self.dropped += len(rows)
+            logger.warning(
+                "audit writer queue full (%d), dropped %d %s rows (%d dropped in total)",
+                self.max_queue, len(rows), type(rows[0]).__name__, self.dropped,
+            )
+            return
+        queue.put_nowait(rows)
+        self._pending += len(rows)
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            groups = [await queue.get()]
+            size = len(groups[0])
+            deadline = self._loop.time() + self.flush_interval_seconds
+            while size < self.batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    groups.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                size += len(groups[-1])
+            self._pending -= size
+            try:
+                await self._write([row for group in groups for row in group])
+            finally:
+                for _ in groups:
+                    queue.task_done()
+
+    async def _write(self, batch: list[Any]) -> None:
+        try:
+            async with self.session_factory() as db:
+                db.add_all(batch)
+                await db.commit()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("audit writer failed to insert %d rows", len(batch))
+        else:
+            self.written += len(batch)
+            self.batches += 1
+
+    async def flush(self) -> None:
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._pending,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import pandas as pd
+from collections import defaultdict
+from collections.abc import Hashable
 
+import numpy as np
+import pandas as pd
 
-def compute_indicators(df: pd.DataFrame, params: dict) -> pd.DataFrame:
-    out = df.copy()
-    close = out["close"]
-    high = out["high"]
-    low = out["low"]
-    volume = out["volume"]
 
+def _indicator_values(close, high, low, volume, params: dict) -> dict:
+    # Works on Series (one symbol) and on wide DataFrames (one column per symbol):
+    # every operation below is applied column-wise by pandas.
+    out = {}
     rsi_period = int(params["rsi_period"])
     delta = close.diff()
     gain = delta.clip(lower=0).rolling(rsi_period).mean()
@@ -25,10 +26,42 @@ def compute_indicators(df: pd.DataFrame, params: dict) -> pd.DataFrame:
     out["macd_signal"] = out["macd"].ewm(span=int(params["macd_signal"]), adjust=False).mean()
 
     atr_period = int(params["atr_period"])
-    tr = pd.concat([(high - low), (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    tr = np.fmax(np.fmax(high - low, (high - close.shift()).abs()), (low - close.shift()).abs())
     out["atr"] = tr.rolling(atr_period).mean()
 
     out["volatility"] = close.pct_change().rolling(int(params["volatility_window"])).std()
     out["volume_change"] = volume.pct_change(int(params["volume_change_window"])).fillna(0)
     out["returns"] = close.pct_change().fillna(0)
+    return out
+
+
+def compute_indicators(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    out = df.copy()
+    for name, values in _indicator_values(out["close"], out["high"], out["low"], out["volume"], params).items():
+        out[name] = values
     return out.fillna(0)
+
+
+def compute_indicators_many(frames: dict[Hashable, pd.DataFrame], params: dict) -> dict[Hashable, pd.DataFrame]:
+    # Frames of equal length are stacked side by side so each rolling/ewm call runs once
+    # over a 2D block instead of once per symbol.
+    by_length: dict[int, list[Hashable]] = defaultdict(list)
+    for key, frame in frames.items():
+        by_length[len(frame)].append(key)
+
+    out: dict[Hashable, pd.DataFrame] = {}
+    for keys in by_length.values():
+        if len(keys) == 1:
+            out[keys[0]] = compute_indicators(frames[keys[0]], params)
+            continue
+        wide = {
+            col: pd.DataFrame(np.column_stack([frames[k][col].to_numpy(dtype=np.float64) for k in keys]))
+            for col in ("close", "high", "low", "volume")
+        }
+        values = _indicator_values(wide["close"], wide["high"], wide["low"], wide["volume"], params)
+        for i, key in enumerate(keys):
+            result = frames[key].copy()
+            for name, block in values.items():
+                result[name] = block.iloc[:, i].to_numpy()
+            out[key] = result.fillna(0)
+    return out
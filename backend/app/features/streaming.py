@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any
+
+import pandas as pd
+
+INDICATOR_COLUMNS = (
+    "rsi",
+    "ema_fast",
+    "ema_slow",
+    "macd",
+    "macd_signal",
+    "atr",
+    "volatility",
+    "volume_change",
+    "returns",
+)
+
+# Running sums drift when values are added and removed forever; rebuild them from the
+# window every RESYNC_EVERY full windows, which keeps updates amortised O(1).
+RESYNC_EVERY = 64
+
+
+def _pct_change(current: float, previous: float) -> float:
+    if previous == 0:
+        return math.nan if current == 0 or math.isnan(current) else math.copysign(math.inf, current)
+    return current / previous - 1
+
+
+def _zero_nan(value: float) -> float:
+    return 0.0 if math.isnan(value) else value
+
+
+class RollingMean:
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.values: deque[float] = deque()
+        self.total = 0.0
+        self.nans = 0
+        self.pushes = 0
+        # The value the last push dropped off the window (None if it dropped nothing).
+        self.evicted: float | None = None
+
+    def push(self, value: float) -> float:
+        # NaN inputs (the first diff/pct_change) are tracked so a window that still
+        # contains one stays NaN, exactly like pandas' rolling(window).mean().
+        self._add(value, 1)
+        self.values.append(value)
+        self.evicted = None
+        if len(self.values) > self.window:
+            self.evicted = self.values.popleft()
+            self._add(self.evicted, -1)
+        self.pushes += 1
+        if self.pushes % (RESYNC_EVERY * self.window) == 0:
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+        if len(self.values) < self.window or self.nans:
+            return math.nan
+        return self.total / self.window
+
+    def _add(self, value: float, sign: int) -> None:
+        if math.isnan(value):
+            self.nans += sign
+        else:
+            self.total += sign * value
+
+    def checkpoint(self) -> tuple:
+        return self.total, self.nans, self.pushes
+
+    def undo(self, checkpoint: tuple) -> None:
+        # Reverts the last push: O(1), only the pushed and evicted values move.
+        self.values.pop()
+        if self.evicted is not None:
+            self.values.appendleft(self.evicted)
+            self.evicted = None
+        self.total, self.nans, self.pushes = checkpoint
+
+
+class RollingStd:
+    # Welford's algorithm extended with removal, for a fixed-size window (ddof=1).
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.values: deque[float] = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.count = 0
+        self.pushes = 0
+        self.evicted: float | None = None
+
+    def push(self, value: float) -> float:
+        self.values.append(value)
+        if not math.isnan(value):
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        self.evicted = None
+        if len(self.values) > self.window:
+            old = self.evicted = self.values.popleft()
+            if not math.isnan(old):
+                self.count -= 1
+                if self.count == 0:
+                    self.mean = self.m2 = 0.0
+                else:
+                    delta = old - self.mean
+                    self.mean -= delta / self.count
+                    self.m2 -= delta * (old - self.mean)
+        self.pushes += 1
+        if self.pushes % (RESYNC_EVERY * self.window) == 0 and self.count:
+            valid = [v for v in self.values if not math.isnan(v)]
+            self.mean = math.fsum(valid) / self.count
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in valid)
+        if self.count < self.window or self.window < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+    def checkpoint(self) -> tuple:
+        return self.mean, self.m2, self.count, self.pushes
+
+    def undo(self, checkpoint: tuple) -> None:
+        self.values.pop()
+        if self.evicted is not None:
+            self.values.appendleft(self.evicted)
+            self.evicted = None
+        self.mean, self.m2, self.count, self.pushes = checkpoint
+
+
+class Ema:
+    def __init__(self, span: int) -> None:
+        self.alpha = 2 / (span + 1)
+        self.value: float | None = None
+
+    def push(self, value: float) -> float:
+        self.value = value if self.value is None else (1 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+    def checkpoint(self) -> float | None:
+        return self.value
+
+    def undo(self, checkpoint: float | None) -> None:
+        self.value = checkpoint
+
+
+# Candle-by-candle equivalent of compute_indicators: each update is O(1) in the history
+# length and returns the row the batch function would produce for that candle.
+class IncrementalIndicators:
+    _COMPONENTS = ("gain", "loss", "ema_fast", "ema_slow", "macd_signal", "atr", "volatility")
+
+    def __init__(self, params: dict) -> None:
+        self.params = params
+        self.gain = RollingMean(int(params["rsi_period"]))
+        self.loss = RollingMean(int(params["rsi_period"]))
+        self.ema_fast = Ema(int(params["ema_fast"]))
+        self.ema_slow = Ema(int(params["ema_slow"]))
+        self.macd_signal = Ema(int(params["macd_signal"]))
+        self.atr = RollingMean(int(params["atr_period"]))
+        self.volatility = RollingStd(int(params["volatility_window"]))
+        self.volume_window = int(params["volume_change_window"])
+        self.volumes: deque[float] = deque(maxlen=self.volume_window + 1)
+        self.volume_evicted: float | None = None
+        self.prev_close: float | None = None
+        self.count = 0
+        self.last: dict[str, Any] | None = None
+        self._checkpoint: dict[str, Any] | None = None
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, params: dict) -> IncrementalIndicators:
+        engine = cls(params)
+        for candle in df.to_dict(orient="records"):
+            engine.update(candle)
+        return engine
+
+    def update(self, candle: dict[str, Any]) -> dict[str, Any]:
+        self._checkpoint = self._state()
+        return self._advance(candle)
+
+    def revise(self, candle: dict[str, Any]) -> dict[str, Any]:
+        # Replace the most recent candle (e.g. a still-forming one) instead of appending.
+        if self._checkpoint is None:
+            return self.update(candle)
+        self._undo(self._checkpoint)
+        return self._advance(candle)
+
+    def _state(self) -> dict[str, Any]:
+        # Scalars only (totals, NaN counts, EMA values); the window contents are restored
+        # from the value each component evicted, so update and revise stay O(1).
+        state: dict[str, Any] = {name: getattr(self, name).checkpoint() for name in self._COMPONENTS}
+        state.update(prev_close=self.prev_close, count=self.count)
+        return state
+
+    def _undo(self, state: dict[str, Any]) -> None:
+        for name in self._COMPONENTS:
+            getattr(self, name).undo(state[name])
+        self.volumes.pop()
+        if self.volume_evicted is not None:
+            self.volumes.appendleft(self.volume_evicted)
+            self.volume_evicted = None
+        self.prev_close = state["prev_close"]
+        self.count = state["count"]
+
+    def _advance(self, candle: dict[str, Any]) -> dict[str, Any]:
+        close = float(candle["close"])
+        high = float(candle["high"])
+        low = float(candle["low"])
+        volume = float(candle["volume"])
+        prev = self.prev_close
+
+        delta = math.nan if prev is None else close - prev
+        gain = self.gain.push(math.nan if math.isnan(delta) else max(delta, 0.0))
+        loss = self.loss.push(math.nan if math.isnan(delta) else -min(delta, 0.0))
+        rs = gain / (1e-9 if loss == 0 else loss)
+        rsi = 100 - (100 / (1 + rs))
+
+        ema_fast = self.ema_fast.push(close)
+        ema_slow = self.ema_slow.push(close)
+        macd = ema_fast - ema_slow
+        macd_signal = self.macd_signal.push(macd)
+
+        tr = high - low if prev is None else max(high - low, abs(high - prev), abs(low - prev))
+        atr = self.atr.push(tr)
+
+        ret = math.nan if prev is None else _pct_change(close, prev)
+        volatility = self.volatility.push(ret)
+
+        self.volume_evicted = self.volumes[0] if len(self.volumes) == self.volume_window + 1 else None
+        self.volumes.append(volume)
+        volume_change = _pct_change(volume, self.volumes[0]) if len(self.volumes) > self.volume_window else math.nan
+
+        self.prev_close = close
+        self.count += 1
+        row = {
+            **candle,
+            "rsi": rsi,
+            "ema_fast": ema_fast,
+            "ema_slow": ema_slow,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "atr": atr,
+            "volatility": volatility,
+            "volume_change": volume_change,
+            "returns": ret,
+        }
+        self.last = {k: _zero_nan(v) if isinstance(v, float) else v for k, v in row.items()}
+        return self.last
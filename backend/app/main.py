@@ -1,54 +1,96 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+from functools import partial
 from typing import Any
 
-import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.analysis.encoding import FastJSONResponse, FrameFormat, frame_payload
+from app.analysis.service import UpstreamError, cached_analysis, compose_batch_analysis
 from app.auth.deps import require_admin
 from app.auth.jwt import create_access_token
-from app.backtest.service import run_backtest
-from app.cache.store import cache
-from app.config.settings import EnvSettings, deep_merge, env_overrides, load_default_config
+from app.backtest.service import grid_size, parameter_grid, run_backtest, run_backtest_sweep
+from app.cache.store import configure_cache, get_cache
+from app.config.settings import EnvSettings, load_default_config
+from app.config.snapshot import ConfigSnapshots, bump_config_version_async
 from app.db.models import BacktestRecord, ConfigOverride, Run
-from app.db.session import get_db, init_db
-from app.features.indicators import compute_indicators
-from app.models.service import predict, train_model
-from app.providers.market.binance import BinanceMarketDataProvider
-from app.providers.social.reddit import RedditProvider
-from app.providers.social.twitter import TwitterProvider
-from app.sentiment.service import aggregate_sentiment, generate_keywords, score_posts
+from app.db.session import AsyncSessionLocal, SessionLocal, get_async_db, init_db
+from app.db.writer import BackgroundWriter
+from app.models.jobs import training_queue
+from app.models.service import model_registry
+from app.precompute.service import cached_prediction, precompute_scheduler
+from app.providers.factory import market_provider, reset_providers
+from app.providers.http import http_pool
+from app.providers.market.base import INTERVAL_MINUTES
+from app.providers.throttle import rate_limiters
+from app.sentiment.backends import backend_stats
+from app.sentiment.service import score_cache, scoring_executor
+from app.social.service import post_store
+from app.stream.service import analysis_hub
+
+logger = logging.getLogger(__name__)
 
 settings = EnvSettings()
 default_cfg = load_default_config().model_dump()
+config_snapshots = ConfigSnapshots(default_cfg)
+run_writer = BackgroundWriter(AsyncSessionLocal)
 
 app = FastAPI(title="sentiment-crypto-lab")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 
 @app.on_event("startup")
-def startup() -> None:
+async def startup() -> None:
     init_db()
-
-
-def load_runtime_config(db: Session) -> dict[str, Any]:
-    cfg = deep_merge(default_cfg, env_overrides())
-    rows = db.query(ConfigOverride).all()
-    db_overrides: dict[str, Any] = {}
-    for row in rows:
-        db_overrides[row.key] = json.loads(row.value)
-    return deep_merge(cfg, db_overrides)
+    with SessionLocal() as db:
+        cfg = config_snapshots.get(db)
+    http_pool.configure(cfg["http"])
+    configure_cache(settings.redis_url, **cfg["app"]["cache"])
+    score_cache.max_entries = cfg["social"]["score_cache_size"]
+    scoring_executor.configure(**cfg["social"]["scoring"])
+    post_store.retention_seconds = cfg["social"]["store"]["window_hours"] * 3600
+    training_queue.configure(**cfg["model"]["training"])
+    model_registry.max_models = cfg["model"]["registry_size"]
+    model_registry.mmap_mode = None if cfg["model"]["artifact_compress"] else "r"
+    run_writer.configure(**cfg["app"]["audit_writer"])
+    precompute_scheduler.configure(**cfg["app"]["precompute"])
+    analysis_hub.configure(**cfg["app"]["stream"])
+    await training_queue.recover()
+    precompute_scheduler.start(current_config, settings)
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await precompute_scheduler.stop()
+    reset_providers()
+    await http_pool.aclose()
+    await get_cache().aclose()
+    await run_writer.aclose()
+    scoring_executor.shutdown()
+    training_queue.shutdown()
+
+
+async def load_runtime_config(db: AsyncSession) -> dict[str, Any]:
+    return await config_snapshots.get_async(db)
+
+
+async def current_config() -> dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        return await load_runtime_config(db)
 
 
 def interval_to_minutes(interval: str) -> int:
-    mapping = {"1m": 1, "5m": 5, "15m": 15, "1h": 60, "4h": 240, "1d": 1440}
-    if interval not in mapping:
+    if interval not in INTERVAL_MINUTES:
         raise HTTPException(400, "Unsupported interval")
-    return mapping[interval]
+    return INTERVAL_MINUTES[interval]
 
 
 @app.get("/health")
@@ -63,74 +105,146 @@ async def login(form_data: dict[str, str]) -> dict[str, str]:
     raise HTTPException(401, "Bad credentials")
 
 
+@app.get("/cache/stats")
+async def cache_stats(_: str = Depends(require_admin)) -> dict[str, Any]:
+    return {
+        "cache": get_cache().stats(),
+        "sentiment_scores": score_cache.stats(),
+        "sentiment_backends": backend_stats(),
+        "audit_writer": run_writer.stats(),
+        "rate_limits": rate_limiters.stats(),
+        "precompute": precompute_scheduler.stats(),
+        "stream": analysis_hub.stats(),
+    }
+
+
 @app.get("/symbols")
-async def symbols(query: str = "", db: Session = Depends(get_db)) -> list[str]:
-    cfg = load_runtime_config(db)
-    provider = BinanceMarketDataProvider(cfg["market"]["base_url"], cfg["market"]["request_timeout_seconds"])
-    cache_key = f"symbols:{query}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-    found = await provider.search_symbols(query)
-    cache.set(cache_key, found, cfg["app"]["cache_ttl_seconds"])
-    return found
+async def symbols(query: str = "", db: AsyncSession = Depends(get_async_db)) -> list[str]:
+    cfg = await load_runtime_config(db)
+    return await market_provider(cfg).search_symbols(query)
 
 
-def compose_analysis(symbol: str, interval: str, limit: int, cfg: dict[str, Any]):
-    provider = BinanceMarketDataProvider(cfg["market"]["base_url"], cfg["market"]["request_timeout_seconds"])
-    return provider
+@app.exception_handler(UpstreamError)
+async def upstream_error_handler(request: Request, exc: UpstreamError) -> JSONResponse:
+    status = 504 if exc.reason == "timeout" else 502
+    return JSONResponse(status_code=status, content={"detail": f"Upstream {exc.source} unavailable: {exc.reason}"})
 
 
-@app.get("/analyze")
-async def analyze(symbol: str, interval: str, limit: int = Query(default=200, le=1000), db: Session = Depends(get_db)) -> dict[str, Any]:
-    cfg = load_runtime_config(db)
-    provider = BinanceMarketDataProvider(cfg["market"]["base_url"], cfg["market"]["request_timeout_seconds"])
-    candles = await provider.get_ohlcv(symbol, interval, min(limit, cfg["app"]["max_candle_limit"]))
-    df = compute_indicators(pd.DataFrame(candles), cfg["indicators"])
-
-    keywords = generate_keywords(symbol, cfg["social"]["keyword_rules"])
-    tw = TwitterProvider(settings.twitter_bearer_token)
-    rd = RedditProvider(settings.reddit_client_id, settings.reddit_client_secret, settings.reddit_user_agent)
-    posts = await tw.fetch_posts(keywords, cfg["social"]["lookback_posts"])
-    posts += await rd.fetch_posts(keywords, cfg["social"]["lookback_posts"])
-    scored = score_posts(posts)
-    sentiment_buckets = aggregate_sentiment(scored, interval_to_minutes(interval)) if scored else []
-    sentiment_signal = sum(x["sentiment"] for x in sentiment_buckets) / max(len(sentiment_buckets), 1)
-
-    price_signal = float(df["returns"].tail(5).mean())
-    tech_signal = float((df["macd"].iloc[-1] - df["macd_signal"].iloc[-1]) / max(abs(df["close"].iloc[-1]), 1e-9))
-    composite = (
-        cfg["weights"]["price"] * price_signal
-        + cfg["weights"]["technical"] * tech_signal
-        + cfg["weights"]["sentiment"] * sentiment_signal
-    )
-    df["sentiment_signal"] = sentiment_signal
-    df["composite_score"] = composite
+def run_record(symbol: str, interval: str, analysis: dict[str, Any]) -> Run:
+    summary = {"composite": analysis["signals"]["composite"], "sentiment_posts": analysis["posts"]}
+    return Run(symbol=symbol, interval=interval, summary_json=json.dumps(summary))
 
-    run = Run(symbol=symbol, interval=interval, summary_json=json.dumps({"composite": composite, "sentiment_posts": len(posts)}))
-    db.add(run)
-    db.commit()
 
-    return {
+@app.get("/analyze")
+async def analyze(
+    symbol: str,
+    interval: str,
+    limit: int = Query(default=200, le=100_000),
+    format: FrameFormat = "records",
+    float32: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+) -> FastJSONResponse:
+    # format=columnar sends candles and indicators as {"columns", "rows", "data": {column: [...]}};
+    # float32 additionally narrows their float columns.
+    cfg = await load_runtime_config(db)
+    interval_to_minutes(interval)
+    analysis = await cached_analysis(symbol, interval, limit, cfg, settings)
+    run_writer.submit(run_record(symbol, interval, analysis))
+
+    return FastJSONResponse({
         "symbol": symbol,
         "interval": interval,
-        "candles": candles,
-        "indicators": df.tail(200).to_dict(orient="records"),
-        "sentiment_timeline": sentiment_buckets,
-        "signals": {
-            "price": price_signal,
-            "technical": tech_signal,
-            "sentiment": sentiment_signal,
-            "composite": composite,
-        },
-    }
+        "candles": frame_payload(analysis["candles"], format, float32),
+        "indicators": frame_payload(analysis["frame"].tail(200), format, float32),
+        "sentiment_timeline": analysis["sentiment_timeline"],
+        "signals": analysis["signals"],
+        "sources": analysis["sources"],
+        "timings": analysis["timings"],
+        "cache": analysis["cache"],
+    })
+
+
+@app.get("/stream")
+async def stream(symbol: str, interval: str, limit: int = Query(default=200, le=100_000)) -> StreamingResponse:
+    # Server-Sent Events: a snapshot shaped like /analyze, then deltas with only the new or
+    # changed candles, indicator rows, sentiment buckets and signals.
+    interval_to_minutes(interval)
+    symbol = symbol.upper()
+    # An unknown symbol would keep a producer polling upstream for nothing.
+    try:
+        matches = await market_provider(await current_config()).search_symbols(symbol)
+    except Exception as exc:
+        logger.warning("symbol lookup failed for %s: %r", symbol, exc)
+        raise UpstreamError("market", "error") from exc
+    if not matches or matches[0] != symbol:
+        raise HTTPException(404, "Unknown symbol")
+
+    async def load() -> dict[str, Any]:
+        return await cached_analysis(symbol, interval, limit, await current_config(), settings)
+
+    return StreamingResponse(
+        analysis_hub.events(symbol, interval, limit, load),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class AnalyzeItem(BaseModel):
+    symbol: str
+    interval: str
+    limit: int = Field(default=200, le=100_000)
+
+
+class AnalyzeBatchRequest(BaseModel):
+    items: list[AnalyzeItem]
+    include_candles: bool = True
+    indicator_rows: int = Field(default=200, ge=0)
+    format: FrameFormat = "records"
+    float32: bool = False
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(req: AnalyzeBatchRequest, db: AsyncSession = Depends(get_async_db)) -> FastJSONResponse:
+    cfg = await load_runtime_config(db)
+    if len(req.items) > cfg["app"]["batch_max_symbols"]:
+        raise HTTPException(400, f"At most {cfg['app']['batch_max_symbols']} items per batch")
+    for item in req.items:
+        interval_to_minutes(item.interval)
+    analyses = await compose_batch_analysis([(i.symbol, i.interval, i.limit) for i in req.items], cfg, settings)
+
+    results = []
+    runs = []
+    for analysis in analyses:
+        if "error" in analysis:
+            results.append(analysis)
+            continue
+        runs.append(run_record(analysis["symbol"], analysis["interval"], analysis))
+        results.append({
+            "symbol": analysis["symbol"],
+            "interval": analysis["interval"],
+            **({"candles": frame_payload(analysis["candles"], req.format, req.float32)} if req.include_candles else {}),
+            "indicators": frame_payload(analysis["frame"].tail(req.indicator_rows), req.format, req.float32)
+            if req.indicator_rows
+            else [],
+            "sentiment_timeline": analysis["sentiment_timeline"],
+            "signals": analysis["signals"],
+        })
+    run_writer.submit(*runs)
+    return FastJSONResponse({"results": results, "timings": analyses[0]["timings"] if analyses else {}})
 
 
 @app.get("/predict")
-async def prediction(symbol: str, interval: str, db: Session = Depends(get_db)) -> dict[str, Any]:
-    analysis = await analyze(symbol=symbol, interval=interval, db=db)
-    df = pd.DataFrame(analysis["indicators"])
-    result = predict(df, symbol, interval)
+async def prediction(symbol: str, interval: str, response: Response, db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    symbol = symbol.upper()
+    cfg = await load_runtime_config(db)
+    interval_to_minutes(interval)
+    # Same window as the precompute scheduler, so watched pairs are answered from the cache.
+    result = await cached_prediction(symbol, interval, cfg["app"]["precompute"]["limit"], cfg, settings)
+    if result["status"] == "model_missing":
+        default = TrainRequest(symbol=symbol, interval=interval)
+        job = (await training_queue.submit([(symbol, interval, default.limit)], cfg, settings))[0]
+        response.status_code = 202
+        result = {"status": "training_queued", "job": job}
     return {"symbol": symbol, "interval": interval, **result}
 
 
@@ -140,13 +254,31 @@ class TrainRequest(BaseModel):
     limit: int = 500
 
 
-@app.post("/train")
-async def train(req: TrainRequest, _: str = Depends(require_admin), db: Session = Depends(get_db)) -> dict[str, Any]:
-    analysis = await analyze(symbol=req.symbol, interval=req.interval, limit=req.limit, db=db)
-    df = pd.DataFrame(analysis["indicators"])
-    cfg = load_runtime_config(db)
-    trained = train_model(df, req.symbol, req.interval, horizon=cfg["model"]["target_horizon"])
-    return {"status": "trained", **trained}
+class TrainBatchRequest(BaseModel):
+    items: list[TrainRequest]
+
+
+@app.post("/train", status_code=202)
+async def train(req: TrainRequest, _: str = Depends(require_admin), db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    return (await train_batch(TrainBatchRequest(items=[req]), _, db))["jobs"][0]
+
+
+@app.post("/train/batch", status_code=202)
+async def train_batch(req: TrainBatchRequest, _: str = Depends(require_admin), db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    cfg = await load_runtime_config(db)
+    if len(req.items) > cfg["app"]["batch_max_symbols"]:
+        raise HTTPException(400, f"At most {cfg['app']['batch_max_symbols']} items per batch")
+    for item in req.items:
+        interval_to_minutes(item.interval)
+    return {"jobs": await training_queue.submit([(i.symbol, i.interval, i.limit) for i in req.items], cfg, settings)}
+
+
+@app.get("/train/jobs/{job_id}")
+async def training_job(job_id: int) -> dict[str, Any]:
+    job = await training_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Training job not found")
+    return job
 
 
 class BacktestRequest(BaseModel):
@@ -156,42 +288,124 @@ class BacktestRequest(BaseModel):
 
 
 @app.post("/backtest")
-async def backtest(req: BacktestRequest, db: Session = Depends(get_db)) -> dict[str, Any]:
-    analysis = await analyze(symbol=req.symbol, interval=req.interval, limit=req.limit, db=db)
-    cfg = load_runtime_config(db)
-    df = pd.DataFrame(analysis["indicators"])
+async def backtest(req: BacktestRequest, db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    cfg = await load_runtime_config(db)
+    interval_to_minutes(req.interval)
+    analysis = await cached_analysis(req.symbol, req.interval, req.limit, cfg, settings)
+    run_writer.submit(run_record(req.symbol, req.interval, analysis))
+    df = analysis["frame"]
     metrics = run_backtest(
         df,
         cfg["backtest"]["long_threshold"],
         cfg["backtest"]["short_threshold"],
         cfg["backtest"]["initial_cash"],
         cfg["backtest"]["fee_bps"],
+        engine=cfg["backtest"].get("engine", "vectorized"),
     )
     record = BacktestRecord(params_json=req.model_dump_json(), metrics_json=json.dumps(metrics))
     db.add(record)
-    db.commit()
+    await db.commit()
     return metrics
 
 
+class ParamRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(gt=0)
+
+
+class BacktestSweepRequest(BaseModel):
+    symbol: str
+    interval: str
+    limit: int = 300
+    long_thresholds: list[float] | ParamRange
+    short_thresholds: list[float] | ParamRange
+    fee_bps: list[float] | ParamRange | None = None
+    top_n: int = 20
+
+
+def _sweep_size(values: list[float] | ParamRange) -> int:
+    if isinstance(values, ParamRange):
+        return grid_size(values.start, values.stop, values.step)
+    return len(values)
+
+
+def _sweep_values(values: list[float] | ParamRange) -> list[float]:
+    if isinstance(values, ParamRange):
+        return parameter_grid(values.start, values.stop, values.step)
+    return values
+
+
+@app.post("/backtest/sweep")
+async def backtest_sweep(req: BacktestSweepRequest, db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    cfg = await load_runtime_config(db)
+    interval_to_minutes(req.interval)
+    # Sized from the ranges before any grid is materialised.
+    combinations = _sweep_size(req.long_thresholds) * _sweep_size(req.short_thresholds)
+    combinations *= _sweep_size(req.fee_bps) if req.fee_bps is not None else 1
+    if combinations == 0 or combinations > cfg["backtest"]["sweep_max_combinations"]:
+        raise HTTPException(400, f"Sweep must cover 1..{cfg['backtest']['sweep_max_combinations']} combinations")
+    long_thresholds = _sweep_values(req.long_thresholds)
+    short_thresholds = _sweep_values(req.short_thresholds)
+    fee_bps = _sweep_values(req.fee_bps) if req.fee_bps is not None else [cfg["backtest"]["fee_bps"]]
+
+    analysis = await cached_analysis(req.symbol, req.interval, req.limit, cfg, settings)
+    run_writer.submit(run_record(req.symbol, req.interval, analysis))
+    df = analysis["frame"]
+
+    sweep = partial(
+        run_backtest_sweep,
+        df,
+        long_thresholds,
+        short_thresholds,
+        fee_bps,
+        cfg["backtest"]["initial_cash"],
+        workers=cfg["backtest"]["sweep_workers"],
+    )
+    rows = await asyncio.get_running_loop().run_in_executor(None, sweep)
+
+    base_params = {"symbol": req.symbol, "interval": req.interval, "limit": req.limit}
+    await db.execute(
+        insert(BacktestRecord),
+        [
+            {
+                "params_json": json.dumps({**base_params, "long_threshold": r["long_threshold"], "short_threshold": r["short_threshold"], "fee_bps": r["fee_bps"]}),
+                "metrics_json": json.dumps(r),
+            }
+            for r in rows
+        ],
+    )
+    await db.commit()
+    return {"symbol": req.symbol, "interval": req.interval, "combinations": combinations, "results": rows[: req.top_n]}
+
+
 @app.get("/config")
-async def get_config(_: str = Depends(require_admin), db: Session = Depends(get_db)) -> dict[str, Any]:
-    return load_runtime_config(db)
+async def get_config(_: str = Depends(require_admin), db: AsyncSession = Depends(get_async_db)) -> dict[str, Any]:
+    return await load_runtime_config(db)
 
 
 @app.put("/config")
-async def put_config(payload: dict[str, Any], _: str = Depends(require_admin), db: Session = Depends(get_db)) -> dict[str, str]:
+async def put_config(payload: dict[str, Any], _: str = Depends(require_admin), db: AsyncSession = Depends(get_async_db)) -> dict[str, str]:
+    try:
+        await config_snapshots.build_async(db, payload)
+    except ValidationError as exc:
+        raise HTTPException(422, exc.errors(include_url=False)) from exc
     for key, value in payload.items():
-        row = db.get(ConfigOverride, key)
+        row = await db.get(ConfigOverride, key)
         if row:
             row.value = json.dumps(value)
         else:
             db.add(ConfigOverride(key=key, value=json.dumps(value)))
-    db.commit()
+    await bump_config_version_async(db)
+    await db.commit()
+    config_snapshots.invalidate()
     return {"status": "updated"}
 
 
 @app.post("/config/reset")
-async def reset_config(_: str = Depends(require_admin), db: Session = Depends(get_db)) -> dict[str, str]:
-    db.query(ConfigOverride).delete()
-    db.commit()
+async def reset_config(_: str = Depends(require_admin), db: AsyncSession = Depends(get_async_db)) -> dict[str, str]:
+    await db.execute(delete(ConfigOverride))
+    await bump_config_version_async(db)
+    await db.commit()
+    config_snapshots.invalidate()
     return {"status": "reset"}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+
+class CompactForest:
+    # A fitted forest flattened into a handful of node arrays. Leaves point at themselves,
+    # so evaluating every tree at once is `depth` rounds of fancy indexing; the arrays are
+    # plain numpy, which joblib can store uncompressed and memory-map on load.
+    def __init__(
+        self,
+        left: np.ndarray,
+        right: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        prob_up: np.ndarray,
+        roots: np.ndarray,
+        depth: int,
+        feature_importances: np.ndarray,
+    ) -> None:
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.prob_up = prob_up
+        self.roots = roots
+        self.depth = depth
+        self.feature_importances_ = feature_importances
+
+    @classmethod
+    def from_sklearn(cls, model: RandomForestClassifier) -> CompactForest:
+        classes = list(model.classes_)
+        up = classes.index(1) if 1 in classes else None
+        parts: dict[str, list[np.ndarray]] = {"left": [], "right": [], "feature": [], "threshold": [], "prob_up": []}
+        roots = []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(n, dtype=np.int32) + offset
+            leaf = tree.children_left < 0
+            parts["left"].append(np.where(leaf, ids, tree.children_left + offset).astype(np.int32))
+            parts["right"].append(np.where(leaf, ids, tree.children_right + offset).astype(np.int32))
+            parts["feature"].append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            parts["threshold"].append(tree.threshold.astype(np.float64))
+            counts = tree.value[:, 0, :]
+            prob = counts[:, up] / counts.sum(axis=1) if up is not None else np.zeros(n)
+            parts["prob_up"].append(prob.astype(np.float32))
+            roots.append(offset)
+            offset += n
+        arrays = {name: np.ascontiguousarray(np.concatenate(chunks)) for name, chunks in parts.items()}
+        depth = max(estimator.tree_.max_depth for estimator in model.estimators_)
+        return cls(
+            **arrays,
+            roots=np.asarray(roots, dtype=np.int32),
+            depth=int(depth),
+            feature_importances=np.asarray(model.feature_importances_, dtype=np.float64),
+        )
+
+    def predict_up(self, X: np.ndarray) -> np.ndarray:
+        # Probability of the "up" class for each row of X (n_rows, n_features). Inputs are
+        # rounded to float32 first, exactly as sklearn does before comparing thresholds.
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32)).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.prob_up[node].mean(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        up = self.predict_up(X)
+        return np.column_stack([1 - up, up])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self.predict_up(X) > 0.5).astype(np.int8)
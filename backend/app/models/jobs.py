@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import socket
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analysis.service import compose_batch_analysis
+from app.config.settings import EnvSettings
+from app.db.models import TrainingJob
+from app.db.session import AsyncSessionLocal
+from app.models.service import model_registry, train_model
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_dict(job: TrainingJob) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "symbol": job.symbol,
+        "interval": job.interval,
+        "status": job.status,
+        "progress": job.progress,
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "error": job.error,
+        "duration_seconds": job.duration_seconds,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class TrainingQueue:
+    # Training is submitted as jobs tracked in the training_jobs table: candles and
+    # sentiment are fetched on the event loop, the CPU-bound fits run in a process pool
+    # ("inline" uses the loop's default thread pool instead, e.g. for tests). Each job is
+    # owned by the worker process that queued it, which renews its lease every
+    # `heartbeat_seconds` until the job finishes.
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        mode: str = "process",
+        workers: int = 0,
+        n_jobs: int = 1,
+        lease_seconds: float = 60.0,
+        heartbeat_seconds: float = 15.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self._pool: ProcessPoolExecutor | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.configure(mode, workers, n_jobs, lease_seconds, heartbeat_seconds)
+
+    def configure(
+        self, mode: str = "process", workers: int = 0, n_jobs: int = 1, lease_seconds: float = 60.0, heartbeat_seconds: float = 15.0
+    ) -> None:
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown training mode: {mode}")
+        workers = workers or os.cpu_count() or 1
+        if self._pool is not None and workers != self.workers:
+            self.shutdown()
+        self.mode = mode
+        self.workers = workers
+        self.n_jobs = n_jobs
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+
+    def executor(self) -> Executor | None:
+        if self.mode == "inline":
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def recover(self) -> int:
+        async with self.session_factory() as db:
+            count = await self._expire(db)
+            await db.commit()
+            return count
+
+    async def _expire(self, db: AsyncSession) -> int:
+        # Active jobs whose owner stopped renewing the lease (it exited or restarted) will
+        # never finish. Jobs another live worker is still running are left alone.
+        cutoff = _now() - timedelta(seconds=self.lease_seconds)
+        jobs = (
+            await db.execute(
+                select(TrainingJob).where(
+                    TrainingJob.status.in_(ACTIVE_STATUSES),
+                    or_(TrainingJob.heartbeat_at.is_(None), TrainingJob.heartbeat_at < cutoff),
+                )
+            )
+        ).scalars().all()
+        for job in jobs:
+            job.status, job.error, job.finished_at = "failed", "interrupted by restart", _now()
+        return len(jobs)
+
+    async def submit(
+        self, items: list[tuple[str, str, int]], cfg: dict[str, Any], settings: EnvSettings
+    ) -> list[dict[str, Any]]:
+        # A pair that already has an active job gets that job back instead of a duplicate.
+        unique = list({(s.upper(), i): (s.upper(), i, limit) for s, i, limit in items}.values())
+        jobs: dict[tuple[str, str], TrainingJob] = {}
+        async with self.session_factory() as db:
+            await self._expire(db)
+            for symbol, interval, _ in unique:
+                active = (
+                    await db.execute(
+                        select(TrainingJob)
+                        .filter_by(symbol=symbol, interval=interval)
+                        .where(TrainingJob.status.in_(ACTIVE_STATUSES))
+                        .limit(1)
+                    )
+                ).scalar_one_or_none()
+                jobs[(symbol, interval)] = active or TrainingJob(
+                    symbol=symbol, interval=interval, status="queued", progress=0.0, owner=self.owner, heartbeat_at=_now()
+                )
+            fresh = {key: job for key, job in jobs.items() if job.id is None}
+            db.add_all(fresh.values())
+            await db.commit()
+            for job in fresh.values():
+                await db.refresh(job)
+            out = [job_dict(job) for job in jobs.values()]
+            ids = {key: job.id for key, job in fresh.items()}
+        if ids:
+            todo = [item for item in unique if (item[0], item[1]) in ids]
+            task = asyncio.get_running_loop().create_task(self._run(ids, todo, cfg, settings))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return out
+
+    async def get(self, job_id: int) -> dict[str, Any] | None:
+        async with self.session_factory() as db:
+            job = await db.get(TrainingJob, job_id)
+            return job_dict(job) if job is not None else None
+
+    async def _update(self, job_id: int, **fields: Any) -> None:
+        async with self.session_factory() as db:
+            job = await db.get(TrainingJob, job_id)
+            for name, value in fields.items():
+                setattr(job, name, value)
+            await db.commit()
+
+    async def _heartbeat(self, job_ids: list[int]) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(TrainingJob)
+                        .where(TrainingJob.id.in_(job_ids), TrainingJob.status.in_(ACTIVE_STATUSES))
+                        .values(heartbeat_at=_now())
+                    )
+                    await db.commit()
+            except Exception as exc:
+                logger.warning("training job heartbeat failed for %s: %r", job_ids, exc)
+
+    async def _run(
+        self, ids: dict[tuple[str, str], int], items: list[tuple[str, str, int]], cfg: dict[str, Any], settings: EnvSettings
+    ) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(list(ids.values())))
+        try:
+            await self._train(ids, items, cfg, settings)
+        finally:
+            heartbeat.cancel()
+
+    async def _train(
+        self, ids: dict[tuple[str, str], int], items: list[tuple[str, str, int]], cfg: dict[str, Any], settings: EnvSettings
+    ) -> None:
+        started = {key: time.perf_counter() for key in ids}
+        for job_id in ids.values():
+            await self._update(job_id, status="running", progress=0.1, started_at=_now())
+        try:
+            analyses = await compose_batch_analysis(items, cfg, settings)
+        except Exception as exc:
+            logger.exception("training data fetch failed for %s", items)
+            for job_id in ids.values():
+                await self._update(job_id, status="failed", error=repr(exc), finished_at=_now())
+            return
+
+        loop = asyncio.get_running_loop()
+        executor = self.executor()
+        model_cfg = cfg["model"]
+        train = partial(
+            train_model,
+            horizon=model_cfg["target_horizon"],
+            n_jobs=self.n_jobs,
+            min_samples=model_cfg.get("retrain_min_samples", 200),
+            forest=model_cfg.get("forest"),
+            compress=model_cfg.get("artifact_compress", 0),
+            **model_cfg.get("walk_forward", {}),
+        )
+
+        async def fit(analysis: dict[str, Any]) -> None:
+            key = (analysis["symbol"], analysis["interval"])
+            job_id = ids[key]
+            try:
+                if "error" in analysis:
+                    raise RuntimeError(analysis["error"])
+                await self._update(job_id, progress=0.5)
+                result = await loop.run_in_executor(executor, train, analysis["frame"], *key)
+            except Exception as exc:
+                logger.warning("training job %s for %s failed: %r", job_id, key, exc)
+                elapsed = time.perf_counter() - started[key]
+                await self._update(job_id, status="failed", error=str(exc), finished_at=_now(), duration_seconds=elapsed)
+                return
+            # The fit may have run in another process; drop our copy so the new artifact loads.
+            model_registry.invalidate(*key)
+            elapsed = time.perf_counter() - started[key]
+            await self._update(
+                job_id,
+                status="succeeded",
+                progress=1.0,
+                result_json=json.dumps(result),
+                finished_at=_now(),
+                duration_seconds=elapsed,
+            )
+
+        await asyncio.gather(*(fit(analysis) for analysis in analyses))
+
+
+training_queue = TrainingQueue(AsyncSessionLocal)
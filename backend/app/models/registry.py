@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+
+from app.models.compact import CompactForest
+
+ModelVersion = tuple[int, int]
+
+
+class ModelEntry:
+    def __init__(self, model: Any, version: ModelVersion, feature_names: list[str]) -> None:
+        self.model = model
+        self.version = version
+        self.importances = {f: float(v) for f, v in zip(feature_names, model.feature_importances_)}
+
+
+class ModelRegistry:
+    # Loaded models are kept in an LRU keyed by (symbol, interval) and validated against
+    # the artifact's (mtime_ns, size) on every lookup, so a model written by /train — in
+    # this worker or another one — is picked up without a restart.
+    def __init__(
+        self,
+        path_for: Callable[[str, str], Path],
+        feature_names: list[str],
+        max_models: int = 256,
+        mmap_mode: str | None = "r",
+    ) -> None:
+        self.path_for = path_for
+        self.feature_names = feature_names
+        self.max_models = max_models
+        self.mmap_mode = mmap_mode
+        self._entries: OrderedDict[tuple[str, str], ModelEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def version(path: Path) -> ModelVersion | None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # Symbols are case-insensitive: jobs train "BTCUSDT" while requests may ask for "btcusdt".
+    def get(self, symbol: str, interval: str) -> ModelEntry | None:
+        symbol = symbol.upper()
+        key = (symbol, interval)
+        path = self.path_for(symbol, interval)
+        version = self.version(path)
+        if version is None:
+            self.invalidate(symbol, interval)
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                return entry
+        model = joblib.load(path, mmap_mode=self.mmap_mode)
+        if isinstance(model, RandomForestClassifier):
+            # Artifacts written before models were stored compact; /train rewrites them.
+            model = CompactForest.from_sklearn(model)
+        return self.put(symbol, interval, model, version)
+
+    def put(self, symbol: str, interval: str, model: Any, version: ModelVersion | None = None) -> ModelEntry:
+        symbol = symbol.upper()
+        version = version or self.version(self.path_for(symbol, interval)) or (0, 0)
+        entry = ModelEntry(model, version, self.feature_names)
+        with self._lock:
+            self._entries[(symbol, interval)] = entry
+            self._entries.move_to_end((symbol, interval))
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, symbol: str, interval: str) -> None:
+        with self._lock:
+            self._entries.pop((symbol.upper(), interval), None)
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import json
+import os
+import time
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 
+from app.models.compact import CompactForest
+from app.models.registry import ModelRegistry
+from app.models.walkforward import feature_matrix, fold_bounds, walk_forward
+
 MODEL_DIR = Path("data/models")
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -23,29 +31,87 @@ FEATURE_COLUMNS = [
 
 
 def model_path(symbol: str, interval: str) -> Path:
-    return MODEL_DIR / f"{symbol}_{interval}.joblib"
+    return MODEL_DIR / f"{symbol.upper()}_{interval}.joblib"
+
+
+def report_path(symbol: str, interval: str) -> Path:
+    return MODEL_DIR / f"{symbol.upper()}_{interval}.walkforward.json"
+
+
+model_registry = ModelRegistry(lambda symbol, interval: model_path(symbol, interval), FEATURE_COLUMNS)
+
+
+def _atomic_write(path: Path, write) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def train_model(
+    df: pd.DataFrame,
+    symbol: str,
+    interval: str,
+    horizon: int = 1,
+    n_jobs: int = 1,
+    min_samples: int = 200,
+    test_size: int = 120,
+    max_folds: int = 50,
+    forest: dict | None = None,
+    compress: int = 0,
+) -> dict:
+    X, y, times = feature_matrix(df, FEATURE_COLUMNS, horizon)
+    if len(X) < min_samples:
+        raise ValueError(f"{len(X)} labelled rows for {symbol} {interval}, need at least {min_samples}")
+
+    path, report_file = model_path(symbol, interval), report_path(symbol, interval)
+    report = json.loads(report_file.read_text()) if report_file.exists() and path.exists() else {"folds": []}
+    # Folds and the deployed model are only reused while they were built the same way; a new
+    # horizon, forest or feature set retrains from scratch.
+    params = json.loads(json.dumps({"horizon": horizon, "forest": forest or {}, "features": FEATURE_COLUMNS, "test_size": test_size}))
+    if report.get("params") != params:
+        report = {"folds": [], "params": params}
+    trained_until = report.get("trained_until")
+    new_rows = int((times > trained_until).sum()) if trained_until is not None else len(X)
+    estimator = RandomForestClassifier(**{"n_estimators": 200, **(forest or {})}, random_state=42, n_jobs=1)
+
+    # Only test windows that end after the last evaluated one are fitted again.
+    evaluated_until = report["folds"][-1]["test_end"] if report["folds"] else None
+    folds = walk_forward(estimator, X, y, times, fold_bounds(times, min_samples, test_size, evaluated_until), n_jobs)
+    report["folds"] = (report["folds"] + folds)[-max_folds:]
 
+    # The deployed model is refitted once at least a full test window of new rows arrived.
+    if trained_until is None or new_rows >= test_size:
+        start = time.perf_counter()
+        model = CompactForest.from_sklearn(estimator.set_params(n_jobs=n_jobs).fit(X, y))
+        report["fit_seconds"] = round(time.perf_counter() - start, 4)
+        report["trained_until"] = int(times[-1])
+        report["rows"] = len(X)
+        # Uncompressed artifacts can be memory-mapped by every worker; compressed ones are smaller.
+        _atomic_write(path, lambda tmp: joblib.dump(model, tmp, compress=compress))
+        model_registry.put(symbol, interval, model)
+        status = "trained"
+    else:
+        status = "up_to_date"
+    _atomic_write(report_file, lambda tmp: tmp.write_text(json.dumps(report)))
 
-def train_model(df: pd.DataFrame, symbol: str, interval: str, horizon: int = 1) -> dict:
-    data = df.copy()
-    data["target"] = (data["close"].shift(-horizon) > data["close"]).astype(int)
-    data = data.dropna()
-    X = data[FEATURE_COLUMNS]
-    y = data["target"]
-    model = RandomForestClassifier(n_estimators=200, random_state=42)
-    model.fit(X, y)
-    joblib.dump(model, model_path(symbol, interval))
-    return {"rows": len(data), "features": FEATURE_COLUMNS}
+    accuracies = [fold["accuracy"] for fold in report["folds"]]
+    return {
+        "status": status,
+        "rows": report["rows"],
+        "features": FEATURE_COLUMNS,
+        "new_folds": folds,
+        "walk_forward_accuracy": sum(accuracies) / len(accuracies) if accuracies else None,
+        "fit_seconds": report["fit_seconds"],
+    }
 
 
 def predict(df: pd.DataFrame, symbol: str, interval: str) -> dict:
-    path = model_path(symbol, interval)
-    if not path.exists():
-        train_model(df, symbol, interval)
-    model = joblib.load(path)
-    latest = df.iloc[-1:][FEATURE_COLUMNS]
-    prob_up = float(model.predict_proba(latest)[0][1])
+    entry = model_registry.get(symbol, interval)
+    if entry is None:
+        # Never train on the request path; the caller decides whether to queue a job.
+        return {"status": "model_missing"}
+    latest = np.fromiter((df[column].iat[-1] for column in FEATURE_COLUMNS), dtype=np.float32, count=len(FEATURE_COLUMNS))
+    prob_up = float(entry.model.predict_up(latest)[0])
     direction = "up" if prob_up >= 0.5 else "down"
-    importances = {f: float(v) for f, v in zip(FEATURE_COLUMNS, model.feature_importances_)}
-    top = sorted(importances.items(), key=lambda x: x[1], reverse=True)[:5]
-    return {"direction": direction, "confidence": prob_up if direction == "up" else 1 - prob_up, "top_features": top}
+    top = sorted(entry.importances.items(), key=lambda x: x[1], reverse=True)[:5]
+    return {"status": "ready", "direction": direction, "confidence": prob_up if direction == "up" else 1 - prob_up, "top_features": top}
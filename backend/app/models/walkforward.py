@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+
+
+def feature_matrix(df: pd.DataFrame, columns: list[str], horizon: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # One contiguous float32 block (the dtype the forest's trees split on, so fitting on
+    # slices of it never copies), labels, and open_time per row. The last `horizon` rows
+    # have no future close yet and are left out.
+    close = df["close"].to_numpy(dtype=np.float64)
+    n = max(len(df) - horizon, 0)
+    X = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32)[:n])
+    y = (close[horizon:] > close[:-horizon]).astype(np.int8)
+    times = df["open_time"].to_numpy(dtype=np.int64)[:n] if "open_time" in df else np.arange(n, dtype=np.int64)
+    return X, y, times
+
+
+def fold_bounds(times: np.ndarray, min_train: int, test_size: int, after: int | None = None) -> list[tuple[int, int]]:
+    # Expanding-window folds: train on every row before `start`, test on the next
+    # `test_size` rows. With `after` (the last open_time an earlier run evaluated) the
+    # folds continue from there, so only windows of new rows are fitted.
+    first = min_train
+    if after is not None:
+        first = max(first, int(np.searchsorted(times, after, side="right")))
+    return [(start, start + test_size) for start in range(first, len(times) - test_size + 1, test_size)]
+
+
+def _fit_fold(estimator, X: np.ndarray, y: np.ndarray, times: np.ndarray, start: int, stop: int) -> dict[str, Any]:
+    began = time.perf_counter()
+    model = clone(estimator).fit(X[:start], y[:start])
+    fitted = time.perf_counter()
+    accuracy = float((model.predict(X[start:stop]) == y[start:stop]).mean())
+    return {
+        "train_rows": start,
+        "test_rows": stop - start,
+        "test_start": int(times[start]),
+        "test_end": int(times[stop - 1]),
+        "accuracy": accuracy,
+        "fit_seconds": round(fitted - began, 4),
+        "predict_seconds": round(time.perf_counter() - fitted, 4),
+    }
+
+
+def walk_forward(
+    estimator, X: np.ndarray, y: np.ndarray, times: np.ndarray, bounds: list[tuple[int, int]], n_jobs: int = 1
+) -> list[dict[str, Any]]:
+    # Threads share X without pickling it; tree fitting releases the GIL.
+    runner = Parallel(n_jobs=min(n_jobs, len(bounds)) or 1, prefer="threads")
+    return runner(delayed(_fit_fold)(estimator, X, y, times, start, stop) for start, stop in bounds)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.analysis.service import analysis_cache_slot, cached_analysis, candle_close_time
+from app.cache.store import get_cache
+from app.config.settings import EnvSettings
+from app.models.service import model_registry, predict
+from app.providers.market.base import INTERVAL_MINUTES
+
+logger = logging.getLogger(__name__)
+
+
+async def cached_prediction(
+    symbol: str, interval: str, limit: int, cfg: dict[str, Any], settings: EnvSettings, refresh: bool = False
+) -> dict[str, Any]:
+    # Predictions are cached per candle and model artifact, so a retrained model is used
+    # right away. A missing model is never cached: the caller queues training for it.
+    entry = model_registry.get(symbol, interval)
+    if entry is None:
+        return {"status": "model_missing"}
+    close, ttl = analysis_cache_slot(interval, cfg)
+    key = f"prediction:{symbol.upper()}:{interval}:{close}:{entry.version[0]}"
+    cache = get_cache()
+    if not refresh:
+        cached = await cache.get(key)
+        if cached is not None:
+            return {**cached, "cache": "hit"}
+    analysis = await cached_analysis(symbol, interval, limit, cfg, settings, refresh)
+    result = predict(analysis["frame"], symbol, interval)
+    await cache.set(key, result, ttl)
+    return {**result, "cache": "refresh" if refresh else "miss"}
+
+
+class PrecomputeScheduler:
+    # Keeps analyses and predictions of watched pairs in the cache. One loop per interval
+    # wakes up `delay_seconds` after each candle closes (and before a capped entry expires
+    # on long intervals) and refreshes its pairs, at most `concurrency` at a time overall.
+    def __init__(self) -> None:
+        self.enabled = False
+        self.watchlist: list[tuple[str, str]] = []
+        self.limit = 200
+        self.concurrency = 4
+        self.delay_seconds = 2.0
+        self._tasks: list[asyncio.Task[None]] = []
+        self._semaphore: asyncio.Semaphore | None = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh: dict[str, float] = {}
+
+    def configure(
+        self,
+        enabled: bool = True,
+        watchlist: list[dict[str, str]] | tuple[dict[str, str], ...] = (),
+        limit: int = 200,
+        concurrency: int = 4,
+        delay_seconds: float = 2.0,
+    ) -> None:
+        pairs = []
+        for item in watchlist:
+            if item["interval"] not in INTERVAL_MINUTES:
+                raise ValueError(f"Unsupported watchlist interval: {item['interval']}")
+            pairs.append((item["symbol"].upper(), item["interval"]))
+        self.enabled = enabled
+        self.watchlist = list(dict.fromkeys(pairs))
+        self.limit = limit
+        self.concurrency = concurrency
+        self.delay_seconds = delay_seconds
+
+    def start(self, load_config: Callable[[], Awaitable[dict[str, Any]]], settings: EnvSettings) -> None:
+        if not self.enabled or self._tasks:
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        by_interval: dict[str, list[str]] = defaultdict(list)
+        for symbol, interval in self.watchlist:
+            by_interval[interval].append(symbol)
+        self._tasks = [
+            asyncio.create_task(self._loop(interval, symbols, load_config, settings))
+            for interval, symbols in by_interval.items()
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def next_wakeup(self, interval: str, cfg: dict[str, Any], now: float | None = None) -> float:
+        now = time.time() if now is None else now
+        until_close = (candle_close_time(interval, int(now * 1000)) + 1) / 1000 - now
+        max_ttl = cfg["app"].get("analysis_cache_max_ttl_seconds", 300)
+        if max_ttl and max_ttl < until_close:
+            return max(max_ttl - self.delay_seconds, 1.0)
+        return until_close + self.delay_seconds
+
+    async def _loop(
+        self, interval: str, symbols: list[str], load_config: Callable[[], Awaitable[dict[str, Any]]], settings: EnvSettings
+    ) -> None:
+        while True:
+            try:
+                cfg = await load_config()
+                await self.refresh(interval, symbols, cfg, settings)
+            except Exception:
+                logger.exception("precompute cycle failed for %s", interval)
+                await asyncio.sleep(self.delay_seconds)
+                continue
+            await asyncio.sleep(self.next_wakeup(interval, cfg))
+
+    async def refresh(self, interval: str, symbols: list[str], cfg: dict[str, Any], settings: EnvSettings) -> None:
+        semaphore = self._semaphore or asyncio.Semaphore(self.concurrency)
+
+        async def one(symbol: str) -> None:
+            async with semaphore:
+                try:
+                    result = await cached_prediction(symbol, interval, self.limit, cfg, settings, refresh=True)
+                    if result["status"] == "model_missing":
+                        await cached_analysis(symbol, interval, self.limit, cfg, settings, refresh=True)
+                except Exception as exc:
+                    self.failures += 1
+                    logger.warning("precompute failed for %s %s: %r", symbol, interval, exc)
+                else:
+                    self.refreshes += 1
+                    self.last_refresh[f"{symbol}:{interval}"] = time.time()
+
+        await asyncio.gather(*(one(symbol) for symbol in symbols))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "watchlist": [f"{symbol}:{interval}" for symbol, interval in self.watchlist],
+            "running": sum(not task.done() for task in self._tasks),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh": dict(self.last_refresh),
+        }
+
+
+precompute_scheduler = PrecomputeScheduler()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.providers.http import http_pool
+from app.providers.market.binance import BinanceMarketDataProvider
+from app.providers.market.store import CandleStore, StoredMarketDataProvider
+from app.providers.social.reddit import REDDIT_API, REDDIT_AUTH, RedditProvider
+from app.providers.social.twitter import TWITTER_API, TwitterProvider
+from app.providers.throttle import rate_limiters
+
+
+@lru_cache(maxsize=32)
+def binance_provider(
+    base_url: str, timeout: int, symbols_ttl: float = 3600, limits: tuple[float, float, int, float, int] | None = None
+) -> BinanceMarketDataProvider:
+    # limits: (rate per second, burst, retries, backoff seconds, weight limit per minute).
+    rate, burst, retries, backoff, weight_limit = limits or (0, 0, 3, 0.5, 0)
+    return BinanceMarketDataProvider(
+        base_url,
+        timeout,
+        client=http_pool.client(base_url),
+        symbols_ttl_seconds=symbols_ttl,
+        limiter=rate_limiters.limiter(base_url, rate, burst or None),
+        retries=retries,
+        backoff_seconds=backoff,
+        weight_limit_per_minute=weight_limit,
+    )
+
+
+@lru_cache(maxsize=32)
+def stored_market_provider(
+    base_url: str,
+    timeout: int,
+    path: str,
+    max_rows: int,
+    symbols_ttl: float = 3600,
+    limits: tuple[float, float, int, float, int] | None = None,
+) -> StoredMarketDataProvider:
+    return StoredMarketDataProvider(binance_provider(base_url, timeout, symbols_ttl, limits), CandleStore(Path(path), max_rows))
+
+
+def market_limits(market: dict[str, Any]) -> tuple[float, float, int, float, int]:
+    return (
+        float(market.get("rate_limit_per_second", 0)),
+        float(market.get("rate_limit_burst", 0)),
+        int(market.get("max_retries", 3)),
+        float(market.get("retry_backoff_seconds", 0.5)),
+        int(market.get("weight_limit_per_minute", 0)),
+    )
+
+
+def market_provider(cfg: dict[str, Any]) -> BinanceMarketDataProvider | StoredMarketDataProvider:
+    base_url, timeout = cfg["market"]["base_url"], cfg["market"]["request_timeout_seconds"]
+    symbols_ttl = cfg["market"].get("symbols_ttl_seconds", 3600)
+    limits = market_limits(cfg["market"])
+    store_cfg = cfg["market"].get("candle_store", {})
+    if not store_cfg.get("enabled"):
+        return binance_provider(base_url, timeout, symbols_ttl, limits)
+    return stored_market_provider(base_url, timeout, store_cfg["path"], store_cfg["max_rows"], symbols_ttl, limits)
+
+
+@lru_cache(maxsize=8)
+def twitter_provider(bearer_token: str | None) -> TwitterProvider:
+    return TwitterProvider(bearer_token, client=http_pool.client(TWITTER_API))
+
+
+@lru_cache(maxsize=8)
+def reddit_provider(client_id: str | None, client_secret: str | None, user_agent: str) -> RedditProvider:
+    return RedditProvider(
+        client_id,
+        client_secret,
+        user_agent,
+        auth_client=http_pool.client(REDDIT_AUTH),
+        api_client=http_pool.client(REDDIT_API),
+    )
+
+
+def reset_providers() -> None:
+    for factory in (binance_provider, stored_market_provider, twitter_provider, reddit_provider):
+        factory.cache_clear()
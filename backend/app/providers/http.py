@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpClientPool:
+    # One keep-alive AsyncClient per upstream host, so connection limits apply per host
+    # and every provider call reuses warm TCP/TLS connections.
+    def __init__(self, options: dict[str, Any] | None = None) -> None:
+        self.options: dict[str, Any] = options or {}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def configure(self, options: dict[str, Any]) -> None:
+        self.options = options
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        host = urlsplit(url).netloc or url
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = self._build(host)
+            self._clients[host] = client
+        return client
+
+    def _build(self, host: str) -> httpx.AsyncClient:
+        opts = {**self.options, **self.options.get("per_host", {}).get(host, {})}
+        limits = httpx.Limits(
+            max_connections=opts.get("max_connections", 100),
+            max_keepalive_connections=opts.get("max_keepalive_connections", 20),
+            keepalive_expiry=opts.get("keepalive_expiry", 30),
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=bool(opts.get("http2", True)) and HTTP2_AVAILABLE,
+            timeout=opts.get("timeout_seconds", 10),
+            verify=opts.get("verify", True),
+        )
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+@asynccontextmanager
+async def borrow_client(client: httpx.AsyncClient | None, **kwargs: Any) -> AsyncIterator[httpx.AsyncClient]:
+    # Providers fall back to a short-lived client when no shared one was injected.
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient(**kwargs) as own:
+        yield own
+
+
+http_pool = HttpClientPool()
@@ -1,43 +1,118 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from typing import Any
 
 import httpx
 
+from app.providers.http import borrow_client
 from app.providers.market.base import MarketDataProvider
+from app.providers.market.symbols import SymbolIndex
+from app.providers.throttle import Coalescer, TokenBucket, send_with_retry
+
+KLINES_PAGE_LIMIT = 1000
+# Request weight Binance counts against the IP in the current minute.
+USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
 
 
 class BinanceMarketDataProvider(MarketDataProvider):
-    def __init__(self, base_url: str, timeout: int = 10) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 10,
+        client: httpx.AsyncClient | None = None,
+        symbols_ttl_seconds: float = 3600,
+        limiter: TokenBucket | None = None,
+        retries: int = 3,
+        backoff_seconds: float = 0.5,
+        weight_limit_per_minute: int = 0,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.client = client
+        self.symbols_ttl_seconds = symbols_ttl_seconds
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.weight_limit_per_minute = weight_limit_per_minute
+        self._ohlcv = Coalescer()
+        self._symbols: SymbolIndex | None = None
+        self._symbols_expires = 0.0
+        self._symbols_lock = asyncio.Lock()
+
+    async def symbol_index(self) -> SymbolIndex:
+        # exchangeInfo is several MB; download it once per TTL, not once per search.
+        async with self._symbols_lock:
+            if self._symbols is None or time.monotonic() >= self._symbols_expires:
+                async with borrow_client(self.client, timeout=self.timeout) as client:
+                    data = await self._get(client, "/api/v3/exchangeInfo")
+                self._symbols = SymbolIndex([s["symbol"] for s in data.get("symbols", [])])
+                self._symbols_expires = time.monotonic() + self.symbols_ttl_seconds
+            return self._symbols
+
+    async def _get(self, client: httpx.AsyncClient, path: str, params: dict[str, Any] | None = None) -> Any:
+        response = await send_with_retry(
+            client,
+            "GET",
+            f"{self.base_url}{path}",
+            self.limiter,
+            self.retries,
+            self.backoff_seconds,
+            params=params,
+            timeout=self.timeout,
+        )
+        used = response.headers.get(USED_WEIGHT_HEADER)
+        if self.limiter is not None and self.weight_limit_per_minute and used and int(used) >= self.weight_limit_per_minute:
+            # Out of weight for this minute: hold every caller until the window rolls over.
+            self.limiter.pause(60 - time.time() % 60)
+        response.raise_for_status()
+        return response.json()
 
     async def search_symbols(self, query: str) -> list[str]:
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/api/v3/exchangeInfo")
-            response.raise_for_status()
-            data = response.json()
-        symbols = [s["symbol"] for s in data.get("symbols", [])]
-        if not query:
-            return symbols[:100]
-        q = query.upper()
-        return [s for s in symbols if q in s][:100]
+        return (await self.symbol_index()).search(query)
 
     async def get_ohlcv(self, symbol: str, interval: str, limit: int) -> list[dict[str, Any]]:
-        params = {"symbol": symbol.upper(), "interval": interval, "limit": limit}
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/api/v3/klines", params=params)
-            response.raise_for_status()
-            rows = response.json()
+        # Identical concurrent requests share one upstream call; callers get the same list.
+        key = (symbol.upper(), interval, limit)
+        return await self._ohlcv.run(key, lambda: self._fetch_ohlcv(*key))
+
+    async def _fetch_ohlcv(self, symbol: str, interval: str, limit: int) -> list[dict[str, Any]]:
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        async with borrow_client(self.client, timeout=self.timeout) as client:
+            rows = await self._get(client, "/api/v3/klines", params)
+        return parse_klines(rows)
+
+    async def get_ohlcv_range(
+        self, symbol: str, interval: str, start_time: int, end_time: int | None = None
+    ) -> list[dict[str, Any]]:
         out: list[dict[str, Any]] = []
-        for r in rows:
-            out.append({
-                "open_time": r[0],
-                "open": float(r[1]),
-                "high": float(r[2]),
-                "low": float(r[3]),
-                "close": float(r[4]),
-                "volume": float(r[5]),
-                "close_time": r[6],
-            })
+        params: dict[str, Any] = {"symbol": symbol.upper(), "interval": interval, "limit": KLINES_PAGE_LIMIT}
+        if end_time is not None:
+            params["endTime"] = end_time
+        cursor = start_time
+        async with borrow_client(self.client, timeout=self.timeout) as client:
+            while True:
+                page = parse_klines(await self._get(client, "/api/v3/klines", {**params, "startTime": cursor}))
+                out.extend(page)
+                if len(page) < KLINES_PAGE_LIMIT:
+                    break
+                cursor = page[-1]["open_time"] + 1
+                if end_time is not None and cursor > end_time:
+                    break
         return out
+
+
+def parse_klines(rows: list[list[Any]]) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for r in rows:
+        out.append({
+            "open_time": r[0],
+            "open": float(r[1]),
+            "high": float(r[2]),
+            "low": float(r[3]),
+            "close": float(r[4]),
+            "volume": float(r[5]),
+            "close_time": r[6],
+        })
+    return out
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app.providers.market.base import INTERVAL_MINUTES, MarketDataProvider
+from app.providers.market.binance import BinanceMarketDataProvider
+from app.providers.throttle import Coalescer
+
+CANDLE_COLUMNS = ("open_time", "open", "high", "low", "close", "volume", "close_time")
+TIME_COLUMNS = ("open_time", "close_time")
+# Per-pair sync state is kept for at most this many (store, symbol, interval) keys.
+MAX_TRACKED_PAIRS = 4096
+
+
+# One (len(CANDLE_COLUMNS), n) float64 .npy file per symbol/interval. Each column is a
+# contiguous row of the matrix, so slices are served straight from a read-only memory
+# map; millisecond timestamps fit exactly in float64.
+class CandleStore:
+    def __init__(self, root: Path, max_rows: int = 100_000) -> None:
+        self.root = Path(root)
+        self.max_rows = max_rows
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / f"{symbol.upper()}_{interval}.npy"
+
+    def load(self, symbol: str, interval: str) -> np.ndarray | None:
+        path = self.path(symbol, interval)
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def open_time_range(self, symbol: str, interval: str) -> tuple[int, int] | None:
+        # First and last open_time of the contiguous tail: a store that was refreshed after
+        # going stale has a gap, and the candles before it do not count as stored history.
+        block = self.load(symbol, interval)
+        if block is None or block.shape[1] == 0:
+            return None
+        gaps = np.flatnonzero(np.diff(block[0]) != INTERVAL_MINUTES[interval] * 60_000)
+        return int(block[0, gaps[-1] + 1 if gaps.size else 0]), int(block[0, -1])
+
+    def merge(self, symbol: str, interval: str, candles: list[dict[str, Any]]) -> int:
+        # Blocking file I/O: the provider runs it in a worker thread.
+        if not candles:
+            return 0
+        incoming = np.array([[c[col] for c in candles] for col in CANDLE_COLUMNS], dtype=np.float64)
+        incoming = incoming[:, np.argsort(incoming[0], kind="stable")]
+        existing = self.load(symbol, interval)
+        if existing is not None and existing.shape[1] and incoming[0, 0] >= existing[0, 0]:
+            start = int(np.searchsorted(existing[0], incoming[0, 0]))
+            overlap = existing.shape[1] - start
+            if incoming.shape[1] >= overlap and np.array_equal(existing[0, start:], incoming[0, :overlap]):
+                if incoming.shape[1] == overlap:
+                    # Tail refresh without new candles: nothing to write unless the forming
+                    # candle moved, and then only its values are patched in place.
+                    changed = np.flatnonzero((existing[:, start:] != incoming).any(axis=0))
+                    if changed.size:
+                        block = np.load(self.path(symbol, interval), mmap_mode="r+")
+                        block[:, start + changed] = incoming[:, changed]
+                        block.flush()
+                    return existing.shape[1]
+                # New candles: the column-major layout needs a rewrite, once per candle.
+                return self._write(symbol, interval, np.concatenate([existing[:, :start], incoming], axis=1))
+        combined = incoming if existing is None else np.concatenate([incoming, existing], axis=1)
+        # np.unique keeps the first occurrence, so freshly fetched rows (e.g. the
+        # still-forming last candle) replace what was stored for the same open_time.
+        _, first = np.unique(combined[0], return_index=True)
+        return self._write(symbol, interval, combined[:, first])
+
+    def _write(self, symbol: str, interval: str, block: np.ndarray) -> int:
+        merged = np.ascontiguousarray(block[:, -self.max_rows :])
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(symbol, interval)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp.npy")
+        np.save(tmp, merged)
+        os.replace(tmp, path)
+        return merged.shape[1]
+
+    def frame(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        block = self.load(symbol, interval)
+        if block is None:
+            return pd.DataFrame(columns=list(CANDLE_COLUMNS))
+        # Copied: the forming candle is patched in place, and cached analyses hold this frame.
+        tail = np.array(block[:, -limit:])
+        columns = {
+            col: tail[i].astype(np.int64) if col in TIME_COLUMNS else tail[i]
+            for i, col in enumerate(CANDLE_COLUMNS)
+        }
+        return pd.DataFrame(columns, copy=False)
+
+
+class StoredMarketDataProvider(MarketDataProvider):
+    # Keyed by client-supplied symbols, so both are LRUs; a forgotten backfill only costs
+    # one more request, and locks are only dropped while free. _history_start maps a pair to
+    # (first stored open_time, earliest start already backfilled below it).
+    _locks: OrderedDict[tuple[str, str, str], asyncio.Lock] = OrderedDict()
+    _history_start: OrderedDict[tuple[str, str, str], tuple[int, int]] = OrderedDict()
+    _syncs = Coalescer()
+
+    def __init__(self, upstream: BinanceMarketDataProvider, store: CandleStore) -> None:
+        self.upstream = upstream
+        self.store = store
+
+    async def search_symbols(self, query: str) -> list[str]:
+        return await self.upstream.search_symbols(query)
+
+    async def get_ohlcv(self, symbol: str, interval: str, limit: int) -> list[dict[str, Any]]:
+        return (await self.get_ohlcv_frame(symbol, interval, limit)).to_dict(orient="records")
+
+    async def get_ohlcv_frame(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        # Concurrent requests for the same window wait on one sync instead of queueing on the lock.
+        key = (str(self.store.root), symbol.upper(), interval, limit)
+        await self._syncs.run(key, lambda: self.sync(symbol, interval, limit))
+        return self.store.frame(symbol, interval, limit)
+
+    @classmethod
+    def _lock(cls, key: tuple[str, str, str]) -> asyncio.Lock:
+        lock = cls._locks.pop(key, None) or asyncio.Lock()
+        cls._locks[key] = lock
+        if len(cls._locks) > MAX_TRACKED_PAIRS:
+            idle = next((k for k, v in cls._locks.items() if not v.locked()), None)
+            if idle is not None:
+                del cls._locks[idle]
+        return lock
+
+    @classmethod
+    def _remember_history_start(cls, key: tuple[str, str, str], history_start: tuple[int, int]) -> None:
+        cls._history_start[key] = history_start
+        cls._history_start.move_to_end(key)
+        while len(cls._history_start) > MAX_TRACKED_PAIRS:
+            cls._history_start.popitem(last=False)
+
+    async def sync(self, symbol: str, interval: str, limit: int) -> None:
+        key = (str(self.store.root), symbol.upper(), interval)
+        async with self._lock(key):
+            step = INTERVAL_MINUTES[interval] * 60_000
+            now = int(time.time() * 1000)
+            wanted_start = now - now % step - (min(limit, self.store.max_rows) - 1) * step
+            stored = self.store.open_time_range(symbol, interval)
+
+            if stored is None:
+                candles = await self.upstream.get_ohlcv_range(symbol, interval, wanted_start)
+            else:
+                first, last = stored
+                # Refetch from the last stored candle (it may still have been forming), but
+                # not from before the requested window: a stale store is not paged through.
+                # The gap this leaves is filled by the backfill if a later request needs it.
+                candles = await self.upstream.get_ohlcv_range(symbol, interval, max(last, wanted_start))
+                tried = self._history_start.get(key)
+                if first > wanted_start and not (tried and tried[0] == first and tried[1] <= wanted_start):
+                    older = await self.upstream.get_ohlcv_range(symbol, interval, wanted_start, first - 1)
+                    history_start = older[0]["open_time"] if older else first
+                    if history_start > wanted_start:
+                        # Nothing older exists upstream (recent listing); stop asking.
+                        self._remember_history_start(key, (history_start, 0))
+                    else:
+                        # Upstream may itself have a gap right before `first`; ask once.
+                        self._remember_history_start(key, (first, wanted_start))
+                    candles = older + candles
+            await asyncio.to_thread(self.store.merge, symbol, interval, candles)
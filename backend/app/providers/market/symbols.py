@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+
+
+class SymbolIndex:
+    # Built once per exchangeInfo download. An exact match ranks first, then prefix matches
+    # from a sorted copy via bisect, then substring matches found by str.find over one
+    # newline-joined string, so a query never walks the whole list in Python.
+    def __init__(self, symbols: list[str]) -> None:
+        self.symbols = list(dict.fromkeys(symbols))
+        self._sorted = sorted(self.symbols)
+        self._known = set(self.symbols)
+        self._starts: list[int] = []
+        offset = 1
+        for symbol in self.symbols:
+            self._starts.append(offset)
+            offset += len(symbol) + 1
+        self._blob = "\n" + "\n".join(self.symbols) + "\n"
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def search(self, query: str, limit: int = 100) -> list[str]:
+        if not query:
+            return self.symbols[:limit]
+        q = query.upper()
+        if "\n" in q:
+            return []
+        out: list[str] = [q] if q in self._known else []
+        for symbol in self._sorted[bisect_left(self._sorted, q) :]:
+            if not symbol.startswith(q) or len(out) >= limit:
+                break
+            if symbol != q:
+                out.append(symbol)
+        seen = set(out)
+        pos = self._blob.find(q)
+        while pos != -1 and len(out) < limit:
+            i = bisect_right(self._starts, pos) - 1
+            symbol = self.symbols[i]
+            if symbol not in seen:
+                out.append(symbol)
+            pos = self._blob.find(q, self._starts[i] + len(symbol) + 1)
+        return out
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Any
 
 
 class SocialProvider(ABC):
+    # `cursor` is what an earlier ingestion recorded for the same query ({"since_id": ...,
+    # "newest_created": epoch seconds}); providers return only posts newer than it. Posts
+    # carry the upstream "id" so they can be deduplicated.
     @abstractmethod
-    async def fetch_posts(self, keywords: list[str], limit: int) -> list[dict]:
+    async def fetch_posts(self, keywords: list[str], limit: int, cursor: dict[str, Any] | None = None) -> list[dict]:
         raise NotImplementedError
@@ -1,34 +1,77 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from typing import Any
+
 import httpx
 
+from app.providers.http import borrow_client
 from app.providers.social.base import SocialProvider
 
+REDDIT_AUTH = "https://www.reddit.com"
+REDDIT_API = "https://oauth.reddit.com"
+# Refresh the application token this long before Reddit says it expires.
+TOKEN_MARGIN_SECONDS = 60
+
 
 class RedditProvider(SocialProvider):
-    def __init__(self, client_id: str | None, client_secret: str | None, user_agent: str) -> None:
+    def __init__(
+        self,
+        client_id: str | None,
+        client_secret: str | None,
+        user_agent: str,
+        auth_client: httpx.AsyncClient | None = None,
+        api_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.client_id = client_id
         self.client_secret = client_secret
         self.user_agent = user_agent
+        self.auth_client = auth_client
+        self.api_client = api_client
+        self._token: str | None = None
+        self._token_expires = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def access_token(self, refresh: bool = False) -> str | None:
+        # Client-credential tokens last an hour; share one until shortly before expiry.
+        async with self._token_lock:
+            if refresh or self._token is None or time.monotonic() >= self._token_expires:
+                async with borrow_client(self.auth_client, timeout=10) as client:
+                    token_response = await client.post(
+                        f"{REDDIT_AUTH}/api/v1/access_token",
+                        auth=(self.client_id, self.client_secret),
+                        data={"grant_type": "client_credentials"},
+                        headers={"User-Agent": self.user_agent},
+                        timeout=10,
+                    )
+                    token_response.raise_for_status()
+                    payload = token_response.json()
+                self._token = payload.get("access_token")
+                lifetime = float(payload.get("expires_in", 3600))
+                self._token_expires = time.monotonic() + max(lifetime - TOKEN_MARGIN_SECONDS, 0)
+            return self._token
 
-    async def fetch_posts(self, keywords: list[str], limit: int) -> list[dict]:
+    async def fetch_posts(self, keywords: list[str], limit: int, cursor: dict[str, Any] | None = None) -> list[dict]:
         if not self.client_id or not self.client_secret:
             return []
         query = " OR ".join(keywords)
-        async with httpx.AsyncClient(timeout=10, headers={"User-Agent": self.user_agent}) as client:
-            token_response = await client.post(
-                "https://www.reddit.com/api/v1/access_token",
-                auth=(self.client_id, self.client_secret),
-                data={"grant_type": "client_credentials"},
-            )
-            token_response.raise_for_status()
-            token = token_response.json().get("access_token")
-            headers = {"Authorization": f"bearer {token}", "User-Agent": self.user_agent}
-            search_response = await client.get(
-                "https://oauth.reddit.com/r/all/search",
-                params={"q": query, "limit": limit, "sort": "new", "restrict_sr": False},
-                headers=headers,
-            )
+        params = {"q": query, "limit": limit, "sort": "new", "restrict_sr": False}
+        async with borrow_client(self.api_client, timeout=10) as client:
+            for attempt in range(2):
+                token = await self.access_token(refresh=attempt > 0)
+                headers = {"Authorization": f"bearer {token}", "User-Agent": self.user_agent}
+                search_response = await client.get(f"{REDDIT_API}/r/all/search", params=params, headers=headers, timeout=10)
+                if search_response.status_code != 401:
+                    break
             search_response.raise_for_status()
             children = search_response.json().get("data", {}).get("children", [])
-        return [{"text": c.get("data", {}).get("title", ""), "created_at": c.get("data", {}).get("created_utc")} for c in children]
+        # Search has no "since" parameter: results are newest first, so stop at the cursor.
+        newest = float((cursor or {}).get("newest_created") or 0)
+        posts = []
+        for child in children:
+            data = child.get("data", {})
+            if data.get("created_utc") is not None and float(data["created_utc"]) <= newest:
+                break
+            posts.append({"id": data.get("name"), "text": data.get("title", ""), "created_at": data.get("created_utc")})
+        return posts
@@ -1,22 +1,30 @@
 from __future__ import annotations
 
+from typing import Any
+
 import httpx
 
+from app.providers.http import borrow_client
 from app.providers.social.base import SocialProvider
 
+TWITTER_API = "https://api.twitter.com"
+
 
 class TwitterProvider(SocialProvider):
-    def __init__(self, bearer_token: str | None) -> None:
+    def __init__(self, bearer_token: str | None, client: httpx.AsyncClient | None = None) -> None:
         self.bearer_token = bearer_token
+        self.client = client
 
-    async def fetch_posts(self, keywords: list[str], limit: int) -> list[dict]:
+    async def fetch_posts(self, keywords: list[str], limit: int, cursor: dict[str, Any] | None = None) -> list[dict]:
         if not self.bearer_token:
             return []
         query = " OR ".join(keywords)
         headers = {"Authorization": f"Bearer {self.bearer_token}"}
         params = {"query": query, "max_results": min(100, limit), "tweet.fields": "created_at,text"}
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get("https://api.twitter.com/2/tweets/search/recent", params=params, headers=headers)
+        if cursor and cursor.get("since_id"):
+            params["since_id"] = cursor["since_id"]
+        async with borrow_client(self.client, timeout=10) as client:
+            response = await client.get(f"{TWITTER_API}/2/tweets/search/recent", params=params, headers=headers, timeout=10)
             response.raise_for_status()
             data = response.json().get("data", [])
-        return [{"text": d.get("text", ""), "created_at": d.get("created_at")} for d in data]
+        return [{"id": d.get("id"), "text": d.get("text", ""), "created_at": d.get("created_at")} for d in data]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+T = TypeVar("T")
+
+# 418 is Binance's answer to clients that kept going after a 429 (an IP ban).
+THROTTLED_STATUSES = frozenset({418, 429})
+RETRY_STATUSES = THROTTLED_STATUSES | {500, 502, 503, 504}
+
+
+class TokenBucket:
+    # Refills `rate` tokens per second up to `burst`. Waiters are served in arrival order,
+    # and pause() stops everyone until an upstream-imposed cool-down has passed.
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self.burst = burst or max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self.pauses = 0
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    break
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+        self.acquired += 1
+        self.waited_seconds += time.monotonic() - start
+
+    def pause(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0.0
+            self.pauses += 1
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "pauses": self.pauses,
+        }
+
+
+class RateLimiterPool:
+    # One bucket per upstream host, shared by every provider instance talking to it.
+    def __init__(self) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def limiter(self, url: str, rate: float, burst: float | None = None) -> TokenBucket:
+        host = urlsplit(url).netloc or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        else:
+            bucket.rate, bucket.burst = rate, burst or max(rate, 1.0)
+        return bucket
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {host: bucket.stats() for host, bucket in self._buckets.items()}
+
+
+def retry_after_seconds(headers: httpx.Headers) -> float | None:
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(parsed.timestamp() - time.time(), 0.0)
+
+
+async def send_with_retry(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    limiter: TokenBucket | None = None,
+    retries: int = 3,
+    backoff_seconds: float = 0.5,
+    **kwargs: Any,
+) -> httpx.Response:
+    # Retries throttling, server errors and transport failures with exponential backoff.
+    # A Retry-After header wins over the backoff and pauses the whole host bucket, so
+    # concurrent callers stop too instead of each collecting their own 429.
+    attempt = 0
+    while True:
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt >= retries:
+                raise
+            delay = backoff_seconds * 2**attempt
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            retry_after = retry_after_seconds(response.headers)
+            delay = backoff_seconds * 2**attempt if retry_after is None else retry_after
+            if limiter is not None and response.status_code in THROTTLED_STATUSES:
+                limiter.pause(delay)
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+class Coalescer:
+    # Concurrent calls with the same key share one in-flight task. Callers await it through
+    # a shield, so one caller timing out does not cancel the fetch for the others.
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self.shared = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._done, key))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller gave up waiting.
+            task.exception()
+
+
+rate_limiters = RateLimiterPool()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline, make_pipeline
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# VADER's compound normalisation: x / sqrt(x^2 + alpha).
+VADER_ALPHA = 15.0
+TOKEN_PATTERN = r"(?u)\b[\w']+\b"
+
+
+@lru_cache(maxsize=1)
+def get_analyzer() -> SentimentIntensityAnalyzer:
+    # Building the analyzer parses the VADER lexicon from disk; do it once per process.
+    return SentimentIntensityAnalyzer()
+
+
+class SentimentBackend(ABC):
+    name = ""
+
+    def __init__(self) -> None:
+        self.texts_scored = 0
+        self.seconds = 0.0
+
+    def score_texts(self, texts: list[str]) -> list[float]:
+        if not texts:
+            return []
+        start = time.perf_counter()
+        scores = self._score(texts)
+        self.seconds += time.perf_counter() - start
+        self.texts_scored += len(texts)
+        return scores
+
+    @abstractmethod
+    def _score(self, texts: list[str]) -> list[float]:
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, float | int | str]:
+        return {
+            "backend": self.name,
+            "texts_scored": self.texts_scored,
+            "seconds": self.seconds,
+            "texts_per_second": self.texts_scored / self.seconds if self.seconds else 0.0,
+        }
+
+
+BACKENDS: dict[str, Callable[[str | None], SentimentBackend]] = {}
+
+
+def register_backend(name: str):
+    def decorator(cls: type[SentimentBackend]) -> type[SentimentBackend]:
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+
+    return decorator
+
+
+_instances: dict[tuple[str, str | None], SentimentBackend] = {}
+
+
+def get_backend(name: str, model_path: str | None = None) -> SentimentBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment model: {name}")
+    key = (name, model_path)
+    if key not in _instances:
+        _instances[key] = BACKENDS[name](model_path)
+    return _instances[key]
+
+
+def backend_stats() -> list[dict[str, float | int | str]]:
+    # Only backends loaded in this process; pooled scoring is counted in the workers.
+    return [backend.stats() for backend in _instances.values()]
+
+
+@register_backend("vader")
+class VaderBackend(SentimentBackend):
+    def __init__(self, model_path: str | None = None) -> None:
+        super().__init__()
+        self.analyzer = get_analyzer()
+
+    def _score(self, texts: list[str]) -> list[float]:
+        return [self.analyzer.polarity_scores(text)["compound"] for text in texts]
+
+
+@register_backend("lexicon")
+class LexiconBackend(SentimentBackend):
+    # The VADER lexicon compiled into a token -> valence vector: a batch is one sparse
+    # token-count matrix times the weight vector. Ignores VADER's negation, booster and
+    # punctuation heuristics, trading some accuracy for throughput.
+    def __init__(self, model_path: str | None = None) -> None:
+        super().__init__()
+        lexicon = {word: valence for word, valence in get_analyzer().lexicon.items() if word.isascii()}
+        self.vectorizer = CountVectorizer(vocabulary=sorted(lexicon), token_pattern=TOKEN_PATTERN, lowercase=True)
+        self.weights = np.array([lexicon[w] for w in self.vectorizer.vocabulary], dtype=np.float64)
+
+    def _score(self, texts: list[str]) -> list[float]:
+        totals = self.vectorizer.transform(texts) @ self.weights
+        return (totals / np.sqrt(totals * totals + VADER_ALPHA)).tolist()
+
+
+@register_backend("sklearn")
+class SklearnBackend(SentimentBackend):
+    # A TF-IDF + linear classifier pipeline trained offline (see train_linear_sentiment);
+    # the positive-class probability is mapped onto VADER's [-1, 1] range.
+    def __init__(self, model_path: str | None = None) -> None:
+        super().__init__()
+        if not model_path or not Path(model_path).exists():
+            raise ValueError("sklearn sentiment model requires social.sentiment_model_path to an existing artifact")
+        self.pipeline: Pipeline = joblib.load(model_path)
+
+    def _score(self, texts: list[str]) -> list[float]:
+        return (self.pipeline.predict_proba(texts)[:, 1] * 2 - 1).tolist()
+
+
+def train_linear_sentiment(texts: list[str], labels: list[int], path: Path) -> Pipeline:
+    pipeline = make_pipeline(
+        TfidfVectorizer(token_pattern=TOKEN_PATTERN, ngram_range=(1, 2), min_df=2, sublinear_tf=True),
+        LogisticRegression(max_iter=1000),
+    )
+    pipeline.fit(texts, labels)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipeline, path)
+    return pipeline
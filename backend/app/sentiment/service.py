@@ -1,27 +1,167 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import numpy as np
+import pandas as pd
+
+from app.sentiment.backends import get_backend
 
 
 def generate_keywords(symbol: str, rules: dict[str, Any]) -> list[str]:
     base = symbol.replace("USDT", "")
     words = [symbol, base]
     extras = rules.get("extra_keywords", [])
-    return list(dict.fromkeys([w for w in words + extras if w]))
+    return list(dict.fromkeys([w for w in [*words, *extras] if w]))
+
+
+class ScoreCache:
+    def __init__(self, max_entries: int = 50_000) -> None:
+        self.max_entries = max_entries
+        self._scores: OrderedDict[bytes, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(text: str, model: str = "vader") -> bytes:
+        return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> float | None:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: bytes, score: float) -> None:
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._scores),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+score_cache = ScoreCache()
+
+
+class _CachedScores:
+    # Cache lookup and fill shared by score_posts and ScoringExecutor.score: `missing`
+    # lists each uncached text once; fill() caches their scores and returns scored posts.
+    def __init__(self, posts: list[dict[str, Any]], model: str, cache: ScoreCache | None) -> None:
+        self.posts = posts
+        self.cache = cache
+        self.texts = [post.get("text", "") for post in posts]
+        self.keys = [ScoreCache.key(text, model) for text in self.texts] if cache is not None else []
+        self.scores = [cache.get(key) for key in self.keys] if cache is not None else [None] * len(self.texts)
+        self.missing = list(dict.fromkeys(self.texts[i] for i, score in enumerate(self.scores) if score is None))
+
+    def fill(self, fresh_scores: list[float]) -> list[dict[str, Any]]:
+        fresh = dict(zip(self.missing, fresh_scores))
+        if self.cache is not None:
+            for text, key in zip(self.texts, self.keys):
+                if text in fresh:
+                    self.cache.put(key, fresh[text])
+        return [
+            {**post, "score": score if score is not None else fresh[text]}
+            for post, text, score in zip(self.posts, self.texts, self.scores)
+        ]
+
+
+def score_posts(
+    posts: list[dict[str, Any]], model: str = "vader", model_path: str | None = None, cache: ScoreCache | None = score_cache
+) -> list[dict[str, Any]]:
+    # Synchronous counterpart of ScoringExecutor.score: same backend and cache keys, inline.
+    lookup = _CachedScores(posts, model, cache)
+    return lookup.fill(_score_texts(lookup.missing, model, model_path))
+
+
+def _score_texts(texts: list[str], model: str = "vader", model_path: str | None = None) -> list[float]:
+    return get_backend(model, model_path).score_texts(texts)
+
+
+class ScoringExecutor:
+    # Scoring is CPU-bound (VADER is pure Python): large batches of cache misses are chunked
+    # across a process pool and awaited, so the event loop keeps serving other requests.
+    def __init__(self, mode: str = "inline", workers: int = 0, min_batch: int = 500, chunk_size: int = 250) -> None:
+        self._pool: ProcessPoolExecutor | None = None
+        self.configure(mode, workers, min_batch, chunk_size)
+
+    def configure(self, mode: str, workers: int = 0, min_batch: int = 500, chunk_size: int = 250) -> None:
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown scoring mode: {mode}")
+        workers = workers or os.cpu_count() or 1
+        if self._pool is not None and workers != self.workers:
+            self.shutdown()
+        self.mode = mode
+        self.workers = workers
+        self.min_batch = min_batch
+        self.chunk_size = chunk_size
+
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
 
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
 
-def score_posts(posts: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    analyzer = SentimentIntensityAnalyzer()
-    scored = []
-    for post in posts:
-        text = post.get("text", "")
-        compound = analyzer.polarity_scores(text)["compound"]
-        scored.append({**post, "score": compound})
-    return scored
+    async def score(
+        self,
+        posts: list[dict[str, Any]],
+        model: str = "vader",
+        model_path: str | None = None,
+        cache: ScoreCache | None = score_cache,
+    ) -> list[dict[str, Any]]:
+        lookup = _CachedScores(posts, model, cache)
+        missing = lookup.missing
+        if self.mode == "process" and len(missing) >= self.min_batch:
+            loop = asyncio.get_running_loop()
+            pool = self.pool()
+            chunks = [missing[i : i + self.chunk_size] for i in range(0, len(missing), self.chunk_size)]
+            results = await asyncio.gather(*(loop.run_in_executor(pool, _score_texts, chunk, model, model_path) for chunk in chunks))
+            return lookup.fill([score for chunk in results for score in chunk])
+        return lookup.fill(_score_texts(missing, model, model_path))
+
+scoring_executor = ScoringExecutor()
+
+
+def iso_epoch(text: str) -> int:
+    # ISO timestamps without an offset are UTC (never the server's local time).
+    dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
 
 
 def aggregate_sentiment(scored_posts: list[dict[str, Any]], interval_minutes: int) -> list[dict[str, Any]]:
@@ -30,8 +170,7 @@ def aggregate_sentiment(scored_posts: list[dict[str, Any]], interval_minutes: in
     for post in scored_posts:
         ts = post.get("created_at")
         if isinstance(ts, str):
-            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-            epoch = int(dt.timestamp())
+            epoch = iso_epoch(ts)
         else:
             epoch = int(ts or datetime.now(tz=timezone.utc).timestamp())
         bucket = epoch - (epoch % interval_secs)
@@ -41,3 +180,99 @@ def aggregate_sentiment(scored_posts: list[dict[str, Any]], interval_minutes: in
         {"bucket": b, "sentiment": sum(vals) / len(vals), "count": len(vals)}
         for b, vals in sorted(buckets.items())
     ]
+
+
+def _days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    # Days since 1970-01-01 for proleptic Gregorian dates (H. Hinnant's algorithm).
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def parse_iso_utc(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    # Parses "YYYY-MM-DDTHH:MM:SS[.fff](Z|+00:00)" strings with integer arithmetic on their
+    # code points; without an offset they are taken as UTC, like iso_epoch. Returns epoch
+    # seconds and a mask of the strings that matched that form.
+    arr = np.array(strings)
+    if arr.dtype.itemsize // 4 < 19:
+        return np.zeros(len(strings), dtype=np.int64), np.zeros(len(strings), dtype=bool)
+    codes = arr.astype("U19").view(np.uint32).reshape(len(strings), 19).astype(np.int64)
+    digits = codes - 48
+
+    def number(start: int, width: int) -> np.ndarray:
+        out = np.zeros(len(strings), dtype=np.int64)
+        for i in range(start, start + width):
+            out = out * 10 + digits[:, i]
+        return out
+
+    numeric = digits[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]]
+    valid = np.all((numeric >= 0) & (numeric <= 9), axis=1)
+    for pos, char in ((4, "-"), (7, "-"), (10, "T"), (13, ":"), (16, ":")):
+        valid &= codes[:, pos] == ord(char)
+    valid &= np.char.endswith(arr, "Z") | np.char.endswith(arr, "+00:00") | (np.char.str_len(arr) == 19)
+
+    days = _days_from_civil(number(0, 4), number(5, 2), number(8, 2))
+    return days * 86400 + number(11, 2) * 3600 + number(14, 2) * 60 + number(17, 2), valid
+
+
+def parse_epochs(values: list[Any]) -> np.ndarray:
+    # Same rules as aggregate_sentiment: ISO strings are parsed (naive ones as UTC), numbers
+    # are epoch seconds, missing timestamps fall into the current bucket. UTC ISO strings
+    # (what the providers return) are parsed in bulk; anything else goes through iso_epoch.
+    epochs = np.empty(len(values), dtype=np.int64)
+    text_idx = [i for i, v in enumerate(values) if type(v) is str]
+    if len(text_idx) != len(values):
+        now = int(datetime.now(tz=timezone.utc).timestamp())
+        other_idx = [i for i, v in enumerate(values) if type(v) is not str]
+        epochs[other_idx] = np.array([values[i] or now for i in other_idx], dtype=np.float64).astype(np.int64)
+    if text_idx:
+        texts = [values[i] for i in text_idx]
+        parsed, valid = parse_iso_utc(texts)
+        for j in np.flatnonzero(~valid).tolist():
+            parsed[j] = iso_epoch(texts[j])
+        epochs[text_idx] = parsed
+    return epochs
+
+
+def aggregate_sentiment_columnar(
+    scored_posts: list[dict[str, Any]], interval_minutes: int, weight_key: str = "weight"
+) -> list[dict[str, Any]]:
+    if not scored_posts:
+        return []
+    epochs = parse_epochs([post.get("created_at") for post in scored_posts])
+    scores = np.array([post["score"] for post in scored_posts], dtype=np.float64)
+    weights = np.array([post.get(weight_key, 1.0) for post in scored_posts], dtype=np.float64)
+
+    interval_secs = interval_minutes * 60
+    buckets, inverse = np.unique(epochs - epochs % interval_secs, return_inverse=True)
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=scores) / counts
+    spread = np.bincount(inverse, weights=scores * scores) / counts - means * means
+    weight_totals = np.bincount(inverse, weights=weights)
+    weighted = np.bincount(inverse, weights=weights * scores) / np.where(weight_totals == 0, 1, weight_totals)
+
+    return [
+        {"bucket": b, "sentiment": m, "count": c, "weighted_sentiment": w, "std": s}
+        for b, m, c, w, s in zip(
+            buckets.tolist(), means.tolist(), counts.tolist(), weighted.tolist(), np.sqrt(np.maximum(spread, 0)).tolist()
+        )
+    ]
+
+
+def align_to_candles(timeline: list[dict[str, Any]], open_times_ms: np.ndarray) -> pd.DataFrame:
+    # Buckets are floored to the candle interval, so a bucket start equals the open_time
+    # of the candle it belongs to; candles without posts get zero sentiment and count.
+    aligned = pd.DataFrame(
+        {"sentiment": np.zeros(len(open_times_ms)), "sentiment_count": np.zeros(len(open_times_ms), dtype=np.int64)}
+    )
+    if not timeline or len(open_times_ms) == 0:
+        return aligned
+    starts = np.array([row["bucket"] for row in timeline], dtype=np.int64) * 1000
+    pos = np.searchsorted(open_times_ms, starts)
+    hit = (pos < len(open_times_ms)) & (open_times_ms[np.minimum(pos, len(open_times_ms) - 1)] == starts)
+    aligned.loc[pos[hit], "sentiment"] = np.array([row["sentiment"] for row in timeline])[hit]
+    aligned.loc[pos[hit], "sentiment_count"] = np.array([row["count"] for row in timeline])[hit]
+    return aligned
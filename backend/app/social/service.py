@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import SocialCursor, SocialPost
+from app.db.session import AsyncSessionLocal
+from app.providers.social.base import SocialProvider
+from app.sentiment.service import parse_epochs, scoring_executor
+
+
+# Upserts for the databases we deploy on: concurrent workers ingesting the same query
+# must not trip the unique constraints, so conflicts are resolved by the database.
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def post_id(post: dict[str, Any]) -> str:
+    if post.get("id"):
+        return str(post["id"])
+    return hashlib.blake2b(f"{post.get('created_at')}\0{post.get('text', '')}".encode(), digest_size=16).hexdigest()
+
+
+class PostStore:
+    # Scored posts per (source, query) with the cursor of the newest one ingested, so each
+    # search only asks upstream for posts it has not seen yet. Rows older than
+    # `retention_seconds` (the sentiment window) are pruned on each save.
+    def __init__(self, session_factory: Callable[[], AsyncSession], retention_seconds: float | None = None) -> None:
+        self.session_factory = session_factory
+        self.retention_seconds = retention_seconds
+
+    async def cursor(self, source: str, query: str) -> dict[str, Any] | None:
+        async with self.session_factory() as db:
+            row = await db.get(SocialCursor, (source, query))
+            return {"since_id": row.since_id, "newest_created": row.newest_created} if row is not None else None
+
+    async def save(self, source: str, query: str, posts: list[dict[str, Any]], model: str) -> int:
+        if not posts:
+            return 0
+        epochs = parse_epochs([post.get("created_at") for post in posts]).tolist()
+        by_id = {post_id(post): (post, epoch) for post, epoch in zip(posts, epochs)}
+        newest_key, (_, newest_epoch) = max(by_id.items(), key=lambda item: item[1][1])
+        async with self.session_factory() as db:
+            insert = _INSERTS[db.bind.dialect.name]
+            result = await db.execute(
+                insert(SocialPost)
+                .values(
+                    [
+                        {
+                            "source": source,
+                            "query": query,
+                            "external_id": key,
+                            "text": post.get("text", ""),
+                            "created_at": float(epoch),
+                            "score": float(post["score"]),
+                            "model": model,
+                        }
+                        for key, (post, epoch) in by_id.items()
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["source", "query", "external_id"])
+            )
+            stmt = insert(SocialCursor).values(
+                source=source, query=query, since_id=newest_key, newest_created=float(newest_epoch)
+            )
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["source", "query"],
+                    set_={
+                        "since_id": stmt.excluded.since_id,
+                        "newest_created": stmt.excluded.newest_created,
+                        "updated_at": func.now(),
+                    },
+                    where=or_(
+                        SocialCursor.newest_created.is_(None),
+                        SocialCursor.newest_created <= stmt.excluded.newest_created,
+                    ),
+                )
+            )
+            if self.retention_seconds is not None:
+                await db.execute(
+                    delete(SocialPost).where(
+                        SocialPost.source == source,
+                        SocialPost.query == query,
+                        SocialPost.created_at < time.time() - self.retention_seconds,
+                    )
+                )
+            await db.commit()
+            return result.rowcount
+
+    async def window(self, query: str, since: float, limit: int) -> list[dict[str, Any]]:
+        async with self.session_factory() as db:
+            rows = (
+                await db.execute(
+                    select(SocialPost)
+                    .where(SocialPost.query == query, SocialPost.created_at >= since)
+                    .order_by(SocialPost.created_at.desc())
+                    .limit(limit)
+                )
+            ).scalars()
+            return [
+                {"id": r.id, "text": r.text, "created_at": r.created_at, "score": r.score, "model": r.model, "source": r.source}
+                for r in rows
+            ]
+
+    async def rescore(self, posts: list[dict[str, Any]], model: str) -> None:
+        # Writes back scores from a new model so the next read does not score them again.
+        async with self.session_factory() as db:
+            await db.execute(update(SocialPost), [{"id": p["id"], "score": float(p["score"]), "model": model} for p in posts])
+            await db.commit()
+
+
+async def ingest_posts(
+    store: PostStore,
+    source: str,
+    provider: SocialProvider,
+    keywords: list[str],
+    limit: int,
+    model: str = "vader",
+    model_path: str | None = None,
+) -> int:
+    query = " OR ".join(keywords)
+    posts = await provider.fetch_posts(keywords, limit, await store.cursor(source, query))
+    scored = await scoring_executor.score(posts, model, model_path)
+    return await store.save(source, query, scored, model)
+
+
+async def stored_posts(
+    store: PostStore, keywords: list[str], window_hours: float, limit: int, model: str = "vader", model_path: str | None = None
+) -> list[dict[str, Any]]:
+    # Posts scored by a different model before a config change are rescored on read and
+    # persisted with the new model.
+    posts = await store.window(" OR ".join(keywords), time.time() - window_hours * 3600, limit)
+    stale = [i for i, post in enumerate(posts) if post["model"] != model]
+    if stale:
+        rescored = await scoring_executor.score([posts[i] for i in stale], model, model_path)
+        for i, post in zip(stale, rescored):
+            posts[i] = {**post, "model": model}
+        await store.rescore([posts[i] for i in stale], model)
+    return posts
+
+
+post_store = PostStore(AsyncSessionLocal)
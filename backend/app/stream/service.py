@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = b": ping\n\n"
+
+
+def sse_event(event: str, data: dict[str, Any]) -> bytes:
+    # Same encoder as the JSON responses: warm-up NaNs become null, which JSON.parse accepts.
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+
+
+def _same(a: Any, b: Any) -> bool:
+    # Equality that treats NaN as equal to itself, so warm-up rows are not re-sent every poll.
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(v, b[k]) for k, v in a.items())
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def row_delta(rows: list[dict[str, Any]], previous: list[dict[str, Any]], key: str = "open_time") -> list[dict[str, Any]]:
+    # Rows from the previous last one on that are new or changed (the forming candle).
+    if not previous or key not in previous[-1]:
+        return [] if _same(rows, previous) else rows
+    last = previous[-1]
+    start = bisect_left([row[key] for row in rows], last[key])
+    return [row for row in rows[start:] if not _same(row, last)]
+
+
+class Topic:
+    def __init__(self, symbol: str, interval: str) -> None:
+        self.symbol = symbol
+        self.interval = interval
+        self.subscribers: set[asyncio.Queue[bytes]] = set()
+        self.task: asyncio.Task[None] | None = None
+        self.state: dict[str, Any] | None = None
+        self.frame: Any = None
+        self.seq = 0
+        self._snapshot: bytes | None = None
+
+    def snapshot(self) -> bytes | None:
+        if self.state is not None and self._snapshot is None:
+            self._snapshot = sse_event("snapshot", {"seq": self.seq, "symbol": self.symbol, "interval": self.interval, **self.state})
+        return self._snapshot
+
+    def update(self, analysis: dict[str, Any], indicator_rows: int) -> bytes | None:
+        # The in-memory cache hands back the same frame until the analysis is recomputed.
+        if analysis["frame"] is self.frame:
+            return None
+        self.frame = analysis["frame"]
+        state = {
+            "candles": analysis["candles"].to_dict(orient="records"),
+            "indicators": analysis["frame"].tail(indicator_rows).to_dict(orient="records"),
+            "sentiment_timeline": analysis["sentiment_timeline"],
+            "signals": analysis["signals"],
+        }
+        previous, self.state, self._snapshot = self.state, state, None
+        self.seq += 1
+        if previous is None:
+            return self.snapshot()
+        delta: dict[str, Any] = {
+            "candles": row_delta(state["candles"], previous["candles"]),
+            "indicators": row_delta(state["indicators"], previous["indicators"]),
+            "sentiment_timeline": row_delta(state["sentiment_timeline"], previous["sentiment_timeline"], "bucket"),
+        }
+        if not _same(state["signals"], previous["signals"]):
+            delta["signals"] = state["signals"]
+        delta = {name: value for name, value in delta.items() if value}
+        if not delta:
+            return None
+        return sse_event("delta", {"seq": self.seq, **delta})
+
+
+class AnalysisHub:
+    # One producer per (symbol, interval, limit) polls the shared analysis and fans the same
+    # encoded events out to every subscriber: a snapshot on connect, then only deltas. A
+    # subscriber that falls `queue_size` events behind is resynced with a fresh snapshot.
+    def __init__(
+        self, poll_seconds: float = 5.0, indicator_rows: int = 200, queue_size: int = 32, heartbeat_seconds: float = 15.0
+    ) -> None:
+        self._topics: dict[tuple[str, str, int], Topic] = {}
+        self.configure(poll_seconds, indicator_rows, queue_size, heartbeat_seconds)
+        self.events_published = 0
+        self.resyncs = 0
+
+    def configure(
+        self, poll_seconds: float = 5.0, indicator_rows: int = 200, queue_size: int = 32, heartbeat_seconds: float = 15.0
+    ) -> None:
+        self.poll_seconds = poll_seconds
+        self.indicator_rows = indicator_rows
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+
+    async def events(
+        self, symbol: str, interval: str, limit: int, load: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> AsyncIterator[bytes]:
+        key = (symbol.upper(), interval, limit)
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = Topic(key[0], interval)
+        queue: asyncio.Queue[bytes] = asyncio.Queue(self.queue_size)
+        topic.subscribers.add(queue)
+        if topic.task is None:
+            topic.task = asyncio.create_task(self._produce(topic, load))
+        snapshot = topic.snapshot()
+        if snapshot is not None:
+            queue.put_nowait(snapshot)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+        finally:
+            topic.subscribers.discard(queue)
+            if not topic.subscribers and self._topics.get(key) is topic:
+                del self._topics[key]
+                topic.task.cancel()
+
+    async def _produce(self, topic: Topic, load: Callable[[], Awaitable[dict[str, Any]]]) -> None:
+        while True:
+            try:
+                event = topic.update(await load(), self.indicator_rows)
+            except Exception as exc:
+                logger.warning("stream refresh failed for %s %s: %r", topic.symbol, topic.interval, exc)
+            else:
+                if event is not None:
+                    self._publish(topic, event)
+            await asyncio.sleep(self.poll_seconds)
+
+    def _publish(self, topic: Topic, event: bytes) -> None:
+        self.events_published += 1
+        for queue in topic.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(topic.snapshot())
+                self.resyncs += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(len(topic.subscribers) for topic in self._topics.values()),
+            "events_published": self.events_published,
+            "resyncs": self.resyncs,
+        }
+
+
+analysis_hub = AnalysisHub()
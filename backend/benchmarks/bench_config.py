@@ -0,0 +1,64 @@
+"""Per-request cost of resolving the runtime config: rebuild from config_overrides vs snapshot.
+
+Uses a file-backed SQLite database with a realistic set of admin overrides.
+
+Run from ``backend/``: ``python -m benchmarks.bench_config``
+"""
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import deep_merge, env_overrides, load_default_config
+from app.config.snapshot import ConfigSnapshots
+from app.db.base import Base
+from app.db.models import ConfigOverride
+
+CALLS = 5_000
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def legacy_load(db, defaults: dict) -> dict:
+    # load_runtime_config as it was before snapshots.
+    cfg = deep_merge(defaults, env_overrides())
+    overrides = {row.key: json.loads(row.value) for row in db.query(ConfigOverride).all()}
+    return deep_merge(cfg, overrides)
+
+
+def main() -> None:
+    defaults = load_default_config().model_dump()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            for section in ("weights", "indicators", "backtest", "social", "market"):
+                db.add(ConfigOverride(key=section, value=json.dumps(defaults[section])))
+            db.commit()
+
+        with Session() as db:
+            snapshot = ConfigSnapshots(defaults, check_interval_seconds=1.0)
+            version_check = ConfigSnapshots(defaults, check_interval_seconds=0)
+            rows = (
+                ("query + merge per call (before)", lambda: legacy_load(db, defaults)),
+                ("snapshot, version row per call", lambda: version_check.get(db)),
+                ("snapshot, version row per 1s", lambda: snapshot.get(db)),
+            )
+            for label, fn in rows:
+                fn()
+                print(f"{label:<32} {per_call_us(fn, CALLS):9.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Latency of a burst of kline fetches with per-call clients vs the shared pool.
+
+Each /analyze performs one klines fetch against the market provider; this replays a
+burst of them against a local TLS stub so handshake cost is visible.
+
+Run from ``backend/``: ``python -m benchmarks.bench_http_pool``
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import time
+
+from app.providers.http import HttpClientPool
+from app.providers.market.binance import BinanceMarketDataProvider
+from benchmarks.stub_upstream import StubServer, build_app
+
+BURST = 200
+CONCURRENCY = 20
+
+
+async def burst(provider: BinanceMarketDataProvider) -> list[float]:
+    sem = asyncio.Semaphore(CONCURRENCY)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            start = time.perf_counter()
+            await provider.get_ohlcv(f"COIN{i % 50}USDT", "1m", 200)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(BURST)))
+    return latencies
+
+
+def report(label: str, latencies: list[float], wall: float) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:<22} wall {wall * 1000:8.1f} ms   p50 {statistics.median(ms):6.2f} ms   p95 {p95:6.2f} ms")
+
+
+async def main() -> None:
+    with StubServer(build_app()) as server:
+        # Let the per-call clients trust the self-signed stub certificate as well.
+        os.environ["SSL_CERT_FILE"] = str(server.cert_path)
+        per_call = BinanceMarketDataProvider(server.base_url, 10)
+        pool = HttpClientPool({"verify": str(server.cert_path), "max_connections": CONCURRENCY})
+        pooled = BinanceMarketDataProvider(server.base_url, 10, client=pool.client(server.base_url))
+        await pooled.get_ohlcv("WARMUP", "1m", 1)
+
+        for label, provider in (("per-call AsyncClient", per_call), ("shared pool", pooled)):
+            start = time.perf_counter()
+            latencies = await burst(provider)
+            report(label, latencies, time.perf_counter() - start)
+        await pool.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""Artifact size, load time and single-row latency: pickled forest vs compact artifacts.
+
+Run from ``backend/``: ``python -m benchmarks.bench_model_artifacts``
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from app.models.compact import CompactForest
+
+ROWS = 5_000
+FEATURES = 9
+REPEATS = 200
+
+
+def timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(ROWS, FEATURES)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(size=ROWS) > 0).astype(int)
+    row = X[-1].copy()
+
+    print(f"{'artifact':<32} {'size KiB':>9} {'load ms':>8} {'1-row ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for depth in (None, 12):
+            model = RandomForestClassifier(n_estimators=200, max_depth=depth, random_state=0).fit(X, y)
+            compact = CompactForest.from_sklearn(model)
+            variants = (
+                ("sklearn pickle", model, 0, None, lambda m: m.predict_proba(row[None, :])[0, 1]),
+                ("compact mmap", compact, 0, "r", lambda m: m.predict_up(row)[0]),
+                ("compact compress=3", compact, 3, None, lambda m: m.predict_up(row)[0]),
+            )
+            for label, obj, compress, mmap_mode, infer in variants:
+                path = Path(tmp) / f"{label.replace(' ', '_')}_{depth}.joblib"
+                joblib.dump(obj, path, compress=compress)
+                load_ms = timed(lambda: joblib.load(path, mmap_mode=mmap_mode), 5)
+                loaded = joblib.load(path, mmap_mode=mmap_mode)
+                infer(loaded)
+                name = f"{label} (depth {depth or 'full'})"
+                print(
+                    f"{name:<32} {path.stat().st_size / 1024:>9.0f} {load_ms:>8.2f} {timed(lambda: infer(loaded), REPEATS):>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Load test of the market provider against a rate-limited stub upstream.
+
+Replays a dashboard-style burst (many concurrent analyses, lots of repeated symbols) once
+without any client-side limiting and once with the per-host token bucket set to the
+upstream limit. Reports upstream calls, achieved rate and failed requests.
+
+Run from ``backend/``: ``python -m benchmarks.bench_rate_limit``
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from app.providers.market.binance import BinanceMarketDataProvider
+from app.providers.throttle import TokenBucket
+from benchmarks.stub_upstream import StubServer, UpstreamLimit, build_app
+
+UPSTREAM_PER_SECOND = 20
+REQUESTS = 300
+SYMBOLS = 20
+CONCURRENCY = 50
+LATENCY = 0.02
+
+
+async def run(provider: BinanceMarketDataProvider) -> tuple[int, float]:
+    sem = asyncio.Semaphore(CONCURRENCY)
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with sem:
+            try:
+                await provider.get_ohlcv(f"COIN{i % SYMBOLS}USDT", "1m", 200)
+            except httpx.HTTPError:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    return errors, time.perf_counter() - start
+
+
+async def main() -> None:
+    # Leave a little headroom under the upstream limit for arrival jitter.
+    scenarios = (
+        ("no limiter", None, 0),
+        ("token bucket", TokenBucket(UPSTREAM_PER_SECOND * 0.9, burst=1), 3),
+    )
+    for label, limiter, retries in scenarios:
+        limit = UpstreamLimit(UPSTREAM_PER_SECOND)
+        with StubServer(build_app(LATENCY, limit), tls=False) as server:
+            async with httpx.AsyncClient() as client:
+                provider = BinanceMarketDataProvider(server.base_url, client=client, limiter=limiter, retries=retries)
+                errors, wall = await run(provider)
+        calls = limit.served + limit.rejected
+        print(
+            f"{label:<13} wall {wall:6.2f} s   upstream calls {calls:4d}   served/s {limit.served / wall:6.1f}"
+            f"   429s {limit.rejected:4d}   failed requests {errors:4d}   coalesced {provider._ohlcv.shared:4d}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""score_posts before/after caching the analyzer and memoizing scores.
+
+Run from ``backend/``: ``python -m benchmarks.bench_sentiment``
+"""
+from __future__ import annotations
+
+import random
+import time
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.sentiment.service import ScoreCache, score_posts
+
+SIZES = (100, 1_000, 10_000)
+WORDS = "btc eth moon crash bullish bearish pump dump great terrible hodl rekt buy sell love hate up down".split()
+
+
+def corpus(n: int, unique: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choices(WORDS, k=12)) for _ in range(unique)]
+    return [{"text": texts[i % unique], "created_at": "2024-01-01T00:00:00Z"} for i in range(n)]
+
+
+def score_posts_uncached(posts: list[dict]) -> list[dict]:
+    # The previous implementation: a fresh analyzer (and lexicon load) on every call.
+    analyzer = SentimentIntensityAnalyzer()
+    return [{**p, "score": analyzer.polarity_scores(p.get("text", ""))["compound"]} for p in posts]
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    score_posts([{"text": "warm up"}], cache=None)  # load the VADER backend outside the timings
+    print(f"{'posts':>7} {'before (ms)':>12} {'cold cache (ms)':>16} {'warm poll (ms)':>15}")
+    for n in SIZES:
+        posts = corpus(n, unique=max(n // 2, 1))
+        before = timed(score_posts_uncached, posts)
+        cache = ScoreCache(max_entries=50_000)
+        cold = timed(score_posts, posts, cache=cache)
+        warm = timed(score_posts, posts, cache=cache)
+        print(f"{n:>7} {before * 1000:>12.1f} {cold * 1000:>16.1f} {warm * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Throughput of each sentiment backend on the same corpus, and agreement with VADER.
+
+The sklearn backend is trained on the fly on VADER-labelled posts from a disjoint corpus.
+
+Run from ``backend/``: ``python -m benchmarks.bench_sentiment_backends``
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.sentiment.backends import get_backend, train_linear_sentiment
+from benchmarks.bench_sentiment import corpus
+
+POSTS = 20_000
+
+
+def main() -> None:
+    texts = [p["text"] for p in corpus(POSTS, unique=POSTS)]
+    train = [p["text"] for p in corpus(5_000, unique=5_000, seed=99)]
+    vader = get_backend("vader")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sentiment.joblib"
+        labels = [int(s > 0) for s in vader.score_texts(train)]
+        train_linear_sentiment(train, labels, path)
+
+        reference = None
+        print(f"{'backend':<10} {'texts/s':>10} {'sign agreement':>15}")
+        for name, model_path in (("vader", None), ("lexicon", None), ("sklearn", str(path))):
+            backend = get_backend(name, model_path)
+            backend.score_texts(texts[:10])
+            start = time.perf_counter()
+            scores = np.array(backend.score_texts(texts))
+            rate = len(texts) / (time.perf_counter() - start)
+            reference = scores if reference is None else reference
+            agreement = float(np.mean(np.sign(scores) == np.sign(reference)))
+            print(f"{name:<10} {rate:>10.0f} {agreement:>15.1%}")
+
+
+if __name__ == "__main__":
+    main()
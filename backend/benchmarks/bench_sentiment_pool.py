@@ -0,0 +1,39 @@
+"""Scoring throughput (posts/s) inline vs across a process pool, per worker count.
+
+Run from ``backend/``: ``python -m benchmarks.bench_sentiment_pool``
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from app.sentiment.service import ScoringExecutor
+from benchmarks.bench_sentiment import corpus
+
+POSTS = 20_000
+
+
+async def throughput(executor: ScoringExecutor, posts: list[dict]) -> float:
+    start = time.perf_counter()
+    await executor.score(posts, cache=None)
+    return len(posts) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    posts = corpus(POSTS, unique=POSTS)
+    inline = ScoringExecutor(mode="inline")
+    print(f"{'mode':<16} {'posts/s':>10}")
+    print(f"{'inline':<16} {await throughput(inline, posts):>10.0f}")
+    cores = os.cpu_count() or 1
+    counts = sorted({c for c in (1, 2, 4, 8, 16, cores) if c <= cores})
+    for workers in counts:
+        executor = ScoringExecutor(mode="process", workers=workers, min_batch=1, chunk_size=500)
+        await executor.score(corpus(workers * 10, unique=workers * 10, seed=1), cache=None)  # spawn workers
+        rate = await throughput(executor, posts)
+        executor.shutdown()
+        print(f"{f'process x{workers}':<16} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
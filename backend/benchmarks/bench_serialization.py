@@ -0,0 +1,78 @@
+"""Encoding cost and size of the /analyze candles + indicators payload.
+
+Compares the previous path (records, FastAPI's jsonable_encoder, stdlib json) with orjson
+records, columnar arrays and columnar float32, and the old records -> DataFrame round trip
+that /backtest did before taking the frame directly.
+
+Run from ``backend/``: ``python -m benchmarks.bench_serialization``
+"""
+from __future__ import annotations
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from app.analysis.encoding import FastJSONResponse, frame_payload
+from app.config.settings import load_default_config
+from app.features.indicators import compute_indicators
+
+SIZES = (200, 1_000, 10_000)
+REPEAT = 5
+
+
+def frames(n: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    candles = pd.DataFrame({
+        "open_time": np.arange(n, dtype=np.int64) * 3_600_000 + 1_700_000_000_000,
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.uniform(1, 100, n),
+        "close_time": np.arange(1, n + 1, dtype=np.int64) * 3_600_000 + 1_699_999_999_999,
+    })
+    return candles, compute_indicators(candles, load_default_config().model_dump()["indicators"])
+
+
+def timed(fn) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main() -> None:
+    print(f"{'rows':>6} {'encoding':<20} {'ms':>8} {'KB':>9}")
+    for n in SIZES:
+        candles, indicators = frames(n)
+
+        def previous() -> bytes:
+            body = {"candles": candles.to_dict(orient="records"), "indicators": indicators.to_dict(orient="records")}
+            return json.dumps(jsonable_encoder(body), separators=(",", ":")).encode()
+
+        def fast(fmt: str, float32: bool = False):
+            return lambda: FastJSONResponse({
+                "candles": frame_payload(candles, fmt, float32),
+                "indicators": frame_payload(indicators, fmt, float32),
+            }).body
+
+        for label, fn in (
+            ("records + json", previous),
+            ("records + orjson", fast("records")),
+            ("columnar", fast("columnar")),
+            ("columnar float32", fast("columnar", True)),
+        ):
+            seconds, size = timed(fn)
+            print(f"{n:>6} {label:<20} {seconds * 1000:>8.2f} {size / 1024:>9.1f}")
+        seconds, _ = timed(lambda: pd.DataFrame(indicators.to_dict(orient="records")).columns)
+        print(f"{n:>6} {'records -> frame':<20} {seconds * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
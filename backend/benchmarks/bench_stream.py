@@ -0,0 +1,99 @@
+"""Bytes sent and server CPU for a dashboard wall: polling /analyze vs the /stream hub.
+
+Replays TICKS analysis updates for one pair (the forming candle changes every tick, a new
+candle opens every CANDLE_EVERY ticks). Polling encodes the full /analyze payload for every
+subscriber on every tick; the hub computes one delta per tick and shares its bytes.
+
+Run from ``backend/``: ``python -m benchmarks.bench_stream``
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.analysis.service import summarize
+from app.config.settings import load_default_config
+from app.features.indicators import compute_indicators
+from app.stream.service import AnalysisHub
+
+SUBSCRIBERS = (10, 50)
+TICKS = 60
+CANDLE_EVERY = 12
+LIMIT = 200
+
+
+def analyses(cfg: dict) -> list[dict]:
+    rng = np.random.default_rng(0)
+    close = list(100 + np.cumsum(rng.normal(0, 1, LIMIT)))
+    out = []
+    for tick in range(TICKS):
+        if tick and tick % CANDLE_EVERY == 0:
+            close.append(close[-1])
+        close[-1] += float(rng.normal(0, 0.2))
+        n = len(close)
+        prices = np.array(close[-LIMIT:])
+        frame = pd.DataFrame({
+            "open_time": np.arange(n - len(prices), n, dtype=np.int64) * 60_000,
+            "open": prices,
+            "high": prices + 1,
+            "low": prices - 1,
+            "close": prices,
+            "volume": 10.0,
+        })
+        out.append(summarize("BTCUSDT", "1m", frame, compute_indicators(frame, cfg["indicators"]), [], cfg))
+    return out
+
+
+def polling(updates: list[dict], subscribers: int) -> tuple[int, float]:
+    sent, start = 0, time.perf_counter()
+    for analysis in updates:
+        for _ in range(subscribers):
+            payload = {
+                "candles": analysis["candles"].to_dict(orient="records"),
+                "indicators": analysis["frame"].tail(200).to_dict(orient="records"),
+                "sentiment_timeline": analysis["sentiment_timeline"],
+                "signals": analysis["signals"],
+            }
+            sent += len(json.dumps(payload).encode())
+    return sent, time.perf_counter() - start
+
+
+async def streaming(updates: list[dict], subscribers: int) -> tuple[int, float]:
+    hub = AnalysisHub(poll_seconds=0, queue_size=len(updates) + 1)
+    served = 0
+
+    async def load() -> dict:
+        # After the last update the same analysis (and frame) is served: no new events.
+        nonlocal served
+        served += 1
+        return updates[min(served, len(updates)) - 1]
+
+    streams = [hub.events("BTCUSDT", "1m", LIMIT, load) for _ in range(subscribers)]
+    sent, start = 0, time.perf_counter()
+    for _ in updates:
+        for event in await asyncio.gather(*(anext(stream) for stream in streams)):
+            sent += len(event)
+    elapsed = time.perf_counter() - start
+    for stream in streams:
+        await stream.aclose()
+    return sent, elapsed
+
+
+def main() -> None:
+    updates = analyses(load_default_config().model_dump())
+    print(f"{'subscribers':>11} {'poll MB':>9} {'stream MB':>10} {'poll ms':>9} {'stream ms':>10}")
+    for subscribers in SUBSCRIBERS:
+        poll_bytes, poll_time = polling(updates, subscribers)
+        stream_bytes, stream_time = asyncio.run(streaming(updates, subscribers))
+        print(
+            f"{subscribers:>11} {poll_bytes / 1e6:>9.2f} {stream_bytes / 1e6:>10.2f}"
+            f" {poll_time * 1000:>9.1f} {stream_time * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
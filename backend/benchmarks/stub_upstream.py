@@ -0,0 +1,120 @@
+"""Local stand-in for the Binance REST API used by the network benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import ipaddress
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+STEP_MS = 60_000
+
+
+def klines(limit: int, start: int | None = None) -> list[list]:
+    now = int(time.time() * 1000)
+    first = start if start is not None else now - now % STEP_MS - (limit - 1) * STEP_MS
+    return [
+        [t, "100.0", "101.0", "99.0", "100.5", "12.5", t + STEP_MS - 1, "0", 10, "0", "0", "0"]
+        for t in range(first, min(now, first + limit * STEP_MS - 1) + 1, STEP_MS)
+    ]
+
+
+class UpstreamLimit:
+    # Rejects requests beyond `per_second` within any trailing second, like an exchange would.
+    def __init__(self, per_second: int) -> None:
+        self.per_second = per_second
+        self.recent: deque[float] = deque()
+        self.served = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        while self.recent and self.recent[0] <= now - 1.0:
+            self.recent.popleft()
+        if len(self.recent) >= self.per_second:
+            self.rejected += 1
+            return False
+        self.recent.append(now)
+        self.served += 1
+        return True
+
+
+def build_app(latency: float = 0.0, limit: UpstreamLimit | None = None) -> Starlette:
+    async def klines_endpoint(request: Request) -> JSONResponse:
+        if limit is not None and not limit.allow():
+            return JSONResponse({"code": -1003, "msg": "Too many requests"}, status_code=429, headers={"Retry-After": "1"})
+        if latency:
+            await asyncio.sleep(latency)
+        start = request.query_params.get("startTime")
+        return JSONResponse(klines(int(request.query_params.get("limit", 500)), int(start) if start else None))
+
+    async def exchange_info(request: Request) -> JSONResponse:
+        return JSONResponse({"symbols": [{"symbol": f"COIN{i}USDT"} for i in range(2000)]})
+
+    return Starlette(routes=[Route("/api/v3/klines", klines_endpoint), Route("/api/v3/exchangeInfo", exchange_info)])
+
+
+def self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(minutes=1))
+        .not_valid_after(now + dt.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    )
+    return cert_path, key_path
+
+
+class StubServer:
+    def __init__(self, app: Starlette, tls: bool = True) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cert_path: Path | None = None
+        kwargs = {}
+        if tls:
+            self.cert_path, key_path = self_signed_cert(Path(self.tmp.name))
+            kwargs = {"ssl_certfile": str(self.cert_path), "ssl_keyfile": str(key_path)}
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error", **kwargs)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.base_url = f"{'https' if tls else 'http'}://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> StubServer:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+        self.tmp.cleanup()
@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analysis import service
+from app.cache.store import InMemoryCache
+from app.config.settings import EnvSettings, load_default_config
+
+
+def _frame(n: int = 60) -> pd.DataFrame:
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame({"open_time": np.arange(n) * 60_000, "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10.0})
+
+
+def _cfg() -> dict:
+    cfg = load_default_config().model_dump()
+    cfg["social"]["fetch_timeout_seconds"] = 0.2
+    cfg["social"]["store"]["enabled"] = False
+    return cfg
+
+
+def test_slow_social_source_degrades_instead_of_blocking(monkeypatch):
+    async def candles(*args):
+        await asyncio.sleep(0.05)
+        return _frame()
+
+    async def twitter():
+        await asyncio.sleep(0.05)
+        return [{"text": "great rally", "created_at": "2024-01-01T00:00:00Z"}]
+
+    async def reddit():
+        await asyncio.sleep(5)
+        return []
+
+    monkeypatch.setattr(service, "fetch_candles", candles)
+    monkeypatch.setattr(service, "social_fetches", lambda *args: {"twitter": twitter(), "reddit": reddit()})
+    result = asyncio.run(service.compose_analysis("BTCUSDT", "1h", 60, _cfg(), EnvSettings()))
+
+    assert result["sources"] == {"market": "ok", "twitter": "ok", "reddit": "timeout"}
+    assert result["posts"] == 1
+    # Fetches overlap, so the total is bounded by the social timeout, not the sum.
+    assert result["timings"]["total"] < 1000
+    assert {"fetch_candles", "fetch_twitter", "fetch_reddit", "indicators", "sentiment"} <= result["timings"].keys()
+
+
+def test_market_failure_raises_upstream_error(monkeypatch):
+    async def candles(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "fetch_candles", candles)
+    monkeypatch.setattr(service, "social_fetches", lambda *args: {})
+    with pytest.raises(service.UpstreamError) as exc:
+        asyncio.run(service.compose_analysis("BTCUSDT", "1h", 60, _cfg(), EnvSettings()))
+    # Exception details are logged, not returned to the client.
+    assert exc.value.reason == "error" and "boom" not in str(exc.value)
+
+
+def test_batch_shares_social_queries_and_attributes_posts(monkeypatch):
+    queries = []
+
+    async def candles(symbol, interval, limit, cfg):
+        return _frame(limit)
+
+    async def posts():
+        return [
+            {"text": "BTC to the moon", "created_at": "2024-01-01T00:00:00Z"},
+            {"text": "ETH looks weak", "created_at": "2024-01-01T00:00:00Z"},
+        ]
+
+    def fetches(keywords, limit, cfg, settings):
+        queries.append(keywords)
+        return {"twitter": posts()}
+
+    monkeypatch.setattr(service, "fetch_candles", candles)
+    monkeypatch.setattr(service, "social_fetches", fetches)
+    items = [("BTCUSDT", "1h", 60), ("ETHUSDT", "1h", 60), ("btcusdt", "1h", 60), ("SOLUSDT", "4h", 40)]
+    cfg = _cfg()
+    cfg["social"]["lookback_posts"] = 30
+    results = asyncio.run(service.compose_batch_analysis(items, cfg, EnvSettings()))
+
+    assert [(r["symbol"], r["interval"]) for r in results] == [("BTCUSDT", "1h"), ("ETHUSDT", "1h"), ("SOLUSDT", "4h")]
+    assert len(queries) == 1
+    assert [r["posts"] for r in results] == [1, 1, 0]
+    single = asyncio.run(service.compose_analysis("SOLUSDT", "4h", 40, _cfg(), EnvSettings()))
+    indicator_columns = [c for c in single["frame"].columns if c not in ("sentiment_signal", "composite_score")]
+    pd.testing.assert_frame_equal(results[2]["frame"][indicator_columns], single["frame"][indicator_columns])
+
+
+def test_keyword_chunks_respect_query_length_and_result_cap():
+    keywords = {symbol: [symbol, symbol[:3]] for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT")}
+    assert service.keyword_chunks(keywords, 512) == [["BTCUSDT", "ETHUSDT", "SOLUSDT"]]
+    assert service.keyword_chunks(keywords, 40) == [["BTCUSDT", "ETHUSDT"], ["SOLUSDT"]]
+    # 100 results per request with 50 posts per symbol: two symbols per query at most.
+    assert service.keyword_chunks(keywords, 512, 2) == [["BTCUSDT", "ETHUSDT"], ["SOLUSDT"]]
+    assert service.keyword_chunks(keywords, 512, 1) == [["BTCUSDT"], ["ETHUSDT"], ["SOLUSDT"]]
+
+
+def test_analysis_is_reused_within_a_candle(monkeypatch):
+    calls = []
+
+    async def compose(symbol, interval, limit, cfg, settings):
+        calls.append((symbol, limit))
+        await asyncio.sleep(0.01)
+        return {"symbol": symbol, "signals": {}}
+
+    cache = InMemoryCache()
+    monkeypatch.setattr(service, "get_cache", lambda: cache)
+    monkeypatch.setattr(service, "compose_analysis", compose)
+
+    async def scenario():
+        first = await asyncio.gather(*(service.cached_analysis("btcusdt", "1h", 200, _cfg(), None) for _ in range(3)))
+        second = await service.cached_analysis("BTCUSDT", "1h", 200, _cfg(), None)
+        other = await service.cached_analysis("BTCUSDT", "1h", 300, _cfg(), None)
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+    # Composed with the normalised symbol, so "btcusdt" gets the same keywords as "BTCUSDT".
+    assert calls == [("BTCUSDT", 200), ("BTCUSDT", 300)]
+    assert [r["cache"] for r in first] == ["miss", "hit", "hit"] and second["cache"] == "hit"
+    assert other["cache"] == "miss"
+
+
+def test_degraded_analysis_is_cached_briefly(monkeypatch):
+    async def compose(symbol, interval, limit, cfg, settings):
+        status = "timeout" if symbol == "BTCUSDT" else "ok"
+        return {"symbol": symbol, "signals": {}, "sources": {"market": "ok", "twitter": status}}
+
+    cache = InMemoryCache()
+    monkeypatch.setattr(service, "get_cache", lambda: cache)
+    monkeypatch.setattr(service, "compose_analysis", compose)
+    cfg = _cfg()
+    cfg["app"]["analysis_cache_degraded_ttl_seconds"] = 5
+
+    async def scenario():
+        await service.cached_analysis("BTCUSDT", "1d", 200, cfg, None)
+        await service.cached_analysis("ETHUSDT", "1d", 200, cfg, None)
+        await service.cached_analysis("SOLUSDT", "1d", 200, cfg, None, refresh=True)
+
+    asyncio.run(scenario())
+    ttls = {key.split(":")[1]: expires - time.time() for key, (expires, _, _) in cache._store.items()}
+    assert ttls["BTCUSDT"] <= 5 and ttls["ETHUSDT"] > 5 and ttls["SOLUSDT"] > 5
+
+
+def test_candle_close_time_is_end_of_the_forming_candle():
+    now = 1_700_000_123_456
+    close = service.candle_close_time("1h", now)
+    assert close >= now and (close + 1) % 3_600_000 == 0 and close - now < 3_600_000
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest.service import _rank_key, grid_size, parameter_grid, run_backtest, run_backtest_sweep
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({"close": close, "composite_score": rng.normal(0, 0.2, n)})
+
+
+@pytest.mark.parametrize("long_threshold,short_threshold", [(0.15, -0.15), (0.0, 0.0), (-0.1, 0.1)])
+def test_vectorized_backtest_matches_loop(long_threshold, short_threshold):
+    df = _frame(500, seed=7)
+    expected = run_backtest(df, long_threshold, short_threshold, 10000, 10, engine="loop")
+    got = run_backtest(df, long_threshold, short_threshold, 10000, 10, engine="vectorized")
+    assert got["trade_count"] == expected["trade_count"]
+    for key in ("win_rate", "max_drawdown", "sharpe_like", "avg_return"):
+        assert got[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-12)
+    np.testing.assert_allclose(got["equity_curve"], expected["equity_curve"], rtol=1e-12)
+
+
+def test_sweep_matches_single_runs_and_is_ranked():
+    df = _frame(300, seed=3)
+    rows = run_backtest_sweep(df, [0.0, 0.1, 0.2], [-0.2, -0.1], [0, 10], 10000, workers=2)
+    assert len(rows) == 12
+    assert [r["rank"] for r in rows] == list(range(1, 13))
+    assert all(a["sharpe_like"] >= b["sharpe_like"] for a, b in zip(rows, rows[1:]))
+    for row in rows:
+        single = run_backtest(df, row["long_threshold"], row["short_threshold"], 10000, row["fee_bps"])
+        assert row["trade_count"] == single["trade_count"]
+        assert row["sharpe_like"] == pytest.approx(single["sharpe_like"], rel=1e-9)
+
+
+def test_parameter_grid_is_inclusive():
+    assert parameter_grid(-0.2, 0.2, 0.1) == [-0.2, -0.1, 0.0, 0.1, 0.2]
+
+
+def test_grid_size_is_known_before_building_the_grid():
+    assert grid_size(-0.2, 0.2, 0.1) == 5
+    assert grid_size(0, 1e9, 1e-9) > 10**17
+    assert grid_size(1, 0, 0.1) == 0
+    with pytest.raises(ValueError):
+        grid_size(0, 1, 0)
+
+
+def test_nan_sharpe_ranks_last():
+    rows = [{"sharpe_like": float("nan"), "avg_return": 0.5}, {"sharpe_like": -1.0, "avg_return": 0.0}, {"sharpe_like": 2.0, "avg_return": 0.1}]
+    rows.sort(key=_rank_key, reverse=True)
+    assert [r["sharpe_like"] for r in rows][:2] == [2.0, -1.0]
@@ -0,0 +1,223 @@
+import asyncio
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cache import codec
+from app.cache.redis_store import RedisCache
+from app.cache.store import InMemoryCache
+
+
+class FakeRedis:
+    # The subset of redis.asyncio.Redis the cache uses, with millisecond expiry.
+    def __init__(self) -> None:
+        self.data: dict[str, tuple[bytes, float | None]] = {}
+        self.commands: list[str] = []
+
+    def _live(self, key):
+        value = self.data.get(key)
+        if value is None or (value[1] is not None and value[1] < time.monotonic()):
+            self.data.pop(key, None)
+            return None
+        return value[0]
+
+    async def get(self, key):
+        self.commands.append("GET")
+        return self._live(key)
+
+    async def mget(self, keys):
+        self.commands.append("MGET")
+        return [self._live(key) for key in keys]
+
+    async def set(self, key, value, px=None, nx=False):
+        self.commands.append("SET")
+        if nx and self._live(key) is not None:
+            return None
+        value = value.encode() if isinstance(value, str) else value
+        self.data[key] = (value, time.monotonic() + px / 1000 if px else None)
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def exists(self, key):
+        return int(self._live(key) is not None)
+
+    async def eval(self, script, numkeys, *args):
+        # Only the lock-release script: compare-and-delete in one step.
+        self.commands.append("EVAL")
+        key, token = args[0], args[numkeys]
+        if self._live(key) == token.encode():
+            self.data.pop(key)
+            return 1
+        return 0
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def set(self, *args, **kwargs):
+                self.calls.append((args, kwargs))
+
+            async def execute(self):
+                redis.commands.append("PIPELINE")
+                return [await redis.set(*a, **k) for a, k in self.calls]
+
+        return Pipeline()
+
+    async def aclose(self):
+        pass
+
+
+def test_codec_round_trips_frames_compactly():
+    frame = pd.DataFrame({"open_time": np.arange(2000, dtype=np.int64), "close": np.linspace(1, 2, 2000)})
+    data = codec.dumps(frame)
+    assert data[:1] == b"z" and len(data) < len(frame.to_json())
+    pd.testing.assert_frame_equal(codec.loads(data), frame)
+    assert codec.loads(codec.dumps(["BTCUSDT"])) == ["BTCUSDT"]
+
+
+def test_codec_is_data_only_and_round_trips_analyses():
+    candles = pd.DataFrame({"open_time": np.arange(3, dtype=np.int64), "close": [1.0, np.nan, 3.0], "symbol": ["BTCUSDT"] * 3})
+    value = {
+        "candles": candles.iloc[1:],
+        "frame": candles.set_index("open_time"),
+        "signals": {"composite": np.float64(0.25), "sentiment": float("nan")},
+        "sentiment_timeline": [{"bucket": 0, "sentiment": 0.1, "count": 1}],
+        "version": (1, 2),
+        "importances": {1: "x"},
+    }
+    out = codec.loads(codec.dumps(value))
+    pd.testing.assert_frame_equal(out["candles"], value["candles"])
+    pd.testing.assert_frame_equal(out["frame"], value["frame"])
+    assert out["signals"]["composite"] == 0.25 and np.isnan(out["signals"]["sentiment"])
+    assert out["sentiment_timeline"] == value["sentiment_timeline"]
+    assert out["version"] == (1, 2) and out["importances"] == {1: "x"}
+    # Pickles (the old format, or anything planted in a shared Redis) are never loaded.
+    with pytest.raises(ValueError):
+        codec.loads(b"p" + pickle.dumps(value))
+    with pytest.raises(TypeError):
+        codec.dumps(object())
+
+
+def test_redis_cache_treats_undecodable_entries_as_misses():
+    redis = FakeRedis()
+    redis.data["scl:k"] = (b"p" + pickle.dumps({"x": 1}), None)
+    assert asyncio.run(RedisCache(redis).get("k")) is None
+
+
+def test_redis_cache_batches_reads_and_writes():
+    redis = FakeRedis()
+    cache = RedisCache(redis)
+
+    async def scenario():
+        await cache.set_many({"a": [1], "b": {"x": 2.5}}, ttl_seconds=60)
+        return await cache.get_many(["a", "b", "missing"])
+
+    assert asyncio.run(scenario()) == [[1], {"x": 2.5}, None]
+    assert redis.commands.count("PIPELINE") == 1 and redis.commands.count("MGET") == 1
+    assert all(key.startswith("scl:") for key in redis.data)
+
+
+def test_concurrent_misses_load_once_per_key():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return []
+
+    async def scenario(cache):
+        results = await asyncio.gather(*(cache.get_or_set("symbols:", 60, loader) for _ in range(20)))
+        # Empty results are cached too.
+        assert await cache.get_or_set("symbols:", 60, loader) == []
+        return results
+
+    for cache in (InMemoryCache(), RedisCache(FakeRedis())):
+        calls.clear()
+        assert asyncio.run(scenario(cache)) == [[]] * 20
+        assert len(calls) == 1
+
+
+def test_workers_sharing_redis_wait_for_the_lock_holder():
+    redis = FakeRedis()
+    workers = [RedisCache(redis, poll_interval_seconds=0.005) for _ in range(3)]
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.03)
+        return {"price": 1.0}
+
+    async def scenario():
+        return await asyncio.gather(*(w.get_or_set("k", 60, loader) for w in workers))
+
+    assert asyncio.run(scenario()) == [{"price": 1.0}] * 3
+    assert len(calls) == 1
+    assert "scl:lock:k" not in redis.data
+
+
+def test_expired_lock_taken_by_another_worker_is_not_released():
+    redis = FakeRedis()
+    cache = RedisCache(redis, lock_timeout_seconds=0.01)
+
+    async def loader():
+        # Our lock expires mid-load and another worker takes it.
+        await asyncio.sleep(0.02)
+        await redis.set("scl:lock:k", "other", px=10_000)
+        return 1
+
+    assert asyncio.run(cache.get_or_set("k", 60, loader)) == 1
+    assert redis.data["scl:lock:k"][0] == b"other"
+    assert "EVAL" in redis.commands
+
+
+def test_failed_load_is_shared_and_not_cached():
+    cache = InMemoryCache()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_set("k", 60, loader) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(scenario()))
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_memory_cache_evicts_least_recently_used_by_count_and_bytes():
+    cache = InMemoryCache(max_entries=3, max_bytes=8_040)
+
+    async def scenario():
+        for key in "abc":
+            await cache.set(key, key, 60)
+        await cache.get("a")
+        await cache.set("d", "d", 60)
+        assert await cache.get("b") is None and await cache.get("a") == "a"
+        await cache.set("big", np.zeros(1000), 60)
+        return [key for key in "acd" if await cache.get(key) is not None]
+
+    assert asyncio.run(scenario()) == []
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["bytes"] == 8000 and stats["evictions"] == 4
+
+
+def test_memory_cache_sweeps_expired_entries_on_write(monkeypatch):
+    cache = InMemoryCache(sweep_interval_seconds=0)
+
+    async def scenario():
+        for i in range(100):
+            await cache.set(f"symbols:{i}", [], 1)
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 5)
+        await cache.set("fresh", [], 60)
+
+    asyncio.run(scenario())
+    assert cache.stats()["entries"] == 1 and cache.stats()["expirations"] == 100
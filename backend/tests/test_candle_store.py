@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from app.providers.market.store import CandleStore, StoredMarketDataProvider
+
+STEP = 60_000
+
+
+class FakeUpstream:
+    def __init__(self, listed_at: int) -> None:
+        self.listed_at = listed_at
+        self.calls: list[tuple[int, int | None]] = []
+
+    async def get_ohlcv_range(self, symbol, interval, start_time, end_time=None):
+        self.calls.append((start_time, end_time))
+        now = int(time.time() * 1000)
+        end = min(end_time if end_time is not None else now, now)
+        first = max(start_time + (-start_time) % STEP, self.listed_at)
+        return [
+            {"open_time": t, "open": 1.0, "high": 2.0, "low": 0.5, "close": t / STEP, "volume": 10.0, "close_time": t + STEP - 1}
+            for t in range(first, end + 1, STEP)
+        ]
+
+
+def test_store_fetches_only_missing_tail_and_backfills(tmp_path):
+    now = int(time.time() * 1000)
+    upstream = FakeUpstream(listed_at=now - now % STEP - 5000 * STEP)
+    provider = StoredMarketDataProvider(upstream, CandleStore(tmp_path, max_rows=10_000))
+
+    df = asyncio.run(provider.get_ohlcv_frame("BTCUSDT", "1m", 1500))
+    assert len(df) == 1500
+    assert df["open_time"].is_monotonic_increasing and df["open_time"].diff().dropna().eq(STEP).all()
+
+    upstream.calls.clear()
+    df = asyncio.run(provider.get_ohlcv_frame("BTCUSDT", "1m", 3000))
+    assert len(df) == 3000
+    # One tail refresh from the last stored candle plus one backfill before the first.
+    assert len(upstream.calls) == 2
+    assert upstream.calls[0][0] >= now - now % STEP
+
+    upstream.calls.clear()
+    df = asyncio.run(provider.get_ohlcv_frame("BTCUSDT", "1m", 8000))
+    assert len(df) == 5001
+    asyncio.run(provider.get_ohlcv_frame("BTCUSDT", "1m", 8000))
+    assert len(upstream.calls) == 3
+
+
+def _candles(start: int, n: int, close: float = 1.0) -> list[dict]:
+    return [
+        {"open_time": t, "open": 1.0, "high": 2.0, "low": 0.5, "close": close, "volume": 10.0, "close_time": t + STEP - 1}
+        for t in range(start, start + n * STEP, STEP)
+    ]
+
+
+def test_merge_skips_unchanged_tails_and_patches_the_forming_candle(tmp_path):
+    store = CandleStore(tmp_path)
+    assert store.merge("BTCUSDT", "1m", _candles(0, 100)) == 100
+    path = store.path("BTCUSDT", "1m")
+    before = path.stat()
+    held = store.frame("BTCUSDT", "1m", 5)
+
+    assert store.merge("BTCUSDT", "1m", _candles(98 * STEP, 2)) == 100
+    assert path.stat().st_mtime_ns == before.st_mtime_ns
+
+    forming = _candles(98 * STEP, 2)
+    forming[-1]["close"] = 7.0
+    assert store.merge("BTCUSDT", "1m", forming) == 100
+    assert path.stat().st_ino == before.st_ino
+    assert store.frame("BTCUSDT", "1m", 1)["close"].tolist() == [7.0]
+    # Frames handed out earlier are copies and keep their values.
+    assert held["close"].tolist() == [1.0] * 5
+
+    assert store.merge("BTCUSDT", "1m", _candles(99 * STEP, 3)) == 102
+    assert store.frame("BTCUSDT", "1m", 102)["open_time"].diff().dropna().eq(STEP).all()
+
+
+def test_per_pair_sync_state_is_bounded(monkeypatch):
+    from app.providers.market import store as module
+
+    monkeypatch.setattr(module, "MAX_TRACKED_PAIRS", 3)
+    monkeypatch.setattr(StoredMarketDataProvider, "_locks", module.OrderedDict())
+    for i in range(10):
+        StoredMarketDataProvider._lock(("root", f"COIN{i}", "1m"))
+    assert list(StoredMarketDataProvider._locks) == [("root", f"COIN{i}", "1m") for i in range(7, 10)]
+
+
+def test_stale_store_fetches_only_the_requested_window(tmp_path):
+    now = int(time.time() * 1000)
+    current = now - now % STEP
+    upstream = FakeUpstream(listed_at=current - 20_000 * STEP)
+    store = CandleStore(tmp_path, max_rows=20_000)
+    # A week-old store: its last candle is 10k minutes before the one forming now.
+    store.merge("BTCUSDT", "1m", _candles(current - 10_500 * STEP, 500))
+    provider = StoredMarketDataProvider(upstream, store)
+
+    df = asyncio.run(provider.get_ohlcv_frame("BTCUSDT", "1m", 200))
+    assert len(upstream.calls) == 1 and upstream.calls[0][0] >= current - 199 * STEP
+    assert len(df) == 200 and df["open_time"].diff().dropna().eq(STEP).all()
+
+    # A wider window later backfills the gap in one request.
+    upstream.calls.clear()
+    df = asyncio.run(provider.get_ohlcv_frame("BTCUSDT", "1m", 1_000))
+    assert len(upstream.calls) == 2
+    assert len(df) == 1_000 and df["open_time"].diff().dropna().eq(STEP).all()
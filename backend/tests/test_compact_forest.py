@@ -0,0 +1,29 @@
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from app.models.compact import CompactForest
+
+
+def test_compact_forest_matches_sklearn_and_memory_maps(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 9)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 3] + rng.normal(scale=0.5, size=400) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0).fit(X, y)
+    compact = CompactForest.from_sklearn(model)
+
+    probe = rng.normal(size=(50, 9))
+    np.testing.assert_allclose(compact.predict_up(probe), model.predict_proba(probe.astype(np.float32))[:, 1], atol=1e-6)
+    np.testing.assert_allclose(compact.predict_up(probe[0])[0], model.predict_proba(probe[:1])[0, 1], atol=1e-6)
+    np.testing.assert_allclose(compact.feature_importances_, model.feature_importances_)
+
+    joblib.dump(compact, tmp_path / "m.joblib")
+    loaded = joblib.load(tmp_path / "m.joblib", mmap_mode="r")
+    assert isinstance(loaded.threshold, np.memmap)
+    np.testing.assert_array_equal(loaded.predict(probe), compact.predict(probe))
+
+
+def test_single_class_forest_predicts_down():
+    X = np.zeros((20, 3))
+    compact = CompactForest.from_sklearn(RandomForestClassifier(n_estimators=3).fit(X, np.zeros(20, dtype=int)))
+    assert compact.predict_up(X[:1])[0] == 0.0
@@ -1,4 +1,16 @@
-from app.config.settings import deep_merge
+import json
+import pickle
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config.settings import deep_merge, load_default_config
+from app.config.snapshot import ConfigSnapshots, FrozenDict, bump_config_version
+from app.db.base import Base
+from app.db.models import ConfigOverride
 
 
 def test_deep_merge():
@@ -7,3 +19,49 @@ def test_deep_merge():
     out = deep_merge(a, b)
     assert out["weights"]["price"] == 0.3
     assert out["weights"]["tech"] == 0.8
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_snapshot_is_reused_until_the_version_row_changes():
+    Session = _session()
+    defaults = load_default_config().model_dump()
+    worker_a = ConfigSnapshots(defaults, check_interval_seconds=0)
+    worker_b = ConfigSnapshots(defaults, check_interval_seconds=0)
+    with Session() as db:
+        first = worker_a.get(db)
+        assert worker_a.get(db) is first and worker_a.builds == 1
+        assert worker_b.get(db)["weights"] == first["weights"]
+
+        db.add(ConfigOverride(key="weights", value=json.dumps({"sentiment": 0.9})))
+        bump_config_version(db)
+        db.commit()
+        assert worker_b.get(db)["weights"]["sentiment"] == 0.9
+        assert worker_a.get(db)["weights"]["sentiment"] == 0.9 and worker_a.builds == 2
+
+
+def test_snapshot_is_read_only_and_picklable():
+    with _session()() as db:
+        cfg = ConfigSnapshots(load_default_config().model_dump()).get(db)
+    with pytest.raises(TypeError):
+        cfg["model"]["forest"]["n_estimators"] = 1
+    assert isinstance(cfg["market"]["supported_intervals"], tuple)
+    clone = pickle.loads(pickle.dumps(cfg["model"]))
+    assert clone == cfg["model"] and isinstance(clone, FrozenDict)
+    assert json.loads(json.dumps(cfg))["model"]["forest"]["n_estimators"] == 200
+
+
+def test_invalid_override_is_rejected_before_it_is_stored():
+    with _session()() as db:
+        with pytest.raises(ValidationError):
+            ConfigSnapshots(load_default_config().model_dump()).build(db, {"weights": {"sentiment": "high"}})
+        with pytest.raises(ValidationError, match="target_horizon"):
+            ConfigSnapshots(load_default_config().model_dump()).build(db, {"model": {"target_horizon": 0}})
+        with pytest.raises(ValidationError, match="sentiment_model_path"):
+            ConfigSnapshots(load_default_config().model_dump()).build(
+                db, {"social": {"sentiment_model": "sklearn", "sentiment_model_path": "missing.joblib"}}
+            )
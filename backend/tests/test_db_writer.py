@@ -0,0 +1,74 @@
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config.settings import EnvSettings
+from app.db.base import Base
+from app.db.models import Run
+from app.db.session import async_database_url, engine_options
+from app.db.writer import BackgroundWriter
+
+
+def test_async_url_and_pool_options():
+    env = EnvSettings(db_pool_size=7)
+    assert async_database_url("sqlite:///./data/x.db") == "sqlite+aiosqlite:///./data/x.db"
+    assert async_database_url("postgresql://u@h/db") == "postgresql+asyncpg://u@h/db"
+    assert engine_options("sqlite:///./data/x.db", env)["pool_size"] == 7
+    assert "pool_size" not in engine_options("sqlite://", env)
+
+
+def test_writer_batches_rows_off_the_request_path(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}"
+    engine = create_async_engine(url)
+    writer = BackgroundWriter(async_sessionmaker(engine, expire_on_commit=False), batch_size=50, flush_interval_seconds=0.05)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        for i in range(120):
+            writer.submit(Run(symbol="BTCUSDT", interval="1h", summary_json=str(i)))
+        assert writer.stats()["queued"] == 120
+        await writer.aclose()
+        async with async_sessionmaker(engine)() as db:
+            count = await db.scalar(select(func.count()).select_from(Run))
+        await engine.dispose()
+        return count
+
+    assert asyncio.run(scenario()) == 120
+    assert writer.stats() == {"queued": 0, "written": 120, "batches": 3, "dropped": 0, "failed": 0}
+
+
+def test_full_queue_drops_are_counted_and_logged(caplog):
+    writer = BackgroundWriter(lambda: None, max_queue=2)
+
+    async def scenario():
+        writer.submit(*(Run(symbol="BTCUSDT", interval="1h", summary_json=str(i)) for i in range(5)))
+        stats = writer.stats()
+        writer._task.cancel()
+        return stats
+
+    with caplog.at_level("WARNING", logger="app.db.writer"):
+        stats = asyncio.run(scenario())
+    assert stats["queued"] == 0 and stats["dropped"] == 5
+    assert [r.getMessage() for r in caplog.records] == [
+        "audit writer queue full (2), dropped 5 Run rows (5 dropped in total)"
+    ]
+
+
+def test_rows_of_one_submit_share_a_transaction(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}"
+    engine = create_async_engine(url)
+    writer = BackgroundWriter(async_sessionmaker(engine, expire_on_commit=False), batch_size=1, flush_interval_seconds=0.05)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        writer.submit(*(Run(symbol=s, interval="1h", summary_json="{}") for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")))
+        writer.submit(Run(symbol="BNBUSDT", interval="1h", summary_json="{}"))
+        assert writer.stats()["queued"] == 4
+        await writer.aclose()
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    assert writer.stats() == {"queued": 0, "written": 4, "batches": 2, "dropped": 0, "failed": 0}
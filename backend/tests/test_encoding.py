@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.analysis.encoding import FastJSONResponse, frame_columns, frame_payload
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "open_time": np.array([1_700_000_000_000, 1_700_000_060_000], dtype=np.int64),
+        "close": [100.1, 100.2],
+        "rsi": [np.nan, 55.5],
+        "symbol": ["BTCUSDT", "BTCUSDT"],
+    })
+
+
+def test_columnar_payload_matches_records():
+    df = _frame()
+    body = json.loads(FastJSONResponse({"x": frame_payload(df, "columnar")}).body)["x"]
+    records = json.loads(FastJSONResponse(frame_payload(df)).body)
+    assert body["columns"] == ["open_time", "close", "rsi", "symbol"] and body["rows"] == 2
+    assert [dict(zip(body["columns"], row)) for row in zip(*body["data"].values())] == records
+    # NaN is encoded as null rather than failing the response.
+    assert records[0]["rsi"] is None
+
+
+def test_float32_narrows_floats_but_keeps_timestamps_exact():
+    payload = frame_columns(_frame(), float32=True)
+    assert payload["data"]["close"].dtype == np.float32
+    assert payload["data"]["open_time"].dtype == np.int64
+    body = json.loads(FastJSONResponse(payload).body)
+    assert body["data"]["open_time"] == [1_700_000_000_000, 1_700_000_060_000]
+    assert body["data"]["close"] == [100.1, 100.2]
+    assert len(FastJSONResponse(payload).body) <= len(FastJSONResponse(frame_columns(_frame())).body)
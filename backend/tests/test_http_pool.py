@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from app.providers.http import HttpClientPool
+from app.providers.market.binance import BinanceMarketDataProvider
+
+
+def test_pool_reuses_one_client_per_host():
+    pool = HttpClientPool({"max_connections": 5})
+    a = pool.client("https://api.binance.com")
+    assert pool.client("https://api.binance.com/api/v3/klines") is a
+    assert pool.client("https://oauth.reddit.com") is not a
+    asyncio.run(pool.aclose())
+    assert a.is_closed
+
+
+def test_provider_uses_injected_client():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, json=[[1, "1", "2", "0.5", "1.5", "10", 2]])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = BinanceMarketDataProvider("https://api.binance.com", client=client)
+    candles = asyncio.run(provider.get_ohlcv("btcusdt", "1h", 1))
+    assert seen == ["/api/v3/klines"]
+    assert candles[0]["close"] == 1.5
+    assert not client.is_closed
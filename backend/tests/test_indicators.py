@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 
-from app.features.indicators import compute_indicators
+from app.features.indicators import compute_indicators, compute_indicators_many
 
 
 def test_compute_indicators_has_columns():
@@ -25,3 +26,23 @@ def test_compute_indicators_has_columns():
     out = compute_indicators(df, params)
     assert "rsi" in out.columns
     assert "macd" in out.columns
+
+
+def test_compute_indicators_many_matches_per_frame():
+    params = {
+        "rsi_period": 14,
+        "ema_fast": 12,
+        "ema_slow": 26,
+        "macd_signal": 9,
+        "atr_period": 14,
+        "volatility_window": 5,
+        "volume_change_window": 2,
+    }
+    rng = np.random.default_rng(5)
+    frames = {}
+    for i, n in enumerate([80, 80, 80, 50]):
+        close = 100 + rng.normal(0, 1, n).cumsum()
+        frames[f"S{i}"] = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": rng.uniform(1, 9, n)})
+    many = compute_indicators_many(frames, params)
+    for key, frame in frames.items():
+        pd.testing.assert_frame_equal(many[key], compute_indicators(frame, params))
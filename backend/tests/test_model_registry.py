@@ -0,0 +1,67 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.models import service
+from app.models.registry import ModelRegistry
+
+
+def frame(n=300, seed=0, start=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({c: rng.normal(size=n) for c in service.FEATURE_COLUMNS})
+    df["open_time"] = (start + np.arange(n)) * 60_000
+    df["close"] = 100 + rng.normal(size=n).cumsum()
+    return df
+
+
+def test_predict_never_trains_inline_and_hot_swaps(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "MODEL_DIR", tmp_path)
+    registry = ModelRegistry(service.model_path, service.FEATURE_COLUMNS, max_models=1)
+    monkeypatch.setattr(service, "model_registry", registry)
+    df = frame()
+
+    assert service.predict(df, "BTCUSDT", "1h") == {"status": "model_missing"}
+    assert not service.model_path("BTCUSDT", "1h").exists()
+    service.train_model(df, "BTCUSDT", "1h")
+    first = registry.get("BTCUSDT", "1h")
+    assert service.predict(df, "BTCUSDT", "1h")["status"] == "ready"
+    assert registry.get("BTCUSDT", "1h") is first
+
+    # Another worker replacing the artifact on disk is picked up via its new mtime.
+    service.train_model(frame(seed=1), "BTCUSDT", "1h")
+    registry.invalidate("BTCUSDT", "1h")
+    path = service.model_path("BTCUSDT", "1h")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1))
+    assert registry.get("BTCUSDT", "1h").version == registry.version(path)
+
+    service.train_model(df, "ETHUSDT", "1h")
+    assert list(registry._entries) == [("ETHUSDT", "1h")]
+
+
+def test_model_trained_for_a_symbol_is_found_whatever_its_case(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "MODEL_DIR", tmp_path)
+    registry = ModelRegistry(service.model_path, service.FEATURE_COLUMNS)
+    monkeypatch.setattr(service, "model_registry", registry)
+    df = frame()
+
+    service.train_model(df, "BTCUSDT", "1h")
+    assert service.predict(df, "btcusdt", "1h")["status"] == "ready"
+    assert registry.get("btcusdt", "1h") is registry.get("BTCUSDT", "1h")
+
+
+def test_sklearn_artifacts_from_before_compact_models_still_predict(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "MODEL_DIR", tmp_path)
+    registry = ModelRegistry(service.model_path, service.FEATURE_COLUMNS)
+    monkeypatch.setattr(service, "model_registry", registry)
+    df = frame()
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(df[service.FEATURE_COLUMNS].to_numpy(), df["close"].diff() > 0)
+    joblib.dump(forest, service.model_path("BTCUSDT", "1h"))
+
+    result = service.predict(df, "BTCUSDT", "1h")
+    prob_up = forest.predict_proba(df[service.FEATURE_COLUMNS].tail(1).to_numpy(dtype=np.float32))[0, 1]
+    assert result["status"] == "ready"
+    assert result["confidence"] == pytest.approx(prob_up if prob_up >= 0.5 else 1 - prob_up)
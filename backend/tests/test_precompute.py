@@ -0,0 +1,95 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.analysis import service as analysis
+from app.cache.store import InMemoryCache
+from app.config.settings import load_default_config
+from app.precompute import service
+from app.precompute.service import PrecomputeScheduler
+
+
+class _Entry:
+    version = (1, 10)
+
+
+def _patch(monkeypatch, model: bool):
+    calls = []
+
+    async def compose(symbol, interval, limit, cfg, settings):
+        calls.append(symbol)
+        return {"symbol": symbol, "frame": pd.DataFrame({"close": [1.0]}), "signals": {}}
+
+    cache = InMemoryCache()
+    for module in (analysis, service):
+        monkeypatch.setattr(module, "get_cache", lambda: cache)
+    monkeypatch.setattr(analysis, "compose_analysis", compose)
+    monkeypatch.setattr(service.model_registry, "get", lambda symbol, interval: _Entry() if model else None)
+    monkeypatch.setattr(service, "predict", lambda df, symbol, interval: {"status": "ready", "direction": "up"})
+    return calls
+
+
+def test_refresh_publishes_analyses_and_predictions(monkeypatch):
+    calls = _patch(monkeypatch, model=True)
+    cfg = load_default_config().model_dump()
+    scheduler = PrecomputeScheduler()
+    scheduler.configure(watchlist=[{"symbol": "btcusdt", "interval": "1h"}, {"symbol": "ETHUSDT", "interval": "1h"}])
+
+    async def scenario():
+        await scheduler.refresh("1h", ["BTCUSDT", "ETHUSDT"], cfg, None)
+        return (
+            await service.cached_prediction("BTCUSDT", "1h", 200, cfg, None),
+            await analysis.cached_analysis("ETHUSDT", "1h", 200, cfg, None),
+        )
+
+    prediction, eth = asyncio.run(scenario())
+    assert scheduler.watchlist == [("BTCUSDT", "1h"), ("ETHUSDT", "1h")]
+    assert sorted(calls) == ["BTCUSDT", "ETHUSDT"]
+    assert prediction == {"status": "ready", "direction": "up", "cache": "hit"}
+    assert eth["cache"] == "hit"
+    assert scheduler.stats()["refreshes"] == 2
+
+
+def test_pairs_without_a_model_still_get_their_analysis_warmed(monkeypatch):
+    calls = _patch(monkeypatch, model=False)
+    cfg = load_default_config().model_dump()
+
+    async def scenario():
+        await PrecomputeScheduler().refresh("4h", ["SOLUSDT"], cfg, None)
+        return await analysis.cached_analysis("SOLUSDT", "4h", 200, cfg, None)
+
+    assert asyncio.run(scenario())["cache"] == "hit"
+    assert calls == ["SOLUSDT"]
+
+
+def test_loop_runs_at_start_and_stops_cleanly(monkeypatch):
+    _patch(monkeypatch, model=False)
+    cfg = load_default_config().model_dump()
+    scheduler = PrecomputeScheduler()
+    scheduler.configure(watchlist=[{"symbol": "BTCUSDT", "interval": "1m"}])
+
+    async def load_config():
+        return cfg
+
+    async def scenario():
+        scheduler.start(load_config, None)
+        await asyncio.sleep(0.05)
+        running = scheduler.stats()["running"]
+        await scheduler.stop()
+        return running
+
+    assert asyncio.run(scenario()) == 1
+    assert scheduler.refreshes == 1 and scheduler.stats()["running"] == 0
+
+
+def test_wakeups_follow_candle_closes_and_cache_expiry():
+    cfg = load_default_config().model_dump()
+    scheduler = PrecomputeScheduler()
+    scheduler.configure(delay_seconds=2)
+    hour = 1_700_000_000 - 1_700_000_000 % 3600 + 3600
+    assert scheduler.next_wakeup("1h", cfg, now=hour - 100) == pytest.approx(102)
+    # A 1h candle closing in 50 minutes would outlive the 300s cache cap.
+    assert scheduler.next_wakeup("1h", cfg, now=hour - 3000) == pytest.approx(298)
+    with pytest.raises(ValueError):
+        scheduler.configure(watchlist=[{"symbol": "BTCUSDT", "interval": "7m"}])
@@ -1,4 +1,18 @@
-from app.sentiment.service import aggregate_sentiment, score_posts
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.sentiment.service import (
+    ScoreCache,
+    ScoringExecutor,
+    aggregate_sentiment,
+    aggregate_sentiment_columnar,
+    align_to_candles,
+    parse_epochs,
+    score_posts,
+)
 
 
 def test_sentiment_aggregation():
@@ -9,3 +23,76 @@ def test_sentiment_aggregation():
     scored = score_posts(posts)
     buckets = aggregate_sentiment(scored, interval_minutes=5)
     assert len(buckets) >= 1
+
+
+def test_score_cache_reuses_scores_and_evicts():
+    cache = ScoreCache(max_entries=2)
+    posts = [{"text": "bullish move"}, {"text": "very bad crash"}, {"text": "bullish move"}]
+    first = score_posts(posts, cache=cache)
+    assert first[0]["score"] == first[2]["score"] == score_posts(posts[:1], cache=None)[0]["score"]
+    assert cache.stats()["entries"] == 2 and cache.stats()["hits"] == 0
+    score_posts(posts[:1], cache=cache)
+    assert cache.stats()["hits"] == 1
+
+    score_posts([{"text": "neutral words"}], cache=cache)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_score_posts_uses_the_configured_model_and_keys_by_model():
+    cache = ScoreCache()
+    posts = [{"text": "not bad at all"}]
+    vader = score_posts(posts, cache=cache)[0]["score"]
+    lexicon = score_posts(posts, "lexicon", cache=cache)[0]["score"]
+    # VADER handles the negation, the lexicon backend does not; each is cached under its own key.
+    assert vader != lexicon and cache.stats()["entries"] == 2 and cache.stats()["hits"] == 0
+    assert asyncio.run(ScoringExecutor().score(posts, "lexicon", cache=cache))[0]["score"] == lexicon
+
+
+def test_process_pool_scoring_matches_inline():
+    posts = [{"text": f"bullish move number {i}" if i % 3 else "very bad crash"} for i in range(40)]
+    executor = ScoringExecutor(mode="process", workers=2, min_batch=10, chunk_size=8)
+    try:
+        pooled = asyncio.run(executor.score(posts, cache=ScoreCache()))
+    finally:
+        executor.shutdown()
+    assert [p["score"] for p in pooled] == [p["score"] for p in score_posts(posts, cache=None)]
+
+
+def test_columnar_aggregation_matches_loop_and_aligns_to_candles():
+    posts = [
+        {"text": "", "created_at": "2024-01-01T00:00:00Z", "score": 0.5, "weight": 3},
+        {"text": "", "created_at": "2024-01-01T00:03:10.000Z", "score": -0.1, "weight": 1},
+        {"text": "", "created_at": 1704067500, "score": 0.2},
+        {"text": "", "created_at": 1704067799.9, "score": 0.4},
+    ]
+    expected = aggregate_sentiment(posts, interval_minutes=5)
+    got = aggregate_sentiment_columnar(posts, interval_minutes=5)
+    assert [(r["bucket"], r["count"]) for r in got] == [(r["bucket"], r["count"]) for r in expected]
+    assert [r["sentiment"] for r in got] == pytest.approx([r["sentiment"] for r in expected])
+    assert got[0]["weighted_sentiment"] == pytest.approx((0.5 * 3 - 0.1) / 4)
+    assert got[0]["std"] == pytest.approx(0.3)
+
+    open_times = np.array([1704066900, 1704067200, 1704067500, 1704067800]) * 1000
+    aligned = align_to_candles(got, open_times)
+    assert aligned["sentiment_count"].tolist() == [0, 2, 2, 0]
+    assert aligned["sentiment"].tolist() == pytest.approx([0.0, 0.2, 0.3, 0.0])
+
+
+def test_parse_epochs_handles_offsets_and_numbers():
+    values = ["2024-02-29T23:59:59.500Z", "2024-01-01T02:00:00+02:00", "2024-01-01T00:00:00", 1704067200.9]
+    assert parse_epochs(values).tolist() == [1709251199, 1704067200, 1704067200, 1704067200]
+
+
+def test_naive_iso_strings_are_utc_on_every_path(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        # The bare form takes the bulk parser, the fractional one the fallback.
+        values = ["2024-01-01T00:00:00", "2024-01-01T00:00:00.5"]
+        assert parse_epochs(values).tolist() == [1704067200, 1704067200]
+        posts = [{"created_at": v, "score": 1.0} for v in values]
+        assert [b["bucket"] for b in aggregate_sentiment(posts, 60)] == [1704067200]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,27 @@
+import pytest
+
+from app.sentiment.backends import get_backend, train_linear_sentiment
+
+
+def test_lexicon_backend_tracks_vader_polarity():
+    texts = ["great gains love this", "terrible crash hate it", "the block was mined"]
+    lexicon = get_backend("lexicon").score_texts(texts)
+    vader = get_backend("vader").score_texts(texts)
+    assert lexicon[0] > 0 and vader[0] > 0
+    assert lexicon[1] < 0 and vader[1] < 0
+    assert lexicon[2] == pytest.approx(vader[2], abs=1e-3)
+    assert get_backend("lexicon").stats()["texts_scored"] >= 3
+
+
+def test_sklearn_backend_loads_offline_model(tmp_path):
+    texts = ["great rally love it", "love this pump", "great gains"] * 5 + ["awful dump hate it", "hate this crash", "awful losses"] * 5
+    labels = [1] * 15 + [0] * 15
+    path = tmp_path / "sentiment.joblib"
+    train_linear_sentiment(texts, labels, path)
+    scores = get_backend("sklearn", str(path)).score_texts(["love the rally", "hate the dump"])
+    assert scores[0] > 0 > scores[1]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_backend("does-not-exist")
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import SocialPost
+from app.providers.social.reddit import RedditProvider
+from app.providers.social.twitter import TwitterProvider
+from app.sentiment.service import scoring_executor
+from app.social.service import PostStore, ingest_posts, stored_posts
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_ingest_only_fetches_new_posts_and_serves_the_window(tmp_path):
+    now = time.time()
+    tweets = [{"id": "2", "text": "great rally", "created_at": _iso(now - 60)}, {"id": "1", "text": "bad dump", "created_at": _iso(now - 120)}]
+    reddit = [{"data": {"name": "t3_b", "title": "love it", "created_utc": now - 30}}, {"data": {"name": "t3_a", "title": "hate it", "created_utc": now - 90}}]
+    since_ids, token_calls = [], []
+
+    def twitter_api(request: httpx.Request) -> httpx.Response:
+        since_ids.append(request.url.params.get("since_id"))
+        data = tweets if since_ids[-1] is None else [t for t in tweets if int(t["id"]) > int(since_ids[-1])]
+        return httpx.Response(200, json={"data": data})
+
+    def reddit_api(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v1/access_token":
+            token_calls.append(1)
+            return httpx.Response(200, json={"access_token": "t", "expires_in": 3600})
+        return httpx.Response(200, json={"data": {"children": reddit}})
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'posts.db'}")
+    store = PostStore(async_sessionmaker(engine, expire_on_commit=False))
+    twitter = TwitterProvider("bearer", client=httpx.AsyncClient(transport=httpx.MockTransport(twitter_api)))
+    transport = httpx.MockTransport(reddit_api)
+    rd = RedditProvider("id", "secret", "ua", httpx.AsyncClient(transport=transport), httpx.AsyncClient(transport=transport))
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        first = [await ingest_posts(store, "twitter", twitter, ["BTC"], 50), await ingest_posts(store, "reddit", rd, ["BTC"], 50)]
+        tweets.insert(0, {"id": "3", "text": "to the moon", "created_at": _iso(now - 10)})
+        second = [await ingest_posts(store, "twitter", twitter, ["BTC"], 50), await ingest_posts(store, "reddit", rd, ["BTC"], 50)]
+        window = await stored_posts(store, ["BTC"], 24, 100)
+        async with async_sessionmaker(engine)() as db:
+            count = await db.scalar(select(func.count()).select_from(SocialPost))
+        await engine.dispose()
+        return first, second, window, count
+
+    first, second, window, count = asyncio.run(scenario())
+    assert first == [2, 2]
+    # Twitter is asked from the newest id on; Reddit results at or before the cursor are dropped.
+    assert second == [1, 0]
+    assert since_ids == [None, "2"]
+    assert len(token_calls) == 1
+    assert count == 5
+    assert [post["text"] for post in window] == ["to the moon", "love it", "great rally", "hate it", "bad dump"]
+    assert all(isinstance(post["score"], float) for post in window)
+
+
+def test_save_prunes_old_posts_and_rescoring_is_persisted(tmp_path, monkeypatch):
+    now = time.time()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'posts.db'}")
+    store = PostStore(async_sessionmaker(engine, expire_on_commit=False), retention_seconds=3600)
+    scored = []
+
+    async def score(posts, model, model_path=None):
+        scored.append(len(posts))
+        return [{**post, "score": 0.5} for post in posts]
+
+    monkeypatch.setattr(scoring_executor, "score", score)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await store.save("twitter", "BTC", [{"id": "1", "text": "old", "created_at": now - 7200, "score": 0.1}], "vader")
+        await store.save("twitter", "BTC", [{"id": "2", "text": "new", "created_at": now - 60, "score": 0.2}], "vader")
+        first = await stored_posts(store, ["BTC"], 24, 100, model="finbert")
+        second = await stored_posts(store, ["BTC"], 24, 100, model="finbert")
+        async with async_sessionmaker(engine)() as db:
+            rows = (await db.execute(select(SocialPost.external_id, SocialPost.model, SocialPost.score))).all()
+        await engine.dispose()
+        return first, second, rows
+
+    first, second, rows = asyncio.run(scenario())
+    assert rows == [("2", "finbert", 0.5)]
+    assert [post["model"] for post in first] == [post["model"] for post in second] == ["finbert"]
+    # The second read finds the new model's scores already stored.
+    assert scored == [1]
+
+
+def test_concurrent_saves_of_the_same_posts_do_not_conflict(tmp_path):
+    now = time.time()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'posts.db'}")
+    stores = [PostStore(async_sessionmaker(engine, expire_on_commit=False)) for _ in range(2)]
+    posts = [{"id": str(i), "text": f"post {i}", "created_at": now - 60 * i, "score": 0.1} for i in range(3)]
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        saved = await asyncio.gather(*(store.save("twitter", "BTC", posts, "vader") for store in stores))
+        again = await stores[0].save("twitter", "BTC", posts[:1] + [{"id": "9", "text": "x", "created_at": now + 1, "score": 0}], "vader")
+        cursor = await stores[1].cursor("twitter", "BTC")
+        async with async_sessionmaker(engine)() as db:
+            count = await db.scalar(select(func.count()).select_from(SocialPost))
+        await engine.dispose()
+        return saved, again, cursor, count
+
+    saved, again, cursor, count = asyncio.run(scenario())
+    assert sorted(saved) == [0, 3] and again == 1 and count == 4
+    assert cursor["since_id"] == "9"
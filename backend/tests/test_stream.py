@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app import main
+from app.stream.service import AnalysisHub, row_delta
+
+
+def _analysis(closes: list[float], composite: float) -> dict:
+    candles = [{"open_time": i * 60_000, "close": c} for i, c in enumerate(closes)]
+    return {
+        "candles": pd.DataFrame(candles),
+        "frame": pd.DataFrame(candles).assign(rsi=50.0),
+        "sentiment_timeline": [{"bucket": 0, "sentiment": 0.1, "count": 1}],
+        "signals": {"composite": composite},
+    }
+
+
+def _parse(event: bytes) -> tuple[str, dict]:
+    name, data = event.decode().strip().split("\n")
+    return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_row_delta_keeps_only_new_and_changed_rows():
+    previous = [{"open_time": 0, "close": 1}, {"open_time": 1, "close": 2}]
+    assert row_delta(previous, previous) == []
+    assert row_delta([*previous[:1], {"open_time": 1, "close": 3}, {"open_time": 2, "close": 4}], previous) == [
+        {"open_time": 1, "close": 3},
+        {"open_time": 2, "close": 4},
+    ]
+
+
+def test_subscribers_share_one_producer_and_receive_deltas():
+    analyses = [_analysis([1, 2, 3], 0.1), _analysis([1, 2, 3], 0.1), _analysis([1, 2, 4, 5], 0.2)]
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return analyses[min(len(loads), len(analyses)) - 1]
+
+    hub = AnalysisHub(poll_seconds=0.01, heartbeat_seconds=1)
+
+    async def scenario():
+        streams = [hub.events("btcusdt", "1m", 200, load) for _ in range(3)]
+        first = await asyncio.gather(*(anext(s) for s in streams))
+        second = await asyncio.gather(*(anext(s) for s in streams))
+        stats = hub.stats()
+        for s in streams:
+            await s.aclose()
+        await asyncio.sleep(0.03)
+        return first, second, stats, len(loads)
+
+    first, second, stats, calls = asyncio.run(scenario())
+    # One encoded event per update, fanned out to every subscriber.
+    assert len(set(first)) == 1 and len(set(second)) == 1
+    name, snapshot = _parse(first[0])
+    assert name == "snapshot" and snapshot["symbol"] == "BTCUSDT" and len(snapshot["candles"]) == 3
+    name, delta = _parse(second[0])
+    assert name == "delta"
+    assert delta["candles"] == [{"open_time": 120_000, "close": 4}, {"open_time": 180_000, "close": 5}]
+    assert [row["close"] for row in delta["indicators"]] == [4, 5]
+    assert delta["signals"] == {"composite": 0.2} and "sentiment_timeline" not in delta
+    assert stats == {"topics": 1, "subscribers": 3, "events_published": 2, "resyncs": 0}
+    assert hub.stats()["topics"] == 0
+    # The producer stopped with the last subscriber.
+    assert calls <= 5
+
+
+def test_slow_subscriber_is_resynced_with_a_snapshot():
+    step = iter(range(1, 100))
+
+    async def load():
+        return _analysis([1, 2, next(step)], 0.1)
+
+    hub = AnalysisHub(poll_seconds=0.005, queue_size=2, heartbeat_seconds=1)
+
+    async def scenario():
+        stream = hub.events("ETHUSDT", "1m", 200, load)
+        await anext(stream)
+        await asyncio.sleep(0.05)
+        event = await anext(stream)
+        await stream.aclose()
+        return event
+
+    name, data = _parse(asyncio.run(scenario()))
+    assert name == "snapshot" and len(data["candles"]) == 3
+    assert hub.resyncs >= 1
+
+
+def test_nan_rows_encode_as_null_and_are_not_resent():
+    def analysis():
+        result = _analysis([1, 2, 3], 0.1)
+        result["frame"] = result["frame"].assign(rsi=[float("nan"), float("nan"), 40.0], ema=float("nan"))
+        return result
+
+    hub = AnalysisHub(poll_seconds=0.01, heartbeat_seconds=0.05)
+
+    async def load():
+        return analysis()
+
+    async def scenario():
+        stream = hub.events("BTCUSDT", "1m", 200, load)
+        events = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return events
+
+    snapshot, following = asyncio.run(scenario())
+    name, data = _parse(snapshot)
+    assert name == "snapshot" and data["indicators"][0]["rsi"] is None
+    # Identical recomputations (NaNs included) produce no delta, only heartbeats.
+    assert following == b": ping\n\n"
+
+
+def test_stream_rejects_unknown_symbols(monkeypatch):
+    class Provider:
+        async def search_symbols(self, query):
+            return ["BTCUSDT", "BTCUSDC"] if "BTC".startswith(query[:3]) else []
+
+    async def config():
+        return {}
+
+    monkeypatch.setattr(main, "current_config", config)
+    monkeypatch.setattr(main, "market_provider", lambda cfg: Provider())
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.stream("NOPEUSDT", "1h", 200))
+    assert exc.value.status_code == 404
+    assert asyncio.run(main.stream("btcusdt", "1h", 200)).media_type == "text/event-stream"
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from app.features.indicators import compute_indicators
+from app.features.streaming import INDICATOR_COLUMNS, IncrementalIndicators
+
+PARAMS = {
+    "rsi_period": 14,
+    "ema_fast": 12,
+    "ema_slow": 26,
+    "macd_signal": 9,
+    "atr_period": 14,
+    "volatility_window": 20,
+    "volume_change_window": 10,
+}
+
+
+def _candles(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    spread = np.abs(rng.normal(0, 0.5, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(50, 150, n),
+        }
+    )
+
+
+def test_incremental_matches_batch():
+    df = _candles(400)
+    expected = compute_indicators(df, PARAMS)
+    engine = IncrementalIndicators.from_history(df.iloc[:300], PARAMS)
+    rows = [engine.update(c) for c in df.iloc[300:].to_dict(orient="records")]
+    got = pd.DataFrame(rows)
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(got[col], expected[col].iloc[300:], rtol=1e-7, atol=1e-9, err_msg=col)
+
+
+def test_warmup_rows_and_revise_match_batch():
+    df = _candles(60)
+    expected = compute_indicators(df, PARAMS)
+    engine = IncrementalIndicators(PARAMS)
+    rows = [engine.update(c) for c in df.to_dict(orient="records")[:-1]]
+    engine.update({**df.iloc[-1].to_dict(), "close": 1.0})
+    rows.append(engine.revise(df.iloc[-1].to_dict()))
+    got = pd.DataFrame(rows)
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(got[col], expected[col], rtol=1e-7, atol=1e-9, err_msg=col)
+
+
+def test_repeated_revisions_match_batch_and_checkpoint_only_scalars():
+    df = _candles(120)
+    expected = compute_indicators(df, PARAMS)
+    engine = IncrementalIndicators(PARAMS)
+    rows = []
+    for candle in df.to_dict(orient="records"):
+        engine.update({**candle, "close": candle["close"] * 1.05, "volume": 1.0})
+        engine.revise({**candle, "high": candle["high"] + 3})
+        rows.append(engine.revise(candle))
+    got = pd.DataFrame(rows)
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(got[col], expected[col], rtol=1e-7, atol=1e-9, err_msg=col)
+    # The checkpoint holds no window contents, so update/revise are O(1) in the window size.
+    scalars = [x for v in engine._checkpoint.values() for x in (v if isinstance(v, tuple) else (v,))]
+    assert all(x is None or isinstance(x, (int, float)) for x in scalars)
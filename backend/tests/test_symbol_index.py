@@ -0,0 +1,39 @@
+import asyncio
+
+import httpx
+
+from app.providers.market.binance import BinanceMarketDataProvider
+from app.providers.market.symbols import SymbolIndex
+
+
+def test_prefix_matches_first_then_substrings_in_exchange_order():
+    index = SymbolIndex(["ETHBTC", "BTCUSDT", "WBTCUSDT", "BTCEUR", "ETHUSDT", "BTCUSDT"])
+    assert len(index) == 5
+    assert index.search("btc") == ["BTCEUR", "BTCUSDT", "ETHBTC", "WBTCUSDT"]
+    assert index.search("usdt", limit=2) == ["BTCUSDT", "WBTCUSDT"]
+    assert index.search("ethbtc") == ["ETHBTC"]
+    assert index.search("") == index.symbols
+    assert index.search("DOGE") == [] and index.search("T\nE") == []
+
+
+def test_exchange_info_is_downloaded_once_per_ttl():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"symbols": [{"symbol": f"COIN{i}USDT"} for i in range(2000)]})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            provider = BinanceMarketDataProvider("https://api.test", client=client)
+            results = await asyncio.gather(*(provider.search_symbols(q) for q in ("COIN1", "coin19", "")))
+            provider.symbols_ttl_seconds = 0
+            provider._symbols_expires = 0
+            await provider.search_symbols("COIN2")
+            return results
+
+    prefix, narrow, everything = asyncio.run(scenario())
+    assert prefix == sorted(prefix) and len(prefix) == 100 and all(s.startswith("COIN1") for s in prefix)
+    assert len(narrow) == 100 and all("COIN19" in s for s in narrow)
+    assert len(everything) == 100
+    assert calls == ["/api/v3/exchangeInfo"] * 2
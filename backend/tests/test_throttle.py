@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import httpx
+
+from app.providers.market.binance import BinanceMarketDataProvider
+from app.providers.throttle import RateLimiterPool, TokenBucket, retry_after_seconds
+
+KLINE = [[1, "1", "2", "0.5", "1.5", "10", 2]]
+
+
+def test_bucket_spaces_requests_at_the_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        return time.monotonic() - start
+
+    # The first token is already there; the other five take 1/50 s each.
+    assert asyncio.run(scenario()) >= 0.09
+    assert bucket.stats()["acquired"] == 6
+
+
+def test_limiters_are_shared_per_host():
+    pool = RateLimiterPool()
+    bucket = pool.limiter("https://api.binance.com/api/v3/klines", 5)
+    assert pool.limiter("https://api.binance.com", 10, 20) is bucket
+    assert (bucket.rate, bucket.burst) == (10, 20)
+
+
+def test_concurrent_identical_klines_share_one_request():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["limit"])
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=KLINE)
+
+    provider = BinanceMarketDataProvider("https://api.binance.com", client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    async def scenario():
+        return await asyncio.gather(*(provider.get_ohlcv("btcusdt", "1h", 1) for _ in range(10)), provider.get_ohlcv("BTCUSDT", "1h", 2))
+
+    results = asyncio.run(scenario())
+    assert sorted(calls) == ["1", "2"]
+    assert all(result == results[0] for result in results)
+
+
+def test_throttled_responses_honor_retry_after_and_pause_the_host():
+    responses = [httpx.Response(429, headers={"Retry-After": "0.1"}), httpx.Response(200, json=KLINE)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    bucket = TokenBucket(rate=100, burst=10)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = BinanceMarketDataProvider("https://api.binance.com", client=client, limiter=bucket, backoff_seconds=5)
+
+    start = time.monotonic()
+    candles = asyncio.run(provider.get_ohlcv("BTCUSDT", "1h", 1))
+    assert 0.1 <= time.monotonic() - start < 1
+    assert candles[0]["close"] == 1.5
+    assert bucket.stats()["pauses"] == 1
+
+
+def test_retry_after_accepts_seconds_and_dates():
+    assert retry_after_seconds(httpx.Headers({"Retry-After": "3"})) == 3
+    assert retry_after_seconds(httpx.Headers({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert retry_after_seconds(httpx.Headers({"Retry-After": "soon"})) is None
+    assert retry_after_seconds(httpx.Headers()) is None
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models import TrainingJob
+from app.models import jobs, service
+from app.models.registry import ModelRegistry
+from tests.test_model_registry import frame
+
+CFG = {"model": {"target_horizon": 1, "retrain_min_samples": 200}}
+
+
+def test_jobs_train_in_background_and_record_status(tmp_path, monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    queue = jobs.TrainingQueue(async_sessionmaker(engine, expire_on_commit=False), mode="inline", workers=1)
+    monkeypatch.setattr(service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(service, "model_registry", ModelRegistry(service.model_path, service.FEATURE_COLUMNS))
+
+    async def fake_batch(items, cfg, settings):
+        await asyncio.sleep(0)
+        return [
+            {"symbol": s, "interval": i, "error": "market data unavailable: empty"}
+            if s == "BADUSDT"
+            else {"symbol": s, "interval": i, "frame": frame()}
+            for s, i, _ in items
+        ]
+
+    monkeypatch.setattr(jobs, "compose_batch_analysis", fake_batch)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        submitted = await queue.submit([("btcusdt", "1h", 100), ("BADUSDT", "1h", 100)], CFG, None)
+        again = await queue.submit([("BTCUSDT", "1h", 100)], CFG, None)
+        assert [j["status"] for j in submitted] == ["queued", "queued"]
+        assert again[0]["id"] == submitted[0]["id"]
+        await asyncio.gather(*queue._tasks)
+        assert await queue.get(999) is None
+        return [await queue.get(j["id"]) for j in submitted]
+
+    ok, bad = asyncio.run(scenario())
+    assert ok["status"] == "succeeded" and ok["progress"] == 1.0 and ok["result"]["rows"] > 0
+    assert ok["duration_seconds"] is not None
+    assert bad["status"] == "failed" and "unavailable" in bad["error"]
+    assert (tmp_path / "BTCUSDT_1h.joblib").exists()
+
+
+def test_recover_only_fails_jobs_whose_owner_stopped_heartbeating(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    live = jobs.TrainingQueue(sessions, mode="inline", heartbeat_seconds=0.01)
+    booting = jobs.TrainingQueue(sessions, mode="inline", lease_seconds=60)
+    blocker = asyncio.Event()
+
+    async def slow_batch(items, cfg, settings):
+        await blocker.wait()
+        return [{"symbol": s, "interval": i, "error": "stopped"} for s, i, _ in items]
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        running = await live.submit([("BTCUSDT", "1h", 100)], CFG, None)
+        async with sessions() as db:
+            db.add(TrainingJob(symbol="ETHUSDT", interval="1h", status="running", owner="gone", heartbeat_at=datetime(2000, 1, 1)))
+            await db.commit()
+        await asyncio.sleep(0.03)
+        recovered = await booting.recover()
+        again = await booting.submit([("BTCUSDT", "1h", 100)], CFG, None)
+        async with sessions() as db:
+            statuses = {j.symbol: j.status for j in (await db.execute(select(TrainingJob))).scalars()}
+        blocker.set()
+        await asyncio.gather(*live._tasks)
+        return recovered, running, again, statuses
+
+    monkeypatch.setattr(jobs, "compose_batch_analysis", slow_batch)
+    recovered, running, again, statuses = asyncio.run(scenario())
+    assert recovered == 1
+    # The live worker's job is still active, so a second submit gets it back.
+    assert again[0]["id"] == running[0]["id"]
+    assert statuses == {"ETHUSDT": "failed", "BTCUSDT": "running"}
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app.models import service
+from app.models.registry import ModelRegistry
+from app.models.walkforward import feature_matrix, fold_bounds
+from tests.test_model_registry import frame
+
+
+def test_feature_matrix_is_contiguous_float32_without_unlabelled_rows():
+    df = frame(n=50)
+    X, y, times = feature_matrix(df, service.FEATURE_COLUMNS, horizon=2)
+    assert X.dtype == np.float32 and X.flags.c_contiguous
+    assert X.shape == (48, len(service.FEATURE_COLUMNS)) and len(y) == len(times) == 48
+    assert y[0] == int(df["close"].iloc[2] > df["close"].iloc[0])
+    assert np.shares_memory(X[:10], X)
+
+
+def test_fold_bounds_skip_already_evaluated_windows():
+    times = np.arange(500) * 10
+    assert fold_bounds(times, 200, 100) == [(200, 300), (300, 400), (400, 500)]
+    assert fold_bounds(times, 200, 100, after=3990) == [(400, 500)]
+    assert fold_bounds(times, 200, 100, after=4190) == []
+
+
+def test_walk_forward_retrains_incrementally(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(service, "model_registry", ModelRegistry(service.model_path, service.FEATURE_COLUMNS))
+    kwargs = {"min_samples": 200, "test_size": 50, "n_jobs": 2}
+
+    first = service.train_model(frame(n=351), "BTCUSDT", "1h", **kwargs)
+    assert first["status"] == "trained"
+    assert [f["train_rows"] for f in first["new_folds"]] == [200, 250, 300]
+    assert all(0 <= f["accuracy"] <= 1 and f["fit_seconds"] >= 0 for f in first["new_folds"])
+
+    # A sliding window that gained a few rows adds no complete fold and keeps the model.
+    few = service.train_model(frame(n=351, start=20), "BTCUSDT", "1h", **kwargs)
+    assert few["status"] == "up_to_date" and few["new_folds"] == []
+
+    more = service.train_model(frame(n=351, start=60), "BTCUSDT", "1h", **kwargs)
+    assert more["status"] == "trained"
+    assert [f["test_start"] // 60_000 for f in more["new_folds"]] == [350]
+
+    with pytest.raises(ValueError, match="need at least 200"):
+        service.train_model(frame(n=100), "ETHUSDT", "1h", **kwargs)
+
+
+def test_changed_training_params_refit_and_reset_folds(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(service, "model_registry", ModelRegistry(service.model_path, service.FEATURE_COLUMNS))
+    kwargs = {"min_samples": 200, "test_size": 50, "forest": {"n_estimators": 5}}
+
+    assert service.train_model(frame(n=351), "BTCUSDT", "1h", **kwargs)["status"] == "trained"
+    assert service.train_model(frame(n=351), "BTCUSDT", "1h", **kwargs)["status"] == "up_to_date"
+    horizon = service.train_model(frame(n=351), "BTCUSDT", "1h", horizon=3, **kwargs)
+    assert horizon["status"] == "trained" and [f["train_rows"] for f in horizon["new_folds"]] == [200, 250]
+    forest = service.train_model(frame(n=351), "BTCUSDT", "1h", horizon=3, **{**kwargs, "forest": {"n_estimators": 7}})
+    assert forest["status"] == "trained" and len(service.model_registry.get("BTCUSDT", "1h").model.roots) == 7